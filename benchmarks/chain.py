@@ -0,0 +1,307 @@
+"""
+An in-process simulation of the parts of an ethereum node that the alarm
+client talks to.  The scheduler and call contracts are modeled directly in
+python and every JSON-RPC request is counted so that the cost of the client's
+hot paths can be measured without a running node.
+"""
+import bisect
+import collections
+import itertools
+import threading
+import time
+
+from ethereum import abi
+from ethereum.utils import (
+    decode_hex,
+    encode_hex,
+    sha3,
+)
+
+from eth_client_utils.client import JSONRPCBaseClient
+
+from eth_alarm_client.contracts import contract_json
+
+
+EMPTY_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+
+def get_function_selectors(contract_name):
+    """
+    Return a mapping of the hex encoded 4 byte selector to the abi entry for
+    each function of the contract.
+    """
+    selectors = {}
+    for item in contract_json[contract_name]['info']['abiDefinition']:
+        if item['type'] != 'function':
+            continue
+        signature = '{0}({1})'.format(
+            item['name'],
+            ','.join(i['type'] for i in item['inputs']),
+        )
+        selectors[encode_hex(sha3(signature)[:4])] = item
+    return selectors
+
+
+def to_hex(value):
+    return '0x{0:x}'.format(value)
+
+
+def encode_address(address):
+    return address[2:] if address.startswith('0x') else address
+
+
+class SimulatedCall(object):
+    """
+    The state of a single `FutureBlockCall`.
+    """
+    def __init__(self, address, target_block, balance=10 ** 19, **kwargs):
+        self.address = address
+        self.balance = balance
+        self.values = {
+            'targetBlock': target_block,
+            'gracePeriod': 255,
+            'callValue': 0,
+            'anchorGasPrice': 20000000000,
+            'requiredGas': 200000,
+            'requiredStackDepth': 10,
+            'basePayment': 10 ** 18,
+            'baseDonation': 10 ** 16,
+            'abiSignature': b'\x00\x00\x00\x01',
+            'contractAddress': EMPTY_ADDRESS,
+            'schedulerAddress': EMPTY_ADDRESS,
+            'claimer': EMPTY_ADDRESS,
+            'claimerDeposit': 0,
+            'claimAmount': 0,
+            'wasSuccessful': False,
+            'wasCalled': False,
+            'isCancelled': False,
+            'callAPIVersion': 7,
+        }
+        self.values.update(kwargs)
+
+    def checkExecutionAuthorization(self, executor, block_number):
+        return True
+
+
+class SimulatedChain(object):
+    """
+    A chain with a scheduler contract and any number of scheduled calls.
+
+    When `block_time` is set, blocks are produced in real time.  Otherwise
+    the chain only advances when `mine` is called.
+    """
+    scheduler_address = '0x6c8f2a135f6ed072de4503bd7c4999a1a17f824b'
+    coinbase = '0xd3cda913deb6f67967b99d67acdfa1712c293601'
+
+    def __init__(self, start_block=10000, block_time=None, gas_price=20000000000,
+                 gas_limit=3141592, minimum_grace_period=16):
+        self.start_block = start_block
+        self.block_time = block_time
+        self.gas_price = gas_price
+        self.gas_limit = gas_limit
+        self.minimum_grace_period = minimum_grace_period
+
+        self.start_time = time.time()
+        self.mined = 0
+
+        self.calls = {}
+        self._call_order = []
+        self._call_counter = itertools.count(1)
+
+        self.balances = collections.defaultdict(int)
+        self.balances[self.coinbase] = 10 ** 21
+
+        self.filters = {}
+        self._filter_ids = itertools.count(1)
+
+        self.scheduler_selectors = get_function_selectors('Scheduler')
+        self.call_selectors = get_function_selectors('FutureBlockCall')
+
+    #
+    # Blocks
+    #
+    @property
+    def block_number(self):
+        block_number = self.start_block + self.mined
+        if self.block_time:
+            block_number += int((time.time() - self.start_time) / self.block_time)
+        return block_number
+
+    def mine(self, count=1):
+        self.mined += count
+
+    def get_block(self, block_number):
+        if block_number > self.block_number:
+            return None
+        block_time = self.block_time or 15
+        return {
+            'number': to_hex(block_number),
+            'hash': '0x{0:064x}'.format(block_number),
+            'timestamp': to_hex(int(
+                self.start_time + (block_number - self.start_block) * block_time
+            )),
+            'gasLimit': to_hex(self.gas_limit),
+        }
+
+    #
+    # Calls
+    #
+    def schedule_call(self, target_block, **kwargs):
+        address = '0x{0:040x}'.format(next(self._call_counter) + 0x1000)
+        call = SimulatedCall(address, target_block, **kwargs)
+        self.calls[address] = call
+        self.balances[address] = call.balance
+        bisect.insort(self._call_order, (target_block, address))
+        return call
+
+    def get_next_call(self, block_number):
+        idx = bisect.bisect_left(self._call_order, (block_number,))
+        if idx < len(self._call_order):
+            return self._call_order[idx][1]
+        return EMPTY_ADDRESS
+
+    def get_next_call_sibling(self, call_address):
+        target_block = self.calls[call_address].values['targetBlock']
+        idx = bisect.bisect_right(self._call_order, (target_block, call_address))
+        if idx < len(self._call_order):
+            return self._call_order[idx][1]
+        return EMPTY_ADDRESS
+
+    def scheduler_call(self, name, args):
+        if name == 'getNextCall':
+            return self.get_next_call(*args)
+        elif name == 'getNextCallSibling':
+            return self.get_next_call_sibling('0x' + args[0])
+        elif name == 'getMinimumGracePeriod':
+            return self.minimum_grace_period
+        elif name == 'callAPIVersion':
+            return 7
+        raise ValueError("Unsupported scheduler function {0}".format(name))
+
+    def call(self, params):
+        to = params['to']
+        data = params['data']
+        if data.startswith('0x'):
+            data = data[2:]
+        selector, arg_data = data[:8], decode_hex(data[8:])
+
+        if to == self.scheduler_address:
+            item = self.scheduler_selectors[selector]
+            args = abi.decode_abi([i['type'] for i in item['inputs']], arg_data)
+            value = self.scheduler_call(item['name'], args)
+        elif to in self.calls:
+            item = self.call_selectors[selector]
+            args = abi.decode_abi([i['type'] for i in item['inputs']], arg_data)
+            call = self.calls[to]
+            if item['name'] in call.values:
+                value = call.values[item['name']]
+            else:
+                value = getattr(call, item['name'])(*args)
+        else:
+            return '0x'
+
+        output_types = [o['type'] for o in item['outputs']]
+        if output_types == ['address']:
+            value = encode_address(value)
+        return '0x' + encode_hex(abi.encode_abi(output_types, [value]))
+
+    #
+    # Filters
+    #
+    def new_block_filter(self):
+        filter_id = to_hex(next(self._filter_ids))
+        self.filters[filter_id] = self.block_number
+        return filter_id
+
+    def get_filter_changes(self, filter_id):
+        last_seen = self.filters[filter_id]
+        current = self.block_number
+        self.filters[filter_id] = current
+        return [self.get_block(n)['hash'] for n in range(last_seen + 1, current + 1)]
+
+
+class RequestStats(object):
+    """
+    Counts of the requests made against a `SimulatedClient`.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.round_trips = 0
+            self.methods = collections.Counter()
+
+    def record(self, methods):
+        with self._lock:
+            self.round_trips += 1
+            self.requests += len(methods)
+            self.methods.update(methods)
+
+
+class SimulatedClient(JSONRPCBaseClient):
+    """
+    A blockchain client backed by a `SimulatedChain`.  Each round trip to the
+    "node" sleeps for `latency` seconds.
+    """
+    def __init__(self, chain, latency=0):
+        # Requests are served synchronously on the calling thread.
+        super(SimulatedClient, self).__init__(False)
+        self.chain = chain
+        self.latency = latency
+        self.stats = RequestStats()
+        self._lock = threading.Lock()
+
+    def respond(self, method, params):
+        chain = self.chain
+        if method == 'eth_call':
+            result = chain.call(params[0])
+        elif method == 'eth_blockNumber':
+            result = to_hex(chain.block_number)
+        elif method == 'eth_getBlockByNumber':
+            block_number = params[0]
+            if block_number == 'latest':
+                block_number = chain.block_number
+            elif not isinstance(block_number, int):
+                block_number = int(block_number, 16)
+            result = chain.get_block(block_number)
+        elif method == 'eth_getBlockByHash':
+            result = chain.get_block(int(params[0], 16))
+        elif method == 'eth_getBalance':
+            result = to_hex(chain.balances[params[0]])
+        elif method == 'eth_gasPrice':
+            result = to_hex(chain.gas_price)
+        elif method == 'eth_coinbase':
+            result = chain.coinbase
+        elif method == 'eth_getCode':
+            result = '0x6060604052' if params[0] in chain.calls else '0x'
+        elif method == 'eth_newBlockFilter':
+            result = chain.new_block_filter()
+        elif method == 'eth_getFilterChanges':
+            result = chain.get_filter_changes(params[0])
+        elif method == 'eth_uninstallFilter':
+            result = chain.filters.pop(params[0], None) is not None
+        else:
+            raise ValueError("Unsupported method {0}".format(method))
+        return {'jsonrpc': '2.0', 'result': result}
+
+    def _make_request(self, method, params):
+        self.stats.record([method])
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            return self.respond(method, params)
+
+
+class BatchingSimulatedClient(SimulatedClient):
+    """
+    A `SimulatedClient` that serves JSON-RPC batches in a single round trip.
+    """
+    def make_batch_request(self, requests):
+        self.stats.record([method for method, _ in requests])
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            return [self.respond(method, params) for method, params in requests]
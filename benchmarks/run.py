@@ -0,0 +1,254 @@
+"""
+Benchmarks for the scheduler hot paths against a `SimulatedChain`.
+
+Every benchmark reports the wall time along with the number of JSON-RPC
+requests and round trips it took so that regressions in either are easy to
+spot.
+
+    python benchmarks/run.py --calls 500 --latency 0.005 --batch-rpc
+"""
+import collections
+import os
+import sys
+import time
+
+import click
+
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from populus.contracts import Contract  # NOQA
+
+from eth_alarm_client import (  # NOQA
+    BlockSage,
+    CallContract,
+    Scheduler,
+)
+from eth_alarm_client.call_contract import load_call_states  # NOQA
+from eth_alarm_client.contracts import contract_json  # NOQA
+from eth_alarm_client.pool import WorkerPool  # NOQA
+
+from chain import (  # NOQA
+    BatchingSimulatedClient,
+    SimulatedChain,
+    SimulatedClient,
+)
+
+
+SchedulerContract = Contract(contract_json['Scheduler'], 'Scheduler')
+
+
+class StaticBlockSage(object):
+    """
+    Stands in for a `BlockSage` without making any requests so that only the
+    requests made by the code being benchmarked are counted.
+    """
+    is_alive = True
+
+    def __init__(self, chain):
+        self.chain = chain
+
+    @property
+    def current_block_number(self):
+        return self.chain.block_number
+
+    @property
+    def current_block(self):
+        return self.chain.get_block(self.chain.block_number)
+
+    block_time = 15
+
+    def estimated_time_to_block(self, block_number, percentile=None):
+        return self.block_time * max(1, block_number - self.current_block_number)
+
+    def wait_for_block(self, block_number, timeout=None):
+        return self.current_block_number >= block_number
+
+    def on_new_block(self, callback):
+        pass
+
+
+class Environment(object):
+    def __init__(self, options, realtime=False):
+        self.options = options
+        if realtime:
+            self.chain = SimulatedChain(block_time=options['block_time'])
+        else:
+            self.chain = SimulatedChain()
+
+        if options['batch_rpc']:
+            client_class = BatchingSimulatedClient
+        else:
+            client_class = SimulatedClient
+        self.client = client_class(self.chain, latency=options['latency'])
+
+        # Spread the calls across the scheduling and claiming windows.
+        current_block = self.chain.block_number
+        first_block = current_block - 16
+        last_block = current_block + 255 + 10 - 1
+        for i in range(options['calls']):
+            self.chain.schedule_call(
+                first_block + i * (last_block - first_block) // max(1, options['calls']),
+            )
+
+    def get_scheduler(self):
+        # A worker pool that rejects all work so that calls and claims are
+        # fully evaluated without anything being executed.
+        worker_pool = WorkerPool(size=0, max_queue=0)
+        return Scheduler(
+            SchedulerContract(self.chain.scheduler_address, self.client),
+            block_sage=StaticBlockSage(self.chain),
+            batch_rpc=self.options['batch_rpc'],
+            worker_pool=worker_pool,
+        )
+
+
+BENCHMARKS = collections.OrderedDict()
+
+
+def benchmark(name, realtime=False):
+    """
+    Register a benchmark.  The decorated function is given an `Environment`
+    and returns the function to be timed.  Unless `realtime` is set the chain
+    does not advance while the benchmark runs.
+    """
+    def outer(fn):
+        BENCHMARKS[name] = (fn, realtime)
+        return fn
+    return outer
+
+
+@benchmark('enumerate_calls')
+def enumerate_calls(env):
+    scheduler = env.get_scheduler()
+    current_block = env.chain.block_number
+
+    def run():
+        tuple(scheduler.enumerate_calls(current_block - 16, current_block + 255 + 10 - 1))
+    return run
+
+
+@benchmark('schedule_calls')
+def schedule_calls(env):
+    scheduler = env.get_scheduler()
+    scheduler.update_call_index()
+    return scheduler.schedule_calls
+
+
+@benchmark('claim_calls')
+def claim_calls(env):
+    scheduler = env.get_scheduler()
+    scheduler.update_call_index()
+    return scheduler.claim_calls
+
+
+@benchmark('is_callable')
+def is_callable(env):
+    block_sage = StaticBlockSage(env.chain)
+    call_contracts = [
+        CallContract(call_address, env.client, block_sage=block_sage)
+        for call_address in env.chain.calls
+    ]
+
+    def run():
+        if env.options['batch_rpc']:
+            load_call_states(env.client, call_contracts)
+        for call_contract in call_contracts:
+            call_contract.is_callable
+    return run
+
+
+def block_sage_benchmark(mode):
+    def setup(env):
+        def run():
+            block_sage = BlockSage(env.client, mode=mode, poll_interval=0.1)
+            time.sleep(env.options['duration'])
+            block_sage.stop()
+        return run
+    return setup
+
+
+benchmark('block_sage_poll', realtime=True)(block_sage_benchmark('poll'))
+benchmark('block_sage_filter', realtime=True)(block_sage_benchmark('filter'))
+
+
+def run_benchmark(name, options):
+    wall_times = []
+    requests = []
+    round_trips = []
+    blocks = []
+
+    setup, realtime = BENCHMARKS[name]
+
+    for _ in range(options['repeat']):
+        env = Environment(options, realtime=realtime)
+        run = setup(env)
+        start_block = env.chain.block_number
+        env.client.stats.reset()
+
+        start = time.time()
+        run()
+        wall_times.append(time.time() - start)
+
+        requests.append(env.client.stats.requests)
+        round_trips.append(env.client.stats.round_trips)
+        blocks.append(env.chain.block_number - start_block)
+
+    wall_time = sum(wall_times) / len(wall_times)
+    request_count = sum(requests) * 1.0 / len(requests)
+    round_trip_count = sum(round_trips) * 1.0 / len(round_trips)
+
+    line = "{0:<20} {1:>10.4f}s {2:>10.1f} {3:>12.1f} {4:>12.1f}".format(
+        name,
+        wall_time,
+        request_count,
+        round_trip_count,
+        request_count / wall_time if wall_time else 0,
+    )
+    if realtime and sum(blocks):
+        line += "  ({0:.1f} requests per block)".format(sum(requests) * 1.0 / sum(blocks))
+    click.echo(line)
+
+
+@click.command()
+@click.option('--calls', default=100, help="The number of scheduled calls.")
+@click.option(
+    '--block-time',
+    default=1.0,
+    help="Seconds between blocks for the block sage benchmarks.",
+)
+@click.option('--latency', default=0.0, help="Seconds of latency added to each round trip.")
+@click.option('--batch-rpc/--no-batch-rpc', default=False, help="Use batched requests.")
+@click.option('--repeat', default=3, help="The number of times to run each benchmark.")
+@click.option(
+    '--duration',
+    default=10.0,
+    help="Seconds to run each of the block sage benchmarks for.",
+)
+@click.option(
+    '--benchmark',
+    '-b',
+    'names',
+    multiple=True,
+    type=click.Choice(list(BENCHMARKS.keys())),
+    help="The benchmarks to run.  Defaults to all of them.",
+)
+def main(calls, block_time, latency, batch_rpc, repeat, duration, names):
+    options = {
+        'calls': calls,
+        'block_time': block_time,
+        'latency': latency,
+        'batch_rpc': batch_rpc,
+        'repeat': repeat,
+        'duration': duration,
+    }
+
+    click.echo("{0:<20} {1:>11} {2:>10} {3:>12} {4:>12}".format(
+        'benchmark', 'wall time', 'requests', 'round trips', 'requests/s',
+    ))
+    for name in names or BENCHMARKS.keys():
+        run_benchmark(name, options)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+import threading
+
+from .batch import make_batch_request
+from .utils import get_logger
+
+
+class BalanceTracker(object):
+    """
+    The balances of the accounts the client cares about, fetched for all of
+    them in a single batched request once per block.
+
+    Funds committed to transactions that have not yet been mined can be
+    reserved so that a burst of claims does not spend the same ether twice.
+    A reservation is held until it is released and, if released with the
+    block number its transaction was mined in, until balances from at least
+    that block have been loaded.
+    """
+    def __init__(self, blockchain_client, block_sage, logger=None):
+        if logger is None:
+            logger = get_logger('balances')
+        self.logger = logger
+        self.blockchain_client = blockchain_client
+        self.block_sage = block_sage
+
+        self._lock = threading.RLock()
+        self._addresses = set()
+        self._balances = {}
+        self._block_number = None
+        # Mapping of key to `(address, amount, release_at_block)`.
+        self._reservations = {}
+
+    def on_new_block(self, block_number, block):
+        """
+        `BlockSage` callback which refreshes the balances as soon as a new
+        block arrives.
+        """
+        self.refresh(block_number)
+
+    def track(self, address):
+        with self._lock:
+            self._addresses.add(address)
+
+    def untrack(self, address):
+        with self._lock:
+            self._addresses.discard(address)
+            self._balances.pop(address, None)
+
+    def refresh(self, block_number):
+        """
+        Load the balances of all tracked addresses for `block_number` unless
+        they have already been loaded for it.
+        """
+        with self._lock:
+            if self._block_number == block_number:
+                return
+            addresses = tuple(self._addresses)
+            responses = make_batch_request(self.blockchain_client, (
+                ("eth_getBalance", [address, "latest"]) for address in addresses
+            ))
+            self._balances = {
+                address: int(response['result'], 16)
+                for address, response in zip(addresses, responses)
+            }
+            self._block_number = block_number
+            self.expire_reservations()
+
+    def get_balance(self, address):
+        """
+        Return the balance of `address` as of the current block.  Addresses
+        that are not yet tracked start being tracked.
+        """
+        block_number = self.block_sage.current_block_number
+        with self._lock:
+            if address not in self._addresses:
+                self.track(address)
+                if self._block_number == block_number:
+                    self._balances[address] = self.blockchain_client.get_balance(address)
+            self.refresh(block_number)
+            return self._balances[address]
+
+    def get_reserved(self, address):
+        with self._lock:
+            return sum(
+                amount for reserved_address, amount, _ in self._reservations.values()
+                if reserved_address == address
+            )
+
+    def get_available_balance(self, address):
+        """
+        Return the balance of `address` less any funds reserved from it.
+        """
+        with self._lock:
+            return self.get_balance(address) - self.get_reserved(address)
+
+    def reserve(self, key, address, amount):
+        with self._lock:
+            self._reservations[key] = (address, amount, None)
+
+    def release(self, key, block_number=None):
+        """
+        Release the reservation for `key`.  When `block_number` is provided
+        the funds stay reserved until balances from that block are loaded.
+        """
+        with self._lock:
+            if key not in self._reservations:
+                return
+            if block_number is None or (
+                    self._block_number is not None and self._block_number >= block_number):
+                self._reservations.pop(key)
+            else:
+                address, amount, _ = self._reservations[key]
+                self._reservations[key] = (address, amount, block_number)
+
+    def expire_reservations(self):
+        with self._lock:
+            for key, (_, _, release_at_block) in tuple(self._reservations.items()):
+                if release_at_block is not None and self._block_number >= release_at_block:
+                    self._reservations.pop(key)
@@ -0,0 +1,127 @@
+import json
+import itertools
+
+
+# Upper bound on the number of requests sent in a single batch.  Nodes may
+# reject or time out on excessively large batches.
+MAX_BATCH_SIZE = 200
+
+
+_request_ids = itertools.count(1)
+
+
+def construct_batch_request(requests):
+    """
+    Construct the JSON-RPC batch payload for an iterable of `(method, params)`
+    tuples.  Returns the payload along with the request ids in the same order
+    as the provided requests.
+    """
+    payload = []
+    for method, params in requests:
+        payload.append({
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params,
+            "id": next(_request_ids),
+        })
+    return payload, [request['id'] for request in payload]
+
+
+def order_responses(request_ids, responses):
+    """
+    JSON-RPC servers are free to return batch responses in any order so match
+    them back up with the requests by id.
+    """
+    responses_by_id = {response.get('id'): response for response in responses}
+    ordered = []
+    for request_id in request_ids:
+        if request_id not in responses_by_id:
+            raise ValueError("No response for request id {0}".format(request_id))
+        response = responses_by_id[request_id]
+        if 'error' in response:
+            raise ValueError(response)
+        ordered.append(response)
+    return ordered
+
+
+def _make_http_batch_request(blockchain_client, requests):
+    payload, request_ids = construct_batch_request(requests)
+    response = blockchain_client.session.post(
+        "http://{host}:{port}/".format(
+            host=blockchain_client.host,
+            port=blockchain_client.port,
+        ),
+        data=json.dumps(payload),
+    )
+    data = response.json()
+    if isinstance(data, dict):
+        # The node rejected the batch as a whole.
+        raise ValueError(data)
+    return order_responses(request_ids, data)
+
+
+def supports_batching(blockchain_client):
+    """
+    Whether requests to the client can be sent as a JSON-RPC batch rather
+    than one at a time.
+    """
+    if hasattr(blockchain_client, 'make_batch_request'):
+        return True
+    return hasattr(blockchain_client, 'session') and hasattr(blockchain_client, 'host')
+
+
+def make_batch_request(blockchain_client, requests):
+    """
+    Issue the `(method, params)` requests in as few round trips as the client
+    allows and return the raw responses in the same order as the requests.
+
+    Clients may provide their own `make_batch_request` method.  The HTTP
+    client from `eth_rpc_client` is batched over its session.  Any other
+    client falls back to issuing the requests one at a time.
+    """
+    requests = tuple(requests)
+    if not requests:
+        return []
+
+    if hasattr(blockchain_client, 'make_batch_request'):
+        batch_fn = blockchain_client.make_batch_request
+    elif supports_batching(blockchain_client):
+        def batch_fn(chunk):
+            return _make_http_batch_request(blockchain_client, chunk)
+    else:
+        return [
+            blockchain_client.make_request(method, params)
+            for method, params in requests
+        ]
+
+    responses = []
+    for i in range(0, len(requests), MAX_BATCH_SIZE):
+        responses.extend(batch_fn(requests[i:i + MAX_BATCH_SIZE]))
+    return responses
+
+
+def get_call_request(function, args=(), block="latest"):
+    """
+    Return the `(method, params)` tuple for an `eth_call` of a bound contract
+    function.
+    """
+    params = {
+        'to': function.contract._meta.address,
+        'data': function.get_call_data(args),
+    }
+    return "eth_call", [params, block]
+
+
+def batch_call(blockchain_client, calls):
+    """
+    Execute an iterable of `(function, args)` contract calls using batched
+    `eth_call` requests and return the decoded return values in order.
+    """
+    calls = tuple(calls)
+    responses = make_batch_request(blockchain_client, (
+        get_call_request(function, args) for function, args in calls
+    ))
+    return [
+        function.cast_return_data(response['result'])
+        for (function, _), response in zip(calls, responses)
+    ]
@@ -3,6 +3,11 @@ import time
 import decimal
 
 
+from .batch import (
+    make_batch_request,
+    supports_batching,
+)
+from .block_time import EWMAEstimator
 from .utils import get_logger
 
 
@@ -15,21 +20,39 @@ class BlockSage(object):
     current_block_timestamp = None
     heartbeat = None
 
+    # The local time at which the current block was seen.
+    current_block_seen_at = None
+
     def __init__(self, blockchain_client, heartbeat=4, logger=None,
-                 base_block_time=10, block_sample_window=100):
+                 base_block_time=10, block_sample_window=100, mode='poll',
+                 poll_interval=0.5, block_time_estimator=None, poll_percentile=None):
         if logger is None:
             logger = get_logger('blocksage')
         self.logger = logger
         self.blockchain_client = blockchain_client
 
-        self._block_time = float(base_block_time)
-        self._block_sample_window = block_sample_window
+        if mode not in ('poll', 'filter'):
+            raise ValueError("Unknown block sage mode: {0}".format(mode))
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.poll_percentile = poll_percentile
+
+        if block_time_estimator is None:
+            block_time_estimator = EWMAEstimator(
+                base_block_time,
+                alpha=1.0 / block_sample_window,
+            )
+        self.block_time_estimator = block_time_estimator
+
+        self._block_condition = threading.Condition()
+        self._callbacks = []
 
         self.current_block_number = blockchain_client.get_block_number()
         self.current_block = blockchain_client.get_block_by_number(
             self.current_block_number, False,
         )
         self.current_block_timestamp = int(self.current_block['timestamp'], 16)
+        self.current_block_seen_at = time.time()
 
         self._run = True
 
@@ -40,9 +63,6 @@ class BlockSage(object):
 
         self.heartbeat = heartbeat
 
-    _block_time = None
-    _block_sample_window = None
-
     @property
     def is_alive(self):
         return self._thread.is_alive()
@@ -50,26 +70,40 @@ class BlockSage(object):
     @property
     def block_time(self):
         """
-        Return the current observed average block time.
+        Return the current estimated block time.
         """
-        return self._block_time
+        return self.block_time_estimator.block_time
 
     @block_time.setter
     def block_time(self, value):
-        # current average
-        a = self._block_time
-        # new sample value
-        v = value
-        # sample size
-        n = self._block_sample_window
+        self.block_time_estimator.add_sample(value)
 
-        # compute running average
-        self._block_time = max((
-            ((n - 1) * a + v) / n
-        ), 1)
+    def add_block_time_sample(self, block_time, timestamp):
+        self.block_time_estimator.add_sample(block_time, timestamp)
+
+    def get_time_to_block_distribution(self, block_number):
+        """
+        Return the `BlockTimeDistribution` of the time until `block_number`
+        is mined.
+        """
+        return self.block_time_estimator.get_distribution(
+            max(1, block_number - self.current_block_number),
+        )
 
-    def estimated_time_to_block(self, block_number):
-        return self.block_time * max(1, block_number - self.current_block_number)
+    def estimated_time_to_block(self, block_number, percentile=None):
+        """
+        Return the estimated number of seconds until `block_number` is mined,
+        either the average or, when given, the `percentile` (0-100) of the
+        estimated distribution.  Percentiles are never less than a quarter of
+        a block since low percentiles of a wide distribution come out as 0
+        and would have callers waiting in a tight loop.
+        """
+        if percentile is None:
+            return self.block_time * max(1, block_number - self.current_block_number)
+        return max(
+            self.get_time_to_block_distribution(block_number).percentile(percentile),
+            self.block_time / 4.0,
+        )
 
     @property
     def expected_next_block_time(self):
@@ -97,9 +131,23 @@ class BlockSage(object):
                 )
                 self.next_heartbeat = self.current_block_number + self.heartbeat
 
+    def get_sleep_time(self, misses=0):
+        """
+        The number of seconds from now until the next block is due, at
+        `poll_percentile` when given or else on average.  Once it is overdue
+        the interval starts at `poll_interval` and doubles for each of the
+        `misses` polls which have not found it, up to a block time.
+        """
+        next_block_due = self.current_block_seen_at + self.estimated_time_to_block(
+            self.current_block_number + 1,
+            self.poll_percentile,
+        )
+        backoff = min(self.poll_interval * 2 ** misses, max(self.block_time, self.poll_interval))
+        return max(next_block_due - time.time(), backoff)
+
     @property
     def sleep_time(self):
-        return self.estimated_time_to_block(self.current_block_number + 1)
+        return self.get_sleep_time()
 
     def stop(self):
         """
@@ -109,48 +157,149 @@ class BlockSage(object):
         self.logger.info("Stopping Block Sage")
         self._run = False
 
+    def on_new_block(self, callback):
+        """
+        Register `callback(block_number, block)` to be called from the block
+        sage's thread whenever a new block is seen.
+        """
+        with self._block_condition:
+            self._callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        with self._block_condition:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def wait_for_block(self, block_number, timeout=None):
+        """
+        Block until `block_number` has been seen or `timeout` seconds have
+        passed.  Returns whether the block has been reached.
+        """
+        if timeout is not None:
+            deadline = time.time() + timeout
+
+        with self._block_condition:
+            while self.current_block_number < block_number:
+                if timeout is None:
+                    self._block_condition.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self._block_condition.wait(remaining)
+            return self.current_block_number >= block_number
+
+    def set_current_block(self, block_number, block):
+        with self._block_condition:
+            self.current_block_number = block_number
+            self.current_block = block
+            self.current_block_timestamp = int(block['timestamp'], 16)
+            self.current_block_seen_at = time.time()
+            self._block_condition.notify_all()
+            callbacks = tuple(self._callbacks)
+
+        self.logger.debug(
+            "Block Number: %s - Block Time: %s",
+            self.current_block_number,
+            decimal.Decimal(
+                str(self.block_time)
+            ).quantize(decimal.Decimal('1.00')),
+        )
+
+        for callback in callbacks:
+            try:
+                callback(block_number, block)
+            except Exception as e:
+                self.logger.error("Error in new block callback %s: %s", callback, e)
+
+    def add_block(self, block_number, block):
+        """
+        Record `block_number` as the current block, sampling its block time
+        when it directly follows the previous current block.
+        """
+        block_timestamp = int(block['timestamp'], 16)
+        if block_number == self.current_block_number + 1:
+            self.add_block_time_sample(
+                block_timestamp - self.current_block_timestamp,
+                block_timestamp,
+            )
+        self.set_current_block(block_number, block)
+
+    def get_blocks(self, from_block, to_block):
+        """
+        Return the blocks in the inclusive range, fetched with a single
+        batched request when the client supports it.  Blocks the node could
+        not return are `None`.
+        """
+        block_numbers = range(from_block, to_block + 1)
+        if not supports_batching(self.blockchain_client):
+            return [
+                self.blockchain_client.get_block_by_number(block_number, False)
+                for block_number in block_numbers
+            ]
+        responses = make_batch_request(self.blockchain_client, (
+            ("eth_getBlockByNumber", [hex(block_number), False])
+            for block_number in block_numbers
+        ))
+        return [response.get('result') for response in responses]
+
+    def catch_up(self, block_number):
+        """
+        Fetch every block after the current block up to and including
+        `block_number` and add each of them in order so that the block time
+        of every block is sampled and callbacks see every block, such as
+        the calls which were due on the skipped blocks.  Returns whether
+        `block_number` was reached.
+        """
+        from_block = self.current_block_number + 1
+        if block_number > from_block:
+            self.logger.info("Catching up on blocks %s-%s", from_block, block_number)
+
+        blocks = self.get_blocks(from_block, block_number)
+        for next_block_number, block in zip(range(from_block, block_number + 1), blocks):
+            if block is None:
+                self.logger.warning("Got `None` while fetching block %s", next_block_number)
+                return False
+            self.add_block(next_block_number, block)
+        return self.current_block_number == block_number
+
     def monitor_block_times(self):
         """
         Monitor the latest block number as well as the time between blocks.
+        Blocks mined since the block sage was created are caught up on rather
+        than skipped.
         """
-        self.current_block_number = self.blockchain_client.get_block_number()
-        self.current_block = self.blockchain_client.get_block_by_number(
-            self.current_block_number, False,
-        )
-        self.current_block_timestamp = int(self.current_block['timestamp'], 16)
+        if self.mode == 'filter':
+            try:
+                filter_id = self.blockchain_client.new_block_filter()
+            except ValueError:
+                self.logger.warning(
+                    "Unable to install a block filter.  Falling back to polling",
+                )
+            else:
+                self.monitor_block_filter(filter_id)
+                return
 
+        self.poll_block_times()
+
+    def poll_block_times(self):
+        """
+        Poll the node for new blocks, sleeping until the next block is likely
+        to have been mined and then backing off from `poll_interval` seconds
+        until it has been.
+        """
+        misses = 0
         while self._run:
             self.do_heartbeat()
-            sleep_time = max(self.sleep_time, 7)
-            time.sleep(sleep_time)
-            if self.blockchain_client.get_block_number() > self.current_block_number:
-                # Update block time.
-                next_block = self.blockchain_client.get_block_by_number(
-                    self.current_block_number + 1,
-                )
-                if next_block is None:
-                    self.logger.warning(
-                        "Got `None` while fetching block %s",
-                        self.current_block_number + 1,
-                    )
-                    continue
-                next_block_timestamp = int(next_block['timestamp'], 16)
-                self.block_time = next_block_timestamp - self.current_block_timestamp
+            time.sleep(self.get_sleep_time(misses))
+            block_number = self.blockchain_client.get_block_number()
+            if block_number > self.current_block_number:
+                misses = 0
+                self.catch_up(block_number)
+                continue
 
-                # Grab current block data
-                self.current_block_number = self.blockchain_client.get_block_number()
-                self.current_block = self.blockchain_client.get_block_by_number(
-                    self.current_block_number, False,
-                )
-                self.current_block_timestamp = int(self.current_block['timestamp'], 16)
-                self.logger.debug(
-                    "Block Number: %s - Block Time: %s",
-                    self.current_block_number,
-                    decimal.Decimal(
-                        str(self._block_time)
-                    ).quantize(decimal.Decimal('1.00')),
-                )
-            elif time.time() > self.expected_next_block_time + 20 * self.block_time:
+            misses += 1
+            if time.time() > self.expected_next_block_time + 20 * self.block_time:
                 delta = time.time() - self.expected_next_block_time
                 if delta > 120 and int(delta) % 10 == 0:
                     self.logger.warning(
@@ -159,3 +308,46 @@ class BlockSage(object):
                         time.time() - self.current_block_timestamp,
                     )
                     time.sleep(1)
+
+    def monitor_block_filter(self, filter_id):
+        """
+        Watch for new blocks using a block filter.  The filter is checked
+        every `poll_interval` seconds which is cheap for the node and means
+        new blocks are seen almost as soon as the node imports them.
+        """
+        self.logger.info("Watching for new blocks with filter %s", filter_id)
+        # The filter only reports blocks mined after it was installed.
+        self.catch_up(self.blockchain_client.get_block_number())
+        while self._run:
+            self.do_heartbeat()
+            try:
+                block_hashes = self.blockchain_client.get_filter_changes(filter_id)
+            except ValueError:
+                # Nodes drop filters which have not been checked recently.
+                self.logger.warning("Block filter %s was lost.  Reinstalling", filter_id)
+                time.sleep(self.poll_interval)
+                filter_id = self.blockchain_client.new_block_filter()
+                self.catch_up(self.blockchain_client.get_block_number())
+                continue
+
+            for block_hash in block_hashes or []:
+                block = self.blockchain_client.get_block_by_hash(block_hash, False)
+                if block is None:
+                    self.logger.warning("Got `None` while fetching block %s", block_hash)
+                    continue
+                block_number = int(block['number'], 16)
+                if block_number <= self.current_block_number:
+                    continue
+                if block_number > self.current_block_number + 1:
+                    # Blocks were missed, such as while the filter was being
+                    # reinstalled.
+                    self.catch_up(block_number)
+                else:
+                    self.add_block(block_number, block)
+
+            time.sleep(self.poll_interval)
+
+        try:
+            self.blockchain_client.uninstall_filter(filter_id)
+        except ValueError:
+            pass
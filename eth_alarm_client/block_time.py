@@ -0,0 +1,203 @@
+"""
+Estimators for the time between blocks.
+
+Each estimator is fed the time between consecutive blocks and returns a
+`BlockTimeDistribution` for how long a number of blocks will take to be
+mined, so that callers can wait for a pessimistic or optimistic percentile
+rather than only the average.
+"""
+import collections
+import math
+import time
+
+from .utils import get_percentile
+
+
+def get_normal_quantile(probability):
+    """
+    Return the z-score below which `probability` (0-1 exclusive) of a
+    standard normal distribution lies.  Uses the rational approximation from
+    Abramowitz and Stegun (26.2.23) which is accurate to about 4.5e-4.
+    """
+    if not 0 < probability < 1:
+        raise ValueError("Probability must be between 0 and 1: {0}".format(probability))
+    if probability > 0.5:
+        return -get_normal_quantile(1 - probability)
+    t = math.sqrt(-2 * math.log(probability))
+    return -(t - (
+        (2.515517 + 0.802853 * t + 0.010328 * t ** 2) /
+        (1 + 1.432788 * t + 0.189269 * t ** 2 + 0.001308 * t ** 3)
+    ))
+
+
+class BlockTimeDistribution(object):
+    """
+    The time for `blocks` blocks to be mined, approximated as a normal
+    distribution of the sum of that many independent block times.
+    """
+    def __init__(self, blocks, block_time, stddev):
+        self.blocks = blocks
+        self.mean = blocks * block_time
+        self.stddev = math.sqrt(blocks) * stddev
+
+    def percentile(self, percentile):
+        """
+        Return the number of seconds within which the blocks will have been
+        mined with the given probability (0-100 exclusive).
+        """
+        z = get_normal_quantile(percentile / 100.0)
+        return max(0.0, self.mean + z * self.stddev)
+
+    def interval(self, confidence=95):
+        """
+        Return the `(low, high)` bounds within which the blocks will be mined
+        with the given confidence.
+        """
+        tail = (100 - confidence) / 2.0
+        return self.percentile(tail), self.percentile(100 - tail)
+
+    def __repr__(self):
+        return "BlockTimeDistribution(blocks={0}, mean={1:.2f}, stddev={2:.2f})".format(
+            self.blocks, self.mean, self.stddev,
+        )
+
+
+class BlockTimeEstimator(object):
+    """
+    Base class for block time estimators.
+    """
+    # Estimates never go below this many seconds per block.
+    minimum_block_time = 1
+
+    sample_count = 0
+
+    def __init__(self, base_block_time=10):
+        self.base_block_time = float(base_block_time)
+
+    def add_sample(self, block_time, timestamp=None):
+        """
+        Record the `block_time` seconds it took to mine the block with the
+        given `timestamp`.
+        """
+        raise NotImplementedError("Estimators must implement `add_sample`")
+
+    @property
+    def block_time(self):
+        raise NotImplementedError("Estimators must implement `block_time`")
+
+    @property
+    def stddev(self):
+        raise NotImplementedError("Estimators must implement `stddev`")
+
+    def get_distribution(self, blocks, timestamp=None):
+        """
+        Return the `BlockTimeDistribution` for `blocks` blocks mined after
+        `timestamp`, which defaults to now.
+        """
+        return BlockTimeDistribution(blocks, self.block_time, self.stddev)
+
+
+class EWMAEstimator(BlockTimeEstimator):
+    """
+    Exponentially weighted moving average and variance of the block time.
+    With `alpha = 1 / n` this is the running average over roughly `n`
+    samples.
+    """
+    def __init__(self, base_block_time=10, alpha=0.1):
+        super(EWMAEstimator, self).__init__(base_block_time)
+        self.alpha = alpha
+        self._block_time = self.base_block_time
+        # Block times are roughly exponentially distributed so the spread
+        # starts out equal to the mean.
+        self._variance = self.base_block_time ** 2
+
+    def add_sample(self, block_time, timestamp=None):
+        delta = block_time - self._block_time
+        self._block_time = max(self._block_time + self.alpha * delta, self.minimum_block_time)
+        self._variance = (1 - self.alpha) * (self._variance + self.alpha * delta ** 2)
+        self.sample_count += 1
+
+    @property
+    def block_time(self):
+        return self._block_time
+
+    @property
+    def stddev(self):
+        return math.sqrt(self._variance)
+
+
+class WindowEstimator(BlockTimeEstimator):
+    """
+    Median block time over the last `sample_window` blocks, with the spread
+    taken from the 16th and 84th percentiles so that a few very slow blocks
+    do not skew the estimate.
+    """
+    def __init__(self, base_block_time=10, sample_window=100):
+        super(WindowEstimator, self).__init__(base_block_time)
+        self._samples = collections.deque(maxlen=sample_window)
+
+    def add_sample(self, block_time, timestamp=None):
+        self._samples.append(block_time)
+        self.sample_count += 1
+
+    @property
+    def block_time(self):
+        if not self._samples:
+            return self.base_block_time
+        return max(get_percentile(self._samples, 50), self.minimum_block_time)
+
+    @property
+    def stddev(self):
+        if len(self._samples) < 2:
+            return self.base_block_time
+        return (get_percentile(self._samples, 84) - get_percentile(self._samples, 16)) / 2.0
+
+
+class SeasonalEstimator(BlockTimeEstimator):
+    """
+    Keeps a separate `EWMAEstimator` for each hour of the day (UTC) to follow
+    daily changes in hash rate.  Until an hour has `min_samples` samples the
+    estimate for all hours is used instead.
+    """
+    def __init__(self, base_block_time=10, alpha=0.1, min_samples=20):
+        super(SeasonalEstimator, self).__init__(base_block_time)
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.overall = EWMAEstimator(base_block_time, alpha)
+        self.hourly = {}
+
+    def add_sample(self, block_time, timestamp=None):
+        self.overall.add_sample(block_time)
+        self.sample_count += 1
+        if timestamp is None:
+            return
+        hour = time.gmtime(timestamp).tm_hour
+        if hour not in self.hourly:
+            self.hourly[hour] = EWMAEstimator(self.overall.block_time, self.alpha)
+        self.hourly[hour].add_sample(block_time)
+
+    def get_estimator(self, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        estimator = self.hourly.get(time.gmtime(timestamp).tm_hour)
+        if estimator is None or estimator.sample_count < self.min_samples:
+            return self.overall
+        return estimator
+
+    @property
+    def block_time(self):
+        return self.get_estimator().block_time
+
+    @property
+    def stddev(self):
+        return self.get_estimator().stddev
+
+    def get_distribution(self, blocks, timestamp=None):
+        return self.get_estimator(timestamp).get_distribution(blocks)
+
+
+ESTIMATORS = {
+    'ewma': EWMAEstimator,
+    'window': WindowEstimator,
+    'seasonal': SeasonalEstimator,
+}
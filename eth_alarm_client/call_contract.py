@@ -1,11 +1,28 @@
 import threading
-import time
-import math
 
+from .batch import (
+    get_call_request,
+    make_batch_request,
+)
 from .block_sage import BlockSage
+from .claims import (
+    CLAIM_GAS_COST,
+    CLAIM_WINDOW_OFFSET,
+    CLAIM_WINDOW_SIZE,
+    CLAIMER_EXCLUSIVE_BLOCKS,
+    AuthorizationSchedule,
+    get_claim_value,
+    get_first_profitable_claim_offset,
+)
+from .engine import (
+    WaitForBlock,
+    run_steps,
+    wait_for_receipt_steps,
+)
 from .utils import (
     cached_property,
     cache_once,
+    empty,
     get_logger
 )
 
@@ -21,6 +38,113 @@ CANCELLATION_WINDOW = 8
 MAX_CALL_OVERHEAD_GAS = 200000
 DEFAULT_CALL_GAS = 1000000
 
+# The `FutureBlockCall` getters for values that never change once the call
+# has been scheduled.
+CALL_DATA_GETTERS = (
+    'targetBlock',
+    'gracePeriod',
+    'callValue',
+    'anchorGasPrice',
+    'requiredGas',
+    'requiredStackDepth',
+    'basePayment',
+    'baseDonation',
+    'abiSignature',
+    'contractAddress',
+    'schedulerAddress',
+)
+
+# The `FutureBlockCall` getters for values that change over the life of the
+# call.
+CALL_STATE_GETTERS = (
+    'claimer',
+    'claimerDeposit',
+    'claimAmount',
+    'wasSuccessful',
+    'wasCalled',
+    'isCancelled',
+)
+
+
+def load_stored_call_data(call_contracts):
+    """
+    Populate the call data for each of the provided calls that has not yet
+    been checked against its call store.
+    """
+    for call_contract in call_contracts:
+        if call_contract.call_store is not None and not call_contract._store_checked:
+            call_contract.load_stored_call_data()
+
+
+def load_call_states(blockchain_client, call_contracts):
+    """
+    Load the getters of each of the provided calls along with the balances
+    of those without a balance tracker and, unless every call has a gas price
+    oracle, the current gas price using a single batched request.
+
+    Values for getters that never change are kept for the life of each call.
+    The remaining values are only used for the block they were loaded on.
+    """
+    call_contracts = tuple(call_contracts)
+    if not call_contracts:
+        return
+
+    load_stored_call_data(call_contracts)
+
+    requests = []
+    decoders = []
+
+    for call_contract in call_contracts:
+        getters = tuple(
+            getter for getter in CALL_DATA_GETTERS if getter not in call_contract._call_data
+        ) + CALL_STATE_GETTERS
+        for getter in getters:
+            function = getattr(call_contract.call, getter)
+            requests.append(get_call_request(function))
+            decoders.append((call_contract, getter, function.cast_return_data))
+        if call_contract.balance_tracker is None:
+            requests.append(("eth_getBalance", [call_contract.call_address, "latest"]))
+            decoders.append((call_contract, 'balance', lambda result: int(result, 16)))
+
+    load_gas_price = any(
+        call_contract.gas_price_oracle is None for call_contract in call_contracts
+    )
+    if load_gas_price:
+        requests.append(("eth_gasPrice", []))
+
+    block_numbers = [
+        call_contract.block_sage.current_block_number for call_contract in call_contracts
+    ]
+    responses = make_batch_request(blockchain_client, requests)
+
+    call_data = {}
+    states = {}
+    for (call_contract, key, decode), response in zip(decoders, responses):
+        value = decode(response['result'])
+        if key in CALL_DATA_GETTERS:
+            call_data.setdefault(id(call_contract), {})[key] = value
+        else:
+            states.setdefault(id(call_contract), {})[key] = value
+
+    # The new call data of every call is saved to its store at once.
+    stored_call_data = {}
+    for call_contract, block_number in zip(call_contracts, block_numbers):
+        new_call_data = call_data.get(id(call_contract), {})
+        call_contract._call_data.update(new_call_data)
+        if new_call_data and call_contract.call_store is not None:
+            stored_call_data.setdefault(call_contract.call_store, {})[
+                call_contract.call_address
+            ] = new_call_data
+
+        state = states.get(id(call_contract), {})
+        if load_gas_price:
+            state['gas_price'] = int(responses[-1]['result'], 16)
+        call_contract._state = state
+        call_contract._state_block = block_number
+
+    for call_store, call_data_by_address in stored_call_data.items():
+        call_store.set_many_call_data(call_data_by_address)
+
 
 class CallContract(object):
     """
@@ -30,13 +154,45 @@ class CallContract(object):
     txn_receipt = None
     txn = None
 
+    claim_txn_hash = None
+    claim_txn_receipt = None
+
+    # The execute transaction prepared ahead of the call window and the hash
+    # and gas of the execute transaction once it has been sent.
+    _prepared_execution = None
+    _fired_txn_hash = None
+    _fired_execution_gas = None
+    _armed_block_sage = None
+
     _block_sage = None
+    _task = None
+
+    # The block number that the values in `_state` were loaded on.
+    _state_block = None
 
-    def __init__(self, call_address, blockchain_client, block_sage=None):
+    # Whether the call data has been loaded from the call store.
+    _store_checked = False
+
+    def __init__(self, call_address, blockchain_client, block_sage=None, batch_rpc=False,
+                 call_store=None, gas_price_oracle=None, balance_tracker=None,
+                 receipt_watcher=None, transaction_preparer=None, execution_planner=None,
+                 wake_percentile=None):
         self.blockchain_client = blockchain_client
         self.call_address = call_address
         self.call = FutureBlockCall(call_address, self.blockchain_client)
         self.logger = get_logger('call-{0}'.format(self.call_address))
+        self.batch_rpc = batch_rpc
+        self.call_store = call_store
+        self.gas_price_oracle = gas_price_oracle
+        self.balance_tracker = balance_tracker
+        self.receipt_watcher = receipt_watcher
+        self.transaction_preparer = transaction_preparer
+        self.execution_planner = execution_planner
+        self.wake_percentile = wake_percentile
+        self._fire_lock = threading.Lock()
+
+        self._call_data = {}
+        self._state = {}
 
         if block_sage is None:
             block_sage = BlockSage(self.blockchain_client)
@@ -55,31 +211,84 @@ class CallContract(object):
             raise ValueError("Blocksage died")
         return self._block_sage
 
+    #
+    # Batched Reads
+    #
+    def load_state(self):
+        """
+        Load all of the call's getters, its balance and the gas price in a
+        single batched request.
+        """
+        load_call_states(self.blockchain_client, [self])
+
+    def load_stored_call_data(self):
+        """
+        Populate the call data from the call store.
+        """
+        self._store_checked = True
+        stored_call_data = self.call_store.get_call_data(self.call_address)
+        if stored_call_data:
+            self.logger.debug("Loaded %s values from call store", len(stored_call_data))
+        self._call_data.update(stored_call_data)
+
+    def set_call_data(self, call_data):
+        """
+        Record values for getters that never change, saving them to the call
+        store if one is in use.
+        """
+        self._call_data.update(call_data)
+        if call_data and self.call_store is not None:
+            self.call_store.set_call_data(self.call_address, call_data)
+
+    def get_loaded_value(self, key):
+        """
+        Return the value for `key` loaded by `load_call_states`, or `empty` if
+        it was not loaded or was loaded on an earlier block.
+        """
+        if key in self._call_data:
+            return self._call_data[key]
+        if self._block_sage is None or self._state_block is None:
+            return empty
+        if self._state_block != self._block_sage.current_block_number:
+            return empty
+        return self._state.get(key, empty)
+
+    def read(self, getter):
+        """
+        Return the value of one of the `FutureBlockCall` getters, preferring
+        a previously loaded or stored value.
+        """
+        if getter in CALL_DATA_GETTERS:
+            if self.call_store is not None and not self._store_checked:
+                self.load_stored_call_data()
+
+        value = self.get_loaded_value(getter)
+        if value is empty:
+            value = getattr(self.call, getter)()
+            if getter in CALL_DATA_GETTERS:
+                self.set_call_data({getter: value})
+        return value
+
     #
     # Execution Pre Requesites
     #
     @cached_property
     def first_claimable_block(self):
-        return self.target_block - 10 - 255
+        return self.target_block - CLAIM_WINDOW_OFFSET - CLAIM_WINDOW_SIZE
 
-    @cached_property
+    @property
     def first_profitable_claim_block(self):
-        claim_cost = self.CLAIM_GAS_COST * self.blockchain_client.get_gas_price()
-        block_number = min(240, int(math.ceil(claim_cost * 1.0 * 240 / self.base_payment)))
-        return self.first_claimable_block + block_number
+        claim_cost = self.CLAIM_GAS_COST * self.gas_price
+        return self.first_claimable_block + get_first_profitable_claim_offset(
+            self.base_payment, claim_cost,
+        )
 
     @cached_property
     def last_claimable_block(self):
-        return self.target_block - 10
+        return self.target_block - CLAIM_WINDOW_OFFSET
 
-    @property
     def get_claim_value(self, block_number):
-        if block_number < self.first_claimable_block:
-            return 0
-        if block_number > self.target_block - 10 - 15:
-            return self.base_payment
-        n = block_number - self.first_claimable_block
-        return int(self.base_payment * 1.0 * n / 240)
+        return get_claim_value(self.base_payment, block_number - self.first_claimable_block)
 
     @property
     def is_claimable(self):
@@ -112,7 +321,7 @@ class CallContract(object):
 
     @property
     def scheduler_can_pay(self):
-        gas_cost = self.get_execution_gas() * self.blockchain_client.get_gas_price()
+        gas_cost = self.get_execution_gas() * self.gas_price
         max_payment = 2 * self.base_payment
         max_donation = 2 * self.base_donation
         call_value = self.call_value
@@ -122,13 +331,54 @@ class CallContract(object):
     def stop(self):
         self._run = False
 
+    @property
+    def is_alive(self):
+        """
+        Whether the execution of this call is still being tracked.
+        """
+        if self._task is not None:
+            return self._task.is_alive()
+        return False
+
     def execute(self):
+        run_steps(self.execute_steps())
+
+    def execute_steps(self):
+        """
+        Step generator form of `execute`.  Yields the number of seconds to
+        sleep rather than sleeping so that it can be run by an
+        `ExecutionEngine`.
+        """
+        # Cached calls are executed again if an earlier attempt failed.
+        self.reset_execution()
+
         # Blocks until we are within 3 blocks of the call window.
         self.logger.info("Sleeping until %s", self.target_block - 2)
-        self.wait_for_call_window()
-        self.logger.info("Entering call loop")
+        for delay in self.wait_for_call_window_steps(percentile=self.wake_percentile):
+            yield delay
 
+        if self.transaction_preparer is not None:
+            try:
+                self.arm_execution()
+            except Exception as e:
+                self.logger.error("Unable to prepare execution: %s", e)
+
+        self.logger.info("Entering call loop")
+        if self.execution_planner is not None:
+            self.execution_planner.add(self)
+        try:
+            for step in self.call_loop_steps():
+                yield step
+        finally:
+            if self.execution_planner is not None:
+                self.execution_planner.remove(self)
+            self.disarm_execution()
+
+    def call_loop_steps(self):
         while getattr(self, '_run', True):
+            if self.batch_rpc:
+                self.load_state()
+
             if self.is_expired:
                 self.logger.error("Call window expired")
                 break
@@ -142,55 +392,231 @@ class CallContract(object):
                 break
 
             next_block_number = self.block_sage.current_block_number + 1
-            if not self.should_call_on_block(next_block_number):
-                time.sleep(2)
-                continue
 
-            # Execute the transaction
-            self.logger.info("Attempting to execute call")
-            txn_hash = self.call.execute(gas=self.get_execution_gas())
+            is_planned = self.execution_planner is not None
+
+            if not is_planned and self.is_armed and next_block_number >= self.target_block:
+                # The block before the target block has been seen so the
+                # prepared transaction is due if the block sage has not
+                # already sent it.
+                self.fire_execution(self.block_sage.current_block_number)
+
+            if self.has_sent_execution:
+                txn_hash = self._fired_txn_hash
+                execution_gas = self._fired_execution_gas
+            elif is_planned or self.is_armed or not self.should_call_on_block(next_block_number):
+                # Either the execution will be sent by the planner or block
+                # sage or it is not due yet.  Check again once the next block
+                # arrives.
+                yield WaitForBlock(
+                    self.block_sage,
+                    next_block_number,
+                    timeout=self.block_sage.estimated_time_to_block(next_block_number) * 2,
+                )
+                continue
+            else:
+                # Execute the transaction
+                self.logger.info("Attempting to execute call")
+                execution_gas = self.get_execution_gas()
+                txn_hash = self.call.execute(gas=execution_gas)
+
+            if self.balance_tracker is not None:
+                # The gas is paid up front from our account until the call
+                # reimburses it.
+                self.balance_tracker.reserve(
+                    ('execute', self.call_address),
+                    self.coinbase,
+                    execution_gas * self.gas_price,
+                )
 
             # Wait for the transaction receipt.
+            receipts = {}
             try:
                 self.logger.debug("Waiting for transaction: %s", txn_hash)
-                txn_receipt = self.blockchain_client.wait_for_transaction(
-                    txn_hash,
-                    self.block_sage.estimated_time_to_block(self.last_block) * 2,
-                )
+                for delay in wait_for_receipt_steps(
+                        self.blockchain_client,
+                        txn_hash,
+                        receipts,
+                        max_wait=self.block_sage.estimated_time_to_block(self.last_block) * 2,
+                        receipt_watcher=self.receipt_watcher):
+                    yield delay
             except ValueError:
                 self.logger.error("Unable to get transaction receipt: %s", txn_hash)
+                if self.balance_tracker is not None:
+                    self.balance_tracker.release(('execute', self.call_address))
                 break
             else:
                 self.logger.info("Transaction accepted.")
+                if self.balance_tracker is not None:
+                    self.balance_tracker.release(
+                        ('execute', self.call_address),
+                        int(receipts[txn_hash]['blockNumber'], 16),
+                    )
                 self.txn_hash = txn_hash
-                self.txn_receipt = txn_receipt
+                self.txn_receipt = receipts[txn_hash]
                 self.txn = self.blockchain_client.get_transaction_by_hash(txn_hash)
-
-                # Check the log data from the executing transaction and log it.
-                execution_logs = CallLib(None, self.blockchain_client).CallExecuted.get_transaction_logs(txn_hash)
-                execution_data = tuple((
-                    CallLib(None, self.blockchain_client).CallExecuted.get_log_data(log) for log in execution_logs
-                ))
-                abort_logs = CallLib(None, self.blockchain_client).CallAborted.get_transaction_logs(txn_hash)
-                abort_data = tuple((
-                    CallLib(None, self.blockchain_client).CallAborted.get_log_data(log) for log in abort_logs
-                ))
-
-                for entry in execution_data:
-                    self.logger.info("Event:CallExecuted: %s", str(entry))
-                for entry in abort_data:
-                    self.logger.warning("Event:CallAborted: %s", str(entry))
+                self.log_execution_events(txn_hash)
                 break
 
-    def execute_async(self):
+    #
+    # Prepared Execution
+    #
+    @property
+    def is_armed(self):
+        """
+        Whether a prepared execute transaction is waiting to be sent.
+        """
+        return self._prepared_execution is not None and self._fired_txn_hash is None
+
+    @property
+    def has_sent_execution(self):
+        return self._fired_txn_hash is not None
+
+    def arm_execution(self):
+        """
+        Build (and if possible sign) the execute transaction ahead of the
+        call window and send it from the block sage's thread the moment the
+        block before the target block is seen.  Returns whether the
+        execution was armed.
+        """
+        if not self.should_call_on_block(self.target_block):
+            self.logger.debug("Not authorized at the target block.  Not preparing execution")
+            return False
+
+        self._prepared_execution = self.transaction_preparer.prepare(
+            to=self.call_address,
+            data=self.call.execute.get_call_data(()),
+            gas=self.get_execution_gas(),
+            gas_price=self.gas_price,
+        )
+        self.logger.info("Prepared execution for block %s", self.target_block)
+        if self.execution_planner is None:
+            self._armed_block_sage = self.block_sage
+            self._armed_block_sage.on_new_block(self.on_new_block)
+        return True
+
+    def disarm_execution(self):
+        if self._armed_block_sage is not None:
+            self._armed_block_sage.remove_callback(self.on_new_block)
+            self._armed_block_sage = None
+        with self._fire_lock:
+            if self._prepared_execution is not None:
+                self._prepared_execution.discard()
+                self._prepared_execution = None
+
+    def reset_execution(self):
+        """
+        Forget any execution sent by an earlier attempt so that a new one is
+        prepared and sent.
+        """
+        self.disarm_execution()
+        with self._fire_lock:
+            self._fired_txn_hash = None
+            self._fired_execution_gas = None
+
+    def on_new_block(self, block_number, block):
+        if block_number >= self.target_block - 1:
+            self.fire_execution(block_number)
+
+    def fire_execution(self, block_number):
+        """
+        Send the prepared execute transaction unless it has already been
+        sent.  If it cannot be sent the call loop falls back to executing
+        the call itself.
+        """
+        with self._fire_lock:
+            if not self.is_armed:
+                return
+            try:
+                txn_hash = self._prepared_execution.send()
+            except Exception as e:
+                self.logger.error("Unable to send prepared execution: %s", e)
+                self._prepared_execution = None
+                return
+            self.logger.info("Sent prepared execution %s at block %s", txn_hash, block_number)
+            self._fired_txn_hash = txn_hash
+            self._fired_execution_gas = int(self._prepared_execution.transaction['gas'], 16)
+
+    def submit_execution(self, block_number, execution_gas=None):
+        """
+        Send the execute transaction for the block after `block_number`,
+        using the prepared transaction if there is one.  Returns the
+        transaction hash or `None` if it could not be sent.
+        """
+        if self.is_armed:
+            self.fire_execution(block_number)
+
+        with self._fire_lock:
+            if self.has_sent_execution:
+                return self._fired_txn_hash
+            if execution_gas is None:
+                execution_gas = self.get_execution_gas()
+            self.logger.info("Attempting to execute call")
+            try:
+                txn_hash = self.call.execute(gas=execution_gas)
+            except Exception as e:
+                self.logger.error("Unable to send execution: %s", e)
+                return None
+            self._fired_txn_hash = txn_hash
+            self._fired_execution_gas = execution_gas
+            return txn_hash
+
+    def log_execution_events(self, txn_hash):
+        # Check the log data from the executing transaction and log it.
+        execution_logs = CallLib(None, self.blockchain_client).CallExecuted.get_transaction_logs(txn_hash)
+        execution_data = tuple((
+            CallLib(None, self.blockchain_client).CallExecuted.get_log_data(log) for log in execution_logs
+        ))
+        abort_logs = CallLib(None, self.blockchain_client).CallAborted.get_transaction_logs(txn_hash)
+        abort_data = tuple((
+            CallLib(None, self.blockchain_client).CallAborted.get_log_data(log) for log in abort_logs
+        ))
+
+        for entry in execution_data:
+            self.logger.info("Event:CallExecuted: %s", str(entry))
+        for entry in abort_data:
+            self.logger.warning("Event:CallAborted: %s", str(entry))
+
+    def execute_async(self, engine=None, worker_pool=None):
+        """
+        Execute the call in the background, either as a task on the provided
+        `ExecutionEngine` or `WorkerPool`, or on its own thread.  Returns
+        `None` if the worker pool rejected the call.
+        """
         self._run = True
-        self._thread = threading.Thread(target=self.execute)
-        self._thread.daemon = True
-        self._thread.start()
+        if engine is not None:
+            self._task = engine.spawn(
+                self.execute_steps(),
+                name='call-{0}'.format(self.call_address),
+            )
+        elif worker_pool is not None:
+            # Calls with the earliest target block are executed first.  The
+            # call only holds a worker while it is not waiting for a block.
+            self._task = worker_pool.spawn(
+                self.execute_steps(),
+                priority=self.target_block,
+                name='call-{0}'.format(self.call_address),
+            )
+        else:
+            self._task = threading.Thread(target=self.execute)
+            self._task.daemon = True
+            self._task.start()
+        return self._task
 
-    def wait_for_call_window(self, buffer=2):
+    def wait_for_call_window(self, buffer=2, percentile=None):
         """
         wait for self.target_block - buffer (~30 seconds at 2 blocks)
+
+        Unless the block arrives first, the wait is re-checked after the
+        estimated time to the block, or after the given `percentile` (50-99)
+        of that estimate so that a high percentile avoids checking back
+        before the block when blocks are coming slowly.
+        """
+        run_steps(self.wait_for_call_window_steps(buffer, percentile))
+
+    def wait_for_call_window_steps(self, buffer=2, percentile=None):
+        """
+        Step generator form of `wait_for_call_window`.
         """
         if self.block_sage.current_block_number > self.last_block:
             raise ValueError("Already passed call execution window")
@@ -201,9 +627,12 @@ class CallContract(object):
                 self.block_sage.current_block_number < self.target_block - buffer
             )
             if not is_killed and is_before_buffer:
-                time.sleep(
-                    self.block_sage.estimated_time_to_block(
+                yield WaitForBlock(
+                    self.block_sage,
+                    self.target_block - buffer,
+                    timeout=self.block_sage.estimated_time_to_block(
                         self.target_block - buffer,
+                        percentile=percentile,
                     ),
                 )
             else:
@@ -221,7 +650,21 @@ class CallContract(object):
         """
         The account balance of the scheduler for this call.
         """
-        return self.blockchain_client.get_balance(self.call_address)
+        if self.balance_tracker is not None:
+            return self.balance_tracker.get_balance(self.call_address)
+        balance = self.get_loaded_value('balance')
+        if balance is empty:
+            return self.blockchain_client.get_balance(self.call_address)
+        return balance
+
+    @property
+    def gas_price(self):
+        if self.gas_price_oracle is not None:
+            return self.gas_price_oracle.gas_price
+        gas_price = self.get_loaded_value('gas_price')
+        if gas_price is empty:
+            return self.blockchain_client.get_gas_price()
+        return gas_price
 
     @cached_property
     def last_block(self):
@@ -230,13 +673,53 @@ class CallContract(object):
         """
         return self.target_block + self.grace_period
 
-    @cached_property
+    @property
     def is_designated(self):
-        return self.call.claimer != EMPTY_ADDRESS
+        return self.claimer is not None
 
     def can_call_at_block(self, block_number):
         return self.call.checkExecutionAuthorization(self.coinbase, block_number)
 
+    # The schedule of blocks this client may execute the call on.  `False`
+    # once the schedule failed verification against the contract, in which
+    # case authorization is checked with the contract for each block.
+    _authorization_schedule = None
+
+    def get_authorization_schedule(self):
+        """
+        Return the `AuthorizationSchedule` for this client, or `None` if it
+        cannot be relied upon.  The schedule is built and checked against
+        `checkExecutionAuthorization` once the claimer can no longer change.
+        """
+        if self._authorization_schedule is not None:
+            return self._authorization_schedule or None
+        if self.block_sage.current_block_number <= self.last_claimable_block:
+            return None
+
+        schedule = AuthorizationSchedule(
+            target_block=self.target_block,
+            last_block=self.last_block,
+            claimer=self.claimer,
+            executor=self.coinbase,
+        )
+        if schedule.is_designated:
+            # Check that the contract agrees with the schedule on either side
+            # of the end of the blocks the claimer has to itself.
+            last_exclusive_block = self.target_block + CLAIMER_EXCLUSIVE_BLOCKS - 1
+            for block_number in (last_exclusive_block, last_exclusive_block + 1):
+                is_authorized = self.can_call_at_block(block_number)
+                if is_authorized != schedule.is_authorized(block_number):
+                    self.logger.warning(
+                        "Authorization schedule %s does not match contract at block "
+                        "%s.  Checking each block with the contract.", schedule, block_number,
+                    )
+                    self._authorization_schedule = False
+                    return None
+
+        self.logger.debug("Built authorization schedule: %s", schedule)
+        self._authorization_schedule = schedule
+        return schedule
+
     def should_call_on_block(self, block_number):
         """
         Return whether an attempt to execute this call should be made on the
@@ -250,6 +733,10 @@ class CallContract(object):
         if block_number > self.last_block:
             return False
 
+        schedule = self.get_authorization_schedule()
+        if schedule is not None:
+            return schedule.is_authorized(block_number)
+
         if not self.is_designated:
             return True
 
@@ -264,17 +751,17 @@ class CallContract(object):
     #
     @cached_property
     def contract_address(self):
-        return self.call.contractAddress()
+        return self.read('contractAddress')
 
     @cached_property
     def scheduler_address(self):
-        return self.call.schedulerAddress()
+        return self.read('schedulerAddress')
 
     # The amount of gas to send with the claiming transaction.
     CLAIM_GAS = 500000
 
     # The cost in gas to claim the call.
-    CLAIM_GAS_COST = 100000
+    CLAIM_GAS_COST = CLAIM_GAS_COST
 
     def claim(self, **kwargs):
         kwargs.setdefault('value', 2 * self.base_payment)
@@ -283,63 +770,63 @@ class CallContract(object):
 
     @cache_once(None)
     def claimer(self):
-        _claimer = self.call.claimer()
+        _claimer = self.read('claimer')
         if _claimer == '0x0000000000000000000000000000000000000000':
             return None
         return _claimer
 
     @cache_once(0)
     def claimer_deposit(self):
-        return self.call.claimerDeposit()
+        return self.read('claimerDeposit')
 
     @cache_once(0)
     def claim_amount(self):
-        return self.call.claimAmount()
+        return self.read('claimAmount')
 
     @cached_property
     def target_block(self):
-        return self.call.targetBlock()
+        return self.read('targetBlock')
 
     @cached_property
     def grace_period(self):
-        return self.call.gracePeriod()
+        return self.read('gracePeriod')
 
     @cached_property
     def call_value(self):
-        return self.call.callValue()
+        return self.read('callValue')
 
     @cached_property
     def anchor_gas_price(self):
-        return self.call.anchorGasPrice()
+        return self.read('anchorGasPrice')
 
     @cached_property
     def required_gas(self):
-        return self.call.requiredGas()
+        return self.read('requiredGas')
 
     @cached_property
     def required_stack_depth(self):
-        return self.call.requiredStackDepth()
+        return self.read('requiredStackDepth')
 
     @cached_property
     def base_payment(self):
-        return self.call.basePayment()
+        return self.read('basePayment')
 
     @cached_property
     def base_donation(self):
-        return self.call.baseDonation()
+        return self.read('baseDonation')
 
     @cached_property
     def abi_signature(self):
-        return self.call.abiSignature()
+        return self.read('abiSignature')
 
     @cache_once(False)
     def was_successful(self):
-        return self.call.wasSuccessful()
+        return self.read('wasSuccessful')
 
     @cache_once(False)
     def was_called(self):
-        return self.call.wasCalled()
+        return self.read('wasCalled')
 
     @cache_once(False)
     def is_cancelled(self):
-        return self.call.isCancelled()
+        return self.read('isCancelled')
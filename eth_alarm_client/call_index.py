@@ -0,0 +1,69 @@
+import bisect
+import itertools
+import threading
+
+
+class CallIndex(object):
+    """
+    Index of known upcoming calls sorted by target block.
+
+    Calls sharing a target block are kept in the order they were added, which
+    matches the order in which they are enumerated from the scheduler.
+    """
+    # The highest block number that has been scanned for calls.
+    scanned_through = None
+
+    def __init__(self):
+        self._entries = []
+        self._target_blocks = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._target_blocks)
+
+    def __contains__(self, call_address):
+        return call_address in self._target_blocks
+
+    def add(self, call_address, target_block):
+        with self._lock:
+            if call_address in self._target_blocks:
+                return False
+            bisect.insort(self._entries, (target_block, next(self._counter), call_address))
+            self._target_blocks[call_address] = target_block
+            return True
+
+    def discard(self, call_address):
+        with self._lock:
+            target_block = self._target_blocks.pop(call_address, None)
+            if target_block is None:
+                return
+            self._entries = [
+                entry for entry in self._entries if entry[2] != call_address
+            ]
+
+    def prune(self, left_block):
+        """
+        Remove all calls with a target block before `left_block`, returning
+        their addresses.
+        """
+        with self._lock:
+            idx = bisect.bisect_left(self._entries, (left_block,))
+            pruned = [call_address for _, _, call_address in self._entries[:idx]]
+            for call_address in pruned:
+                self._target_blocks.pop(call_address, None)
+            del self._entries[:idx]
+            return pruned
+
+    def get_target_block(self, call_address):
+        return self._target_blocks.get(call_address)
+
+    def get_calls(self, left_block, right_block):
+        """
+        Return the addresses of the indexed calls with a target block within
+        the inclusive range.
+        """
+        with self._lock:
+            left = bisect.bisect_left(self._entries, (left_block,))
+            right = bisect.bisect_left(self._entries, (right_block + 1,))
+            return [call_address for _, _, call_address in self._entries[left:right]]
@@ -0,0 +1,127 @@
+import json
+import sqlite3
+import threading
+
+from ethereum.utils import (
+    decode_hex,
+    encode_hex,
+)
+
+
+# Getters which return raw bytes that need to be hex encoded to be stored.
+BINARY_GETTERS = (
+    'abiSignature',
+)
+
+
+class CallStore(object):
+    """
+    Persistent sqlite backed store of the call data that never changes once a
+    call has been scheduled.
+
+    Every call contract runs the same code so entries are instead keyed by
+    the hash of the chain's genesis block and the address of the scheduler,
+    both of which are fetched once up front, so that data stored for one
+    chain or scheduler is never served for another.  A development chain
+    which is reset with the same genesis block should use a fresh store.
+    """
+    def __init__(self, path, genesis_hash, scheduler_address):
+        self.path = path
+        self.genesis_hash = genesis_hash
+        self.scheduler_address = scheduler_address
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS call_data ("
+                "genesis_hash TEXT NOT NULL, "
+                "scheduler_address TEXT NOT NULL, "
+                "call_address TEXT NOT NULL, "
+                "getter TEXT NOT NULL, "
+                "value TEXT NOT NULL, "
+                "PRIMARY KEY (genesis_hash, scheduler_address, call_address, getter))"
+            )
+            self._connection.commit()
+
+    def get_call_data(self, call_address):
+        """
+        Return a dictionary of getter name to value for all of the stored
+        data for the call.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT getter, value FROM call_data "
+                "WHERE genesis_hash = ? AND scheduler_address = ? AND call_address = ?",
+                (self.genesis_hash, self.scheduler_address, call_address),
+            ).fetchall()
+
+        call_data = {}
+        for getter, value in rows:
+            value = json.loads(value)
+            if getter in BINARY_GETTERS:
+                value = decode_hex(value)
+            call_data[str(getter)] = value
+        return call_data
+
+    def set_call_data(self, call_address, call_data):
+        """
+        Store the dictionary of getter name to value for the call.
+        """
+        self.set_many_call_data({call_address: call_data})
+
+    def set_many_call_data(self, call_data_by_address):
+        """
+        Store the call data of several calls, given as a dictionary of call
+        address to the dictionary of getter name to value, in a single
+        transaction.
+        """
+        rows = []
+        for call_address, call_data in call_data_by_address.items():
+            for getter, value in call_data.items():
+                if getter in BINARY_GETTERS:
+                    value = encode_hex(value)
+                rows.append((
+                    self.genesis_hash,
+                    self.scheduler_address,
+                    call_address,
+                    getter,
+                    json.dumps(value),
+                ))
+
+        if not rows:
+            return
+
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO call_data "
+                "(genesis_hash, scheduler_address, call_address, getter, value) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._connection.commit()
+
+    def delete_call_data(self, call_address):
+        self.delete_many_call_data([call_address])
+
+    def delete_many_call_data(self, call_addresses):
+        """
+        Remove the stored data of each of the calls in a single transaction.
+        """
+        rows = [
+            (self.genesis_hash, self.scheduler_address, call_address)
+            for call_address in call_addresses
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            self._connection.executemany(
+                "DELETE FROM call_data "
+                "WHERE genesis_hash = ? AND scheduler_address = ? AND call_address = ?",
+                rows,
+            )
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,151 @@
+"""
+Claim economics for scheduled calls.
+
+A call can be claimed during the 255 blocks that end 10 blocks before its
+target block.  The payment the claimer is promised grows linearly over the
+first 240 blocks of that window from nothing to the full base payment.  Once
+claimed, only the claimer may execute the call during the first 16 blocks
+of its call window, after which anyone may.
+"""
+# The number of blocks in the claim window.
+CLAIM_WINDOW_SIZE = 255
+
+# The number of blocks before the target block that the claim window ends.
+CLAIM_WINDOW_OFFSET = 10
+
+# The payment for claiming on each block of the claim window, as a multiple of
+# `1 / CLAIM_CURVE_DENOMINATOR` of the base payment.
+CLAIM_CURVE_DENOMINATOR = 240
+CLAIM_CURVE = tuple(
+    min(n, CLAIM_CURVE_DENOMINATOR) for n in range(CLAIM_WINDOW_SIZE)
+)
+
+# The cost in gas to claim a call.
+CLAIM_GAS_COST = 100000
+
+# The number of blocks at the start of the call window during which only the
+# claimer may execute a claimed call.
+CLAIMER_EXCLUSIVE_BLOCKS = 16
+
+
+def get_claim_value(base_payment, claim_offset):
+    """
+    Return the payment for claiming a call `claim_offset` blocks into its
+    claim window.
+    """
+    if claim_offset < 0:
+        return 0
+    if claim_offset >= CLAIM_WINDOW_SIZE:
+        return base_payment
+    return base_payment * CLAIM_CURVE[claim_offset] // CLAIM_CURVE_DENOMINATOR
+
+
+def get_first_profitable_claim_offset(base_payment, claim_cost):
+    """
+    Return the first block of the claim window, as an offset from its start,
+    on which the payment for claiming a call covers the cost of the claim.
+    """
+    if base_payment <= 0:
+        return CLAIM_CURVE_DENOMINATOR
+    # Ceiling division of the cost into 240ths of the base payment.
+    offset = -(-claim_cost * CLAIM_CURVE_DENOMINATOR // base_payment)
+    return min(CLAIM_CURVE_DENOMINATOR, offset)
+
+
+class ClaimOption(object):
+    """
+    The value of claiming a single call on a given block.
+    """
+    def __init__(self, call_contract, block_number, claim_value, claim_cost,
+                 first_profitable_block):
+        self.call_contract = call_contract
+        self.block_number = block_number
+        self.claim_value = claim_value
+        self.claim_cost = claim_cost
+        self.first_profitable_block = first_profitable_block
+
+    @property
+    def claim_offset(self):
+        return self.block_number - self.call_contract.first_claimable_block
+
+    @property
+    def profit(self):
+        return self.claim_value - self.claim_cost
+
+    @property
+    def is_profitable(self):
+        return self.block_number >= self.first_profitable_block
+
+    def __repr__(self):
+        return "ClaimOption({0}, block={1}, profit={2})".format(
+            self.call_contract.call_address,
+            self.block_number,
+            self.profit,
+        )
+
+
+def plan_claims(call_contracts, block_number, gas_price, claim_gas_cost=CLAIM_GAS_COST):
+    """
+    Return a `ClaimOption` for claiming each of the provided calls on
+    `block_number`, ranked with the profitable claims first.  Profitable
+    claims are ordered by profit and then by which claim window closes first.
+
+    The gas price is looked up once by the caller for the whole block rather
+    than once per call.
+    """
+    claim_cost = claim_gas_cost * gas_price
+
+    options = []
+    for call_contract in call_contracts:
+        base_payment = call_contract.base_payment
+        first_claimable_block = call_contract.first_claimable_block
+        options.append(ClaimOption(
+            call_contract=call_contract,
+            block_number=block_number,
+            claim_value=get_claim_value(base_payment, block_number - first_claimable_block),
+            claim_cost=claim_cost,
+            first_profitable_block=first_claimable_block + get_first_profitable_claim_offset(
+                base_payment, claim_cost,
+            ),
+        ))
+
+    return sorted(options, key=lambda option: (
+        not option.is_profitable,
+        -option.profit,
+        option.call_contract.last_claimable_block,
+    ))
+
+
+class AuthorizationSchedule(object):
+    """
+    Which blocks of a call's window `executor` is allowed to execute the call
+    on, as `checkExecutionAuthorization` would report them.
+
+    The claimer of a call cannot change once its claim window has closed, so
+    the schedule only needs to be built once per call.
+    """
+    def __init__(self, target_block, last_block, claimer, executor):
+        self.target_block = target_block
+        self.last_block = last_block
+        self.claimer = claimer
+        self.executor = executor
+
+    @property
+    def is_designated(self):
+        return self.claimer is not None
+
+    @property
+    def first_authorized_block(self):
+        if not self.is_designated or self.claimer.lower() == self.executor.lower():
+            return self.target_block
+        return self.target_block + CLAIMER_EXCLUSIVE_BLOCKS
+
+    def is_authorized(self, block_number):
+        return self.first_authorized_block <= block_number <= self.last_block
+
+    def __repr__(self):
+        return "AuthorizationSchedule({0}-{1}, claimer={2})".format(
+            self.first_authorized_block,
+            self.last_block,
+            self.claimer,
+        )
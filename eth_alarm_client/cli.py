@@ -13,7 +13,27 @@ from eth_alarm_client import (
     BlockSage,
     Scheduler,
 )
+from eth_alarm_client.block_time import ESTIMATORS as BLOCK_TIME_ESTIMATORS
+from eth_alarm_client.call_store import CallStore
 from eth_alarm_client.contracts import contract_json
+from eth_alarm_client.engine import ExecutionEngine
+from eth_alarm_client.execution import (
+    LocalSigner,
+    TransactionPreparer,
+)
+from eth_alarm_client.gas_price import GasPriceOracle
+from eth_alarm_client.instrumentation import (
+    InstrumentedClient,
+    RPCStatsReporter,
+)
+from eth_alarm_client.metrics import MetricsServer
+from eth_alarm_client.multinode import MultiNodeClient
+from eth_alarm_client.nonces import NonceManagedClient
+from eth_alarm_client.pool import WorkerPool
+from eth_alarm_client.transport import (
+    PooledIPCClient,
+    PooledRPCClient,
+)
 
 
 DEFAULT_ADDRESS = '0x6c8f2a135f6ed072de4503bd7c4999a1a17f824b'
@@ -23,6 +43,22 @@ def get_contract(contract_name):
     return Contract(contract_json[contract_name], contract_name)
 
 
+def get_endpoint_client(endpoint, pool_size):
+    """
+    Return a client for an endpoint given either as `http://host:port` or as
+    the path to an IPC socket.
+    """
+    if endpoint.startswith('http://'):
+        host, _, port = endpoint[len('http://'):].rstrip('/').partition(':')
+        port = port or '8545'
+        if pool_size:
+            return PooledRPCClient(host=host, port=port, pool_size=pool_size)
+        return RPCClient(host=host, port=port)
+    elif pool_size:
+        return PooledIPCClient(ipc_path=endpoint, pool_size=pool_size)
+    return IPCClient(ipc_path=endpoint)
+
+
 @click.group()
 def main():
     pass
@@ -61,18 +97,217 @@ def main():
     type=click.Path(exists=True, dir_okay=False),
     help="The RPC Port",
 )
-def scheduler(address, client, rpchost, rpcport, ipcpath):
+@click.option(
+    '--batch-rpc/--no-batch-rpc',
+    default=False,
+    help="Whether contract reads should be sent as batched JSON-RPC requests.",
+)
+@click.option(
+    '--executor',
+    '-e',
+    default='threads',
+    type=click.Choice(['threads', 'engine']),
+    help=(
+        "Whether call executions and claims each run on their own thread or "
+        "are all run cooperatively by a single execution engine.  The engine "
+        "makes every request from its one thread so it is best suited to a "
+        "low latency node."
+    ),
+)
+@click.option(
+    '--workers',
+    '-w',
+    default=0,
+    type=int,
+    help=(
+        "The number of worker threads used for claims and executions when "
+        "using the `threads` executor.  When 0 every claim and execution gets "
+        "its own thread."
+    ),
+)
+@click.option(
+    '--queue-depth',
+    default=100,
+    type=int,
+    help="The maximum number of claims and executions waiting for a worker.",
+)
+@click.option(
+    '--block-mode',
+    default='poll',
+    type=click.Choice(['poll', 'filter']),
+    help=(
+        "Whether new blocks are found by periodically polling the block "
+        "number or by watching a block filter."
+    ),
+)
+@click.option(
+    '--call-store',
+    default=None,
+    type=click.Path(dir_okay=False),
+    help=(
+        "Path to a sqlite database used to persist call data that never "
+        "changes so that it does not need to be fetched again on restart."
+    ),
+)
+@click.option(
+    '--rpc-stats-interval',
+    default=0,
+    type=int,
+    help=(
+        "How often in seconds to log a summary of the requests made to the "
+        "node by each part of the client.  Disabled when 0."
+    ),
+)
+@click.option(
+    '--metrics-port',
+    default=0,
+    type=int,
+    help=(
+        "Serve Prometheus metrics for the scheduler at /metrics on this "
+        "port.  Disabled when 0."
+    ),
+)
+@click.option(
+    '--metrics-host',
+    default='127.0.0.1',
+    help="The interface to serve metrics on.",
+)
+@click.option(
+    '--pool-size',
+    default=0,
+    type=int,
+    help=(
+        "The number of persistent connections to the node shared by all "
+        "threads.  When 0 a single connection is used and requests are made "
+        "one at a time."
+    ),
+)
+@click.option(
+    '--endpoint',
+    'endpoints',
+    multiple=True,
+    help=(
+        "A node to connect to, either as `http://host:port` or the path to an "
+        "IPC socket.  May be given more than once, in which case reads go to "
+        "the fastest node that is in sync and transactions are sent to all "
+        "of them.  Overrides `--client`."
+    ),
+)
+@click.option(
+    '--gas-price-percentile',
+    default=None,
+    type=click.IntRange(0, 100),
+    help=(
+        "Estimate the gas price as this percentile of the gas prices paid in "
+        "recent blocks rather than using the node's gas price."
+    ),
+)
+@click.option(
+    '--manage-nonces/--no-manage-nonces',
+    default=False,
+    help=(
+        "Assign transaction nonces locally rather than leaving it to the "
+        "node so that many claims and executions can be sent at once."
+    ),
+)
+@click.option(
+    '--prepare-executions/--no-prepare-executions',
+    default=False,
+    help=(
+        "Build each execute transaction ahead of the call window and send it "
+        "as soon as the block before the target block is seen."
+    ),
+)
+@click.option(
+    '--private-key-file',
+    default=None,
+    type=click.File('r'),
+    help=(
+        "File containing the hex encoded private key of the coinbase account. "
+        "Prepared execute transactions are signed with it ahead of time.  "
+        "Implies `--prepare-executions` and `--manage-nonces`."
+    ),
+)
+@click.option(
+    '--block-time-estimator',
+    default='ewma',
+    type=click.Choice(sorted(BLOCK_TIME_ESTIMATORS.keys())),
+    help=(
+        "How the time between blocks is estimated: a moving average, the "
+        "median of recent blocks, or a moving average for each hour of the day."
+    ),
+)
+@click.option(
+    '--wake-percentile',
+    default=None,
+    type=click.IntRange(50, 99),
+    help=(
+        "Percentile (50-99) of the estimated time to a call's window after "
+        "which the call checks back, rather than after the average estimate."
+    ),
+)
+def scheduler(address, client, rpchost, rpcport, ipcpath, batch_rpc, executor, workers,
+              queue_depth, block_mode, call_store, rpc_stats_interval, metrics_port,
+              metrics_host, pool_size, endpoints, gas_price_percentile, manage_nonces,
+              prepare_executions, private_key_file, block_time_estimator, wake_percentile):
     """
     Run the call scheduler.
     """
-    if client == 'ipc':
+    multi_node_client = None
+
+    if len(endpoints) > 1:
+        multi_node_client = MultiNodeClient(
+            [get_endpoint_client(endpoint, pool_size) for endpoint in endpoints],
+            names=endpoints,
+        )
+        blockchain_client = multi_node_client
+    elif endpoints:
+        blockchain_client = get_endpoint_client(endpoints[0], pool_size)
+    elif client == 'ipc' and pool_size:
+        blockchain_client = PooledIPCClient(ipc_path=ipcpath, pool_size=pool_size)
+    elif client == 'ipc':
         blockchain_client = IPCClient(ipc_path=ipcpath)
+    elif client == 'rpc' and pool_size:
+        blockchain_client = PooledRPCClient(host=rpchost, port=rpcport, pool_size=pool_size)
     elif client == 'rpc':
         blockchain_client = RPCClient(host=rpchost, port=rpcport)
 
+    if private_key_file is not None:
+        signer = LocalSigner(private_key_file.read().strip())
+        coinbase = blockchain_client.get_coinbase().lower()
+        if signer.address != coinbase:
+            raise click.ClickException(
+                "The private key is for {0} rather than the coinbase account {1}".format(
+                    signer.address, coinbase,
+                )
+            )
+        prepare_executions = manage_nonces = True
+    else:
+        signer = None
+
+    if manage_nonces:
+        nonce_managed_client = NonceManagedClient(blockchain_client)
+        blockchain_client = nonce_managed_client
+    else:
+        nonce_managed_client = None
+
+    rpc_stats = None
+    rpc_stats_reporter = None
+
+    if rpc_stats_interval or metrics_port:
+        instrumented_client = InstrumentedClient(blockchain_client)
+        rpc_stats = instrumented_client.stats
+        if rpc_stats_interval:
+            rpc_stats_reporter = RPCStatsReporter(rpc_stats, interval=rpc_stats_interval)
+        scheduler_client = instrumented_client.subsystem('scheduler')
+        call_client = instrumented_client.subsystem('calls')
+        block_sage_client = instrumented_client.subsystem('blocksage')
+    else:
+        scheduler_client = call_client = block_sage_client = blockchain_client
+
     SchedulerContract = get_contract('Scheduler')
 
-    scheduler_contract = SchedulerContract(address, blockchain_client)
+    scheduler_contract = SchedulerContract(address, scheduler_client)
     try:
         api_version = scheduler_contract.callAPIVersion()
         if api_version != 7:
@@ -86,8 +321,68 @@ def scheduler(address, client, rpchost, rpcport, ipcpath):
             "running the client against a test network".format(address)
         )
 
-    block_sage = BlockSage(blockchain_client)
-    scheduler = Scheduler(scheduler_contract, block_sage=block_sage)
+    if executor == 'engine':
+        engine = ExecutionEngine()
+    else:
+        engine = None
+
+    if executor == 'threads' and workers > 0:
+        worker_pool = WorkerPool(size=workers, max_queue=queue_depth)
+    else:
+        worker_pool = None
+
+    if call_store is not None:
+        call_store = CallStore(
+            call_store,
+            genesis_hash=blockchain_client.get_block_by_number(0, False)['hash'],
+            scheduler_address=address,
+        )
+
+    block_sage = BlockSage(
+        block_sage_client,
+        mode=block_mode,
+        block_time_estimator=BLOCK_TIME_ESTIMATORS[block_time_estimator](),
+    )
+
+    if prepare_executions:
+        transaction_preparer = TransactionPreparer(
+            call_client,
+            signer=signer,
+            nonce_manager=(
+                nonce_managed_client.get_nonce_manager(signer.address) if signer else None
+            ),
+        )
+    else:
+        transaction_preparer = None
+    gas_price_oracle = GasPriceOracle(
+        call_client,
+        block_sage,
+        percentile=gas_price_percentile,
+    )
+    scheduler = Scheduler(
+        scheduler_contract,
+        block_sage=block_sage,
+        batch_rpc=batch_rpc,
+        engine=engine,
+        worker_pool=worker_pool,
+        call_store=call_store,
+        call_client=call_client,
+        gas_price_oracle=gas_price_oracle,
+        transaction_preparer=transaction_preparer,
+        wake_percentile=wake_percentile,
+    )
+    if nonce_managed_client is not None:
+        scheduler.on_new_block(nonce_managed_client.on_new_block)
+
+    if metrics_port:
+        metrics_server = MetricsServer(
+            scheduler,
+            port=metrics_port,
+            host=metrics_host,
+            rpc_stats=rpc_stats,
+        )
+    else:
+        metrics_server = None
 
     scheduler.monitor_async()
 
@@ -100,6 +395,16 @@ def scheduler(address, client, rpchost, rpcport, ipcpath):
         scheduler.block_sage.stop()
         for scheduled_call in scheduler.active_calls.values():
             scheduled_call.stop()
+        if engine is not None:
+            engine.stop()
+        if worker_pool is not None:
+            worker_pool.stop()
+        if rpc_stats_reporter is not None:
+            rpc_stats_reporter.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
+        if multi_node_client is not None:
+            multi_node_client.stop()
         scheduler._thread.join(5)
 
 
@@ -17,3 +17,7 @@ FutureBlockCall = Contract(future_block_call_meta, "FutureBlockCall")
 
 call_lib_meta = contract_json['CallLib']
 CallLib = Contract(call_lib_meta, "CallLib")
+
+
+scheduler_lib_meta = contract_json['SchedulerLib']
+SchedulerLib = Contract(scheduler_lib_meta, "SchedulerLib")
@@ -0,0 +1,67 @@
+from .contracts import SchedulerLib
+from .utils import get_logger
+
+
+class LogCallDiscovery(object):
+    """
+    Discovers calls as they are registered with the scheduler by reading the
+    `CallScheduled` logs emitted by the scheduler contract rather than
+    walking its call tree.
+
+    Logs are read starting from `from_block` and each lookup only reads the
+    blocks since the last.
+    """
+    # The maximum number of blocks covered by a single `eth_getLogs` request.
+    LOG_CHUNK_SIZE = 5000
+
+    def __init__(self, scheduler_address, blockchain_client, from_block=0, logger=None):
+        if logger is None:
+            logger = get_logger('discovery')
+        self.logger = logger
+        self.scheduler_address = scheduler_address
+        self.blockchain_client = blockchain_client
+        self.call_scheduled = SchedulerLib(
+            scheduler_address, blockchain_client,
+        ).CallScheduled
+
+        # The next block that has not yet been scanned for logs.
+        self.next_block = from_block
+
+    @property
+    def topic(self):
+        """
+        The `CallScheduled` topic zero padded to 32 bytes as nodes expect for
+        log filters.
+        """
+        return '0x' + self.call_scheduled.event_topic[2:].zfill(64)
+
+    def get_logs(self, from_block, to_block):
+        return self.blockchain_client.get_logs(
+            from_block=hex(from_block),
+            to_block=hex(to_block),
+            address=self.scheduler_address,
+            topics=[self.topic],
+        )
+
+    def get_new_calls(self, to_block):
+        """
+        Return the addresses of all calls registered between the last scanned
+        block and `to_block` inclusive, in the order they were registered.
+        """
+        call_addresses = []
+
+        while self.next_block <= to_block:
+            chunk_end = min(to_block, self.next_block + self.LOG_CHUNK_SIZE - 1)
+            self.logger.debug(
+                "Fetching call registrations between %s-%s",
+                self.next_block,
+                chunk_end,
+            )
+            for log_entry in self.get_logs(self.next_block, chunk_end) or []:
+                if log_entry.get('removed'):
+                    continue
+                log_data = self.call_scheduled.get_log_data(log_entry)
+                call_addresses.append(log_data['call_address'])
+            self.next_block = chunk_end + 1
+
+        return call_addresses
@@ -0,0 +1,250 @@
+import heapq
+import itertools
+import threading
+import time
+
+from .utils import get_logger
+
+
+# How often in seconds a receipt from a `ReceiptWatcher` is checked for.
+RECEIPT_CHECK_INTERVAL = 0.25
+
+
+class WaitForBlock(object):
+    """
+    Yielded by a step generator to be resumed once `block_sage` has seen
+    `block_number`, or after `timeout` seconds, whichever comes first.
+    """
+    def __init__(self, block_sage, block_number, timeout):
+        self.block_sage = block_sage
+        self.block_number = block_number
+        self.timeout = timeout
+
+
+def run_steps(steps):
+    """
+    Drive a step generator to completion on the current thread, sleeping for
+    the number of seconds yielded by each step or until the block it is
+    waiting for arrives.
+    """
+    for step in steps:
+        if isinstance(step, WaitForBlock):
+            step.block_sage.wait_for_block(step.block_number, step.timeout)
+        elif step:
+            time.sleep(step)
+
+
+def wait_for_receipt_steps(blockchain_client, txn_hash, receipts, max_wait=60, poll_interval=5,
+                           receipt_watcher=None):
+    """
+    Step generator equivalent of `blockchain_client.wait_for_transaction`.  The
+    receipt is stored in `receipts[txn_hash]` once it is available.
+
+    When a `ReceiptWatcher` is provided the receipt is looked up by the
+    watcher and only checked for locally.
+    """
+    start = time.time()
+    if receipt_watcher is not None:
+        pending_receipt = receipt_watcher.watch(txn_hash)
+        while not pending_receipt.is_ready:
+            if time.time() > start + max_wait:
+                receipt_watcher.unwatch(txn_hash)
+                raise ValueError("Could not get transaction receipt")
+            yield RECEIPT_CHECK_INTERVAL
+        receipts[txn_hash] = pending_receipt.receipt
+        return
+
+    while True:
+        txn_receipt = blockchain_client.get_transaction_receipt(txn_hash)
+        if txn_receipt is not None:
+            break
+        elif time.time() > start + max_wait:
+            raise ValueError("Could not get transaction receipt")
+        yield poll_interval
+    receipts[txn_hash] = txn_receipt
+
+
+class Task(object):
+    """
+    A step generator scheduled on an `ExecutionEngine`.  Mirrors the parts of
+    the `threading.Thread` API that are used to track call executions.
+    """
+    exception = None
+
+    # Incremented each time the task is scheduled so that stale timer and
+    # block wait entries for the task can be ignored.
+    _token = 0
+
+    def __init__(self, steps, name=None):
+        self.steps = steps
+        self.name = name
+        self._done = threading.Event()
+        self._cancelled = False
+
+    def is_alive(self):
+        return not self._done.is_set()
+
+    def join(self, timeout=None):
+        self._done.wait(timeout)
+
+    def cancel(self):
+        self._cancelled = True
+
+
+class ExecutionEngine(object):
+    """
+    Runs any number of step generators cooperatively on a single thread.
+
+    A step generator yields either the number of seconds it would like to
+    sleep before it is resumed or a `WaitForBlock`.  Each step should return
+    quickly since it holds up every other task while it runs.
+
+    The steps of every task run on the engine's single thread, including any
+    blocking JSON-RPC requests they make, so requests from one task hold up
+    all of the others.  The engine suits many calls that spend most of
+    their time waiting on a node with low latency.  With a slow node, use
+    the thread based executor instead.
+    """
+    def __init__(self, logger=None):
+        if logger is None:
+            logger = get_logger('engine')
+        self.logger = logger
+
+        self._queue = []
+        self._tasks = set()
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._run = True
+
+        self._block_waiters = {}
+        self._watched_block_sages = []
+
+        self._thread = threading.Thread(target=self.run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    @property
+    def task_count(self):
+        """
+        The number of tasks which have not yet finished.
+        """
+        return len(self._tasks)
+
+    def spawn(self, steps, name=None):
+        task = Task(steps, name)
+        with self._condition:
+            self._tasks.add(task)
+        self.schedule(task, 0)
+        return task
+
+    def finish(self, task):
+        with self._condition:
+            self._tasks.discard(task)
+        task._done.set()
+
+    def schedule(self, task, delay):
+        with self._condition:
+            task._token += 1
+            heapq.heappush(
+                self._queue,
+                (time.time() + delay, next(self._counter), task._token, task),
+            )
+            self._condition.notify()
+
+    def schedule_on_block(self, task, wait):
+        """
+        Resume `task` once the `WaitForBlock` it yielded is satisfied.
+        """
+        block_sage = wait.block_sage
+        if block_sage.current_block_number >= wait.block_number:
+            self.schedule(task, 0)
+            return
+
+        with self._condition:
+            if not any(watched is block_sage for watched in self._watched_block_sages):
+                self._watched_block_sages.append(block_sage)
+                block_sage.on_new_block(
+                    lambda block_number, block: self.wake_block_waiters(block_sage, block_number),
+                )
+            if wait.timeout is None:
+                task._token += 1
+            else:
+                self.schedule(task, wait.timeout)
+            self._block_waiters.setdefault(id(block_sage), []).append(
+                (wait.block_number, task._token, task),
+            )
+
+    def wake_block_waiters(self, block_sage, block_number):
+        with self._condition:
+            waiters = self._block_waiters.get(id(block_sage), [])
+            remaining = []
+            for waiter in waiters:
+                wait_block_number, token, task = waiter
+                if token != task._token:
+                    # The task has already been resumed by its timeout.
+                    continue
+                elif wait_block_number <= block_number:
+                    self.schedule(task, 0)
+                else:
+                    remaining.append(waiter)
+            self._block_waiters[id(block_sage)] = remaining
+
+    def stop(self):
+        with self._condition:
+            self._run = False
+            self._condition.notify()
+
+    def get_next_task(self):
+        """
+        Block until a task is due to be resumed and return it.  Returns `None`
+        once the engine has been stopped.
+        """
+        with self._condition:
+            while self._run:
+                if self._queue:
+                    wake_at, _, token, task = self._queue[0]
+                    if token != task._token:
+                        # Stale entry for a task that was rescheduled.
+                        heapq.heappop(self._queue)
+                        continue
+                    now = time.time()
+                    if wake_at <= now:
+                        heapq.heappop(self._queue)
+                        return task
+                    self._condition.wait(wake_at - now)
+                else:
+                    self._condition.wait()
+        return None
+
+    def step(self, task):
+        if task._cancelled:
+            task.steps.close()
+            self.finish(task)
+            return
+
+        try:
+            step = next(task.steps)
+        except StopIteration:
+            self.finish(task)
+        except Exception as e:
+            self.logger.error("Task %s raised an error: %s", task.name, e, exc_info=True)
+            task.exception = e
+            self.finish(task)
+        else:
+            if isinstance(step, WaitForBlock):
+                self.schedule_on_block(task, step)
+            else:
+                self.schedule(task, step or 0)
+
+    def run(self):
+        self.logger.info("Starting execution engine")
+        while self._run:
+            task = self.get_next_task()
+            if task is None:
+                break
+            self.step(task)
+        self.logger.info("Execution engine stopped")
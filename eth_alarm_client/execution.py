@@ -0,0 +1,165 @@
+import threading
+
+import rlp
+
+from ethereum import utils as ethereum_utils
+from ethereum.transactions import Transaction
+
+from .nonces import NonceManager
+from .utils import get_logger
+
+
+class LocalSigner(object):
+    """
+    Signs transactions with a private key held by the client rather than by
+    the node.
+    """
+    def __init__(self, private_key):
+        if len(private_key) != 32:
+            private_key = ethereum_utils.decode_hex(private_key.replace('0x', ''))
+        self.private_key = private_key
+        self.address = '0x' + ethereum_utils.encode_hex(ethereum_utils.privtoaddr(private_key))
+
+    def sign_transaction(self, nonce, gas_price, gas, to, value, data):
+        """
+        Return the `(raw_transaction, txn_hash)` of the signed transaction as
+        hex strings.
+        """
+        transaction = Transaction(
+            nonce,
+            gas_price,
+            gas,
+            ethereum_utils.decode_hex(to.replace('0x', '')),
+            value,
+            ethereum_utils.decode_hex(data.replace('0x', '')),
+        ).sign(self.private_key)
+        return (
+            '0x' + ethereum_utils.encode_hex(rlp.encode(transaction)),
+            '0x' + ethereum_utils.encode_hex(transaction.hash),
+        )
+
+
+class PreparedTransaction(object):
+    """
+    A transaction which has been fully built ahead of time so that sending it
+    is a single request.
+    """
+    txn_hash = None
+
+    def __init__(self, blockchain_client, transaction, raw_transaction=None,
+                 nonce_manager=None, nonce=None):
+        self.blockchain_client = blockchain_client
+        self.transaction = transaction
+        self.raw_transaction = raw_transaction
+        self.nonce_manager = nonce_manager
+        self.nonce = nonce
+        self._lock = threading.Lock()
+        self._done = False
+
+    @property
+    def is_signed(self):
+        return self.raw_transaction is not None
+
+    def send(self):
+        """
+        Send the transaction and return its hash.  A transaction can only be
+        sent once.
+        """
+        with self._lock:
+            if self._done:
+                raise ValueError("Transaction has already been sent or discarded")
+            self._done = True
+
+        try:
+            if self.is_signed:
+                response = self.blockchain_client.make_request(
+                    'eth_sendRawTransaction', [self.raw_transaction],
+                )
+            else:
+                response = self.blockchain_client.make_request(
+                    'eth_sendTransaction', [self.transaction],
+                )
+            if 'error' in response:
+                raise ValueError(response['error'])
+        except Exception:
+            if self.nonce_manager is not None:
+                self.nonce_manager.release(self.nonce)
+            raise
+
+        if self.nonce_manager is not None:
+            self.nonce_manager.confirm(self.nonce)
+        self.txn_hash = response['result']
+        return self.txn_hash
+
+    def discard(self):
+        """
+        Give up on sending the transaction, handing its nonce back.
+        """
+        with self._lock:
+            if self._done:
+                return
+            self._done = True
+        if self.nonce_manager is not None:
+            self.nonce_manager.release(self.nonce)
+
+
+class TransactionPreparer(object):
+    """
+    Builds transactions ahead of when they need to be sent.
+
+    With a `LocalSigner` the transaction is signed with a nonce from the
+    signer's `NonceManager` and sent with `eth_sendRawTransaction`.  The
+    nonce is held from when the transaction is prepared until it is sent or
+    discarded, so transactions should only be prepared shortly before they
+    are due.  Without a signer the node signs the transaction when it is
+    sent from `default_from`.
+    """
+    def __init__(self, blockchain_client, signer=None, nonce_manager=None,
+                 default_from=None, logger=None):
+        if logger is None:
+            logger = get_logger('transactions')
+        self.logger = logger
+        self.blockchain_client = blockchain_client
+        self.signer = signer
+        if signer is not None and nonce_manager is None:
+            nonce_manager = NonceManager(blockchain_client, signer.address)
+        self.nonce_manager = nonce_manager
+        self._default_from = default_from
+
+    @property
+    def sender(self):
+        if self.signer is not None:
+            return self.signer.address
+        if self._default_from is None:
+            self._default_from = self.blockchain_client.get_coinbase()
+        return self._default_from
+
+    def prepare(self, to, data, gas, gas_price, value=0):
+        transaction = {
+            'from': self.sender,
+            'to': to,
+            'gas': hex(gas).rstrip('L'),
+            'gasPrice': hex(gas_price).rstrip('L'),
+            'value': hex(value).rstrip('L'),
+            'data': data,
+        }
+        if self.signer is None:
+            return PreparedTransaction(self.blockchain_client, transaction)
+
+        nonce = self.nonce_manager.get_next_nonce()
+        try:
+            raw_transaction, txn_hash = self.signer.sign_transaction(
+                nonce, gas_price, gas, to, value, data,
+            )
+        except Exception:
+            self.nonce_manager.release(nonce)
+            raise
+        transaction['nonce'] = hex(nonce).rstrip('L')
+        self.logger.debug("Signed transaction %s with nonce %s", txn_hash, nonce)
+        return PreparedTransaction(
+            self.blockchain_client,
+            transaction,
+            raw_transaction=raw_transaction,
+            nonce_manager=self.nonce_manager,
+            nonce=nonce,
+        )
@@ -0,0 +1,90 @@
+import threading
+
+from .batch import make_batch_request
+from .utils import (
+    get_logger,
+    get_percentile,
+)
+
+
+class GasPriceOracle(object):
+    """
+    A single source of the gas price shared by every call, refreshed at most
+    once per block.
+
+    By default the node's own `eth_gasPrice` is used.  When a `percentile` is
+    given the price is instead that percentile of the gas prices paid by the
+    transactions in the last `sample_size` blocks, falling back to the node's
+    price when those blocks are empty.
+    """
+    def __init__(self, blockchain_client, block_sage, percentile=None, sample_size=20,
+                 logger=None):
+        if logger is None:
+            logger = get_logger('gas-price')
+        self.logger = logger
+        self.blockchain_client = blockchain_client
+        self.block_sage = block_sage
+        self.percentile = percentile
+        self.sample_size = sample_size
+
+        self._lock = threading.Lock()
+        self._gas_price = None
+        self._block_number = None
+        # The gas prices of the transactions in each of the sampled blocks.
+        self._samples = {}
+
+    def on_new_block(self, block_number, block):
+        """
+        `BlockSage` callback which refreshes the price as soon as a new block
+        arrives.
+        """
+        self.get_gas_price(block_number)
+
+    @property
+    def gas_price(self):
+        return self.get_gas_price(self.block_sage.current_block_number)
+
+    def get_gas_price(self, block_number):
+        with self._lock:
+            if self._gas_price is None or self._block_number != block_number:
+                self._gas_price = self.fetch_gas_price(block_number)
+                self._block_number = block_number
+                self.logger.debug("Gas price at block %s: %s", block_number, self._gas_price)
+            return self._gas_price
+
+    def fetch_gas_price(self, block_number):
+        if self.percentile is not None:
+            self.sample_blocks(block_number)
+            gas_prices = [
+                gas_price
+                for block_gas_prices in self._samples.values()
+                for gas_price in block_gas_prices
+            ]
+            if gas_prices:
+                return get_percentile(gas_prices, self.percentile)
+        return self.blockchain_client.get_gas_price()
+
+    def sample_blocks(self, block_number):
+        """
+        Fetch the transactions of any blocks in the sample window that have
+        not been sampled yet in a single batched request.
+        """
+        window = range(max(0, block_number - self.sample_size + 1), block_number + 1)
+        for sampled_block_number in tuple(self._samples.keys()):
+            if sampled_block_number not in window:
+                self._samples.pop(sampled_block_number)
+
+        to_fetch = [n for n in window if n not in self._samples]
+        if not to_fetch:
+            return
+
+        responses = make_batch_request(self.blockchain_client, (
+            ("eth_getBlockByNumber", [hex(n).rstrip('L'), True]) for n in to_fetch
+        ))
+        for sampled_block_number, response in zip(to_fetch, responses):
+            block = response['result']
+            if block is None:
+                continue
+            self._samples[sampled_block_number] = [
+                int(transaction['gasPrice'], 16) for transaction in block['transactions']
+            ]
@@ -0,0 +1,226 @@
+import collections
+import threading
+import time
+import types
+
+from .batch import (
+    make_batch_request,
+    supports_batching,
+)
+from .utils import get_logger
+
+
+# Upper bounds in seconds of the request latency histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float('inf'))
+
+
+class MethodStats(object):
+    """
+    Counts and latencies of the requests for a single method issued by a
+    single subsystem.
+    """
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def record(self, duration, error):
+        self.count += 1
+        if error:
+            self.errors += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        for idx, upper_bound in enumerate(LATENCY_BUCKETS):
+            if duration <= upper_bound:
+                self.buckets[idx] += 1
+                break
+
+    @property
+    def histogram(self):
+        """
+        The cumulative `(upper_bound, count)` latency histogram.
+        """
+        histogram = []
+        total = 0
+        for upper_bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            total += count
+            histogram.append((upper_bound, total))
+        return histogram
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total_time': self.total_time,
+            'max_time': self.max_time,
+            'mean_time': self.total_time / self.count if self.count else 0.0,
+            'histogram': self.histogram,
+        }
+
+
+class RPCStats(object):
+    """
+    Thread safe record of the requests made through any number of
+    `InstrumentedClient` instances.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._methods = collections.defaultdict(MethodStats)
+            self._round_trips = collections.Counter()
+            self.started_at = time.time()
+
+    def record(self, subsystem, methods, duration, error=False):
+        """
+        Record a single round trip to the node for the requests to `methods`.
+        Requests sent together in a batch each record the latency of the
+        whole batch.
+        """
+        with self._lock:
+            self._round_trips[subsystem] += 1
+            for method in methods:
+                self._methods[(subsystem, method)].record(duration, error)
+
+    def get_stats(self):
+        """
+        Return a snapshot of the stats keyed by subsystem and then method.
+        """
+        with self._lock:
+            stats = {}
+            for (subsystem, method), method_stats in self._methods.items():
+                stats.setdefault(subsystem, {})[method] = method_stats.as_dict()
+            return stats
+
+    def get_round_trips(self):
+        with self._lock:
+            return dict(self._round_trips)
+
+    def summary(self):
+        """
+        Return lines summarizing the requests made by each subsystem, busiest
+        first.
+        """
+        stats = self.get_stats()
+        round_trips = self.get_round_trips()
+        elapsed = max(time.time() - self.started_at, 1)
+
+        totals = sorted((
+            (sum(m['total_time'] for m in methods.values()), subsystem)
+            for subsystem, methods in stats.items()
+        ), reverse=True)
+
+        lines = []
+        for total_time, subsystem in totals:
+            methods = stats[subsystem]
+            request_count = sum(m['count'] for m in methods.values())
+            lines.append(
+                "{0}: {1} requests in {2} round trips ({3:.2f}/s) - {4:.2f}s waiting".format(
+                    subsystem,
+                    request_count,
+                    round_trips.get(subsystem, 0),
+                    request_count / elapsed,
+                    total_time,
+                )
+            )
+            for method, method_stats in sorted(
+                    methods.items(), key=lambda item: item[1]['total_time'], reverse=True):
+                lines.append(
+                    "  {0}: {1} requests, {2} errors, mean {3:.4f}s, max {4:.4f}s".format(
+                        method,
+                        method_stats['count'],
+                        method_stats['errors'],
+                        method_stats['mean_time'],
+                        method_stats['max_time'],
+                    )
+                )
+        return lines
+
+
+class InstrumentedClient(object):
+    """
+    Wraps a blockchain client, recording every request made through it in
+    `stats` under the name of the `subsystem` that issued it.
+
+    The client's helper methods such as `get_balance` are re-bound to the
+    wrapper so that the requests they make are recorded too.  Everything else
+    is delegated to the wrapped client.
+    """
+    def __init__(self, blockchain_client, stats=None, subsystem='default'):
+        if stats is None:
+            stats = RPCStats()
+        self._client = blockchain_client
+        self.stats = stats
+        self.subsystem_name = subsystem
+
+    def subsystem(self, name):
+        """
+        Return a view of the same client whose requests are recorded under
+        `name`.
+        """
+        return type(self)(self._client, stats=self.stats, subsystem=name)
+
+    def make_request(self, method, params):
+        start = time.time()
+        try:
+            response = self._client.make_request(method, params)
+        except Exception:
+            self.stats.record(self.subsystem_name, (method,), time.time() - start, error=True)
+            raise
+        self.stats.record(self.subsystem_name, (method,), time.time() - start)
+        return response
+
+    def make_batch_request(self, requests):
+        if not supports_batching(self._client):
+            return [self.make_request(method, params) for method, params in requests]
+
+        methods = tuple(method for method, _ in requests)
+        start = time.time()
+        try:
+            responses = make_batch_request(self._client, requests)
+        except Exception:
+            self.stats.record(self.subsystem_name, methods, time.time() - start, error=True)
+            raise
+        self.stats.record(self.subsystem_name, methods, time.time() - start)
+        return responses
+
+    def __getattr__(self, name):
+        attr = getattr(type(self._client), name, None)
+        func = getattr(attr, '__func__', attr)
+        if isinstance(func, types.FunctionType):
+            return types.MethodType(func, self)
+        return getattr(self._client, name)
+
+
+class RPCStatsReporter(object):
+    """
+    Periodically logs the summary of an `RPCStats`.
+    """
+    def __init__(self, stats, interval=60, logger=None):
+        if logger is None:
+            logger = get_logger('rpc-stats')
+        self.logger = logger
+        self.stats = stats
+        self.interval = interval
+
+        self._run = True
+        self._thread = threading.Thread(target=self.report)
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def stop(self):
+        self._run = False
+
+    def report(self):
+        while self._run:
+            time.sleep(self.interval)
+            for line in self.stats.summary():
+                self.logger.info(line)
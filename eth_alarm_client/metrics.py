@@ -0,0 +1,299 @@
+import collections
+import threading
+
+try:
+    from http.server import (
+        BaseHTTPRequestHandler,
+        HTTPServer,
+    )
+except ImportError:
+    from BaseHTTPServer import (
+        BaseHTTPRequestHandler,
+        HTTPServer,
+    )
+
+from .utils import get_logger
+
+
+# Upper bounds in seconds of the scheduler tick duration histogram buckets.
+TICK_DURATION_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float('inf'))
+
+# Upper bounds of the histogram of how many blocks after the target block
+# calls were executed.
+EXECUTION_DELAY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 255, float('inf'))
+
+
+class Histogram(object):
+    def __init__(self, buckets):
+        self.bucket_bounds = buckets
+        self.buckets = [0] * len(buckets)
+        self.count = 0
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.count += 1
+            self.total += value
+            for idx, upper_bound in enumerate(self.bucket_bounds):
+                if value <= upper_bound:
+                    self.buckets[idx] += 1
+                    break
+
+    @property
+    def histogram(self):
+        """
+        The cumulative `(upper_bound, count)` histogram.
+        """
+        with self._lock:
+            histogram = []
+            total = 0
+            for upper_bound, count in zip(self.bucket_bounds, self.buckets):
+                total += count
+                histogram.append((upper_bound, total))
+            return histogram
+
+
+class SchedulerMetrics(object):
+    """
+    Counters for the work done by a `Scheduler`.
+    """
+    def __init__(self):
+        self.tick_durations = Histogram(TICK_DURATION_BUCKETS)
+        self.execution_delays = Histogram(EXECUTION_DELAY_BUCKETS)
+
+        self.claims_won = 0
+        self.claims_lost = 0
+        self.claims_failed = 0
+        self.executions = 0
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        '{0}="{1}"'.format(key, value) for key, value in sorted(labels.items())
+    ) + '}'
+
+
+class MetricsWriter(object):
+    """
+    Builds a page in the Prometheus text exposition format.  Samples are
+    grouped by metric family, in the order each family was first declared,
+    since every sample of a family has to follow its `HELP` and `TYPE`
+    lines.
+    """
+    def __init__(self, prefix='eth_alarm_'):
+        self.prefix = prefix
+        self.families = collections.OrderedDict()
+
+    def declare(self, name, metric_type, description):
+        if name in self.families:
+            return
+        self.families[name] = [
+            '# HELP {0}{1} {2}'.format(self.prefix, name, description),
+            '# TYPE {0}{1} {2}'.format(self.prefix, name, metric_type),
+        ]
+
+    def sample(self, name, value, labels=None, family=None):
+        self.families[family or name].append('{0}{1}{2} {3}'.format(
+            self.prefix, name, format_labels(labels), format_value(value),
+        ))
+
+    def gauge(self, name, value, description, labels=None):
+        self.declare(name, 'gauge', description)
+        self.sample(name, value, labels)
+
+    def counter(self, name, value, description, labels=None):
+        self.declare(name, 'counter', description)
+        self.sample(name, value, labels)
+
+    def histogram(self, name, histogram, total, count, description, labels=None):
+        self.declare(name, 'histogram', description)
+        labels = labels or {}
+        for upper_bound, bucket_count in histogram:
+            bucket_labels = dict(labels, le=format_value(upper_bound))
+            self.sample(name + '_bucket', bucket_count, bucket_labels, family=name)
+        self.sample(name + '_sum', total, labels, family=name)
+        self.sample(name + '_count', count, labels, family=name)
+
+    def render(self):
+        return '\n'.join(
+            line for lines in self.families.values() for line in lines
+        ) + '\n'
+
+
+def render_metrics(scheduler, rpc_stats=None):
+    """
+    Return the metrics page for the scheduler and, if provided, the
+    `RPCStats` of its blockchain clients.
+    """
+    writer = MetricsWriter()
+    metrics = scheduler.metrics
+    block_sage = scheduler.block_sage
+
+    writer.gauge('active_calls', len(scheduler.active_calls), "Calls being executed.")
+    writer.gauge('active_claims', len(scheduler.active_claims), "Claims being sent.")
+    writer.gauge('threads', threading.active_count(), "Live threads in the process.")
+
+    if scheduler.worker_pool is not None:
+        pool_stats = scheduler.worker_pool.stats
+        writer.gauge('worker_pool_size', pool_stats['size'], "Worker pool threads.")
+        writer.gauge('worker_pool_active', pool_stats['active'], "Busy worker pool threads.")
+        writer.gauge('worker_pool_queued', pool_stats['queued'], "Queued worker pool items.")
+        writer.counter(
+            'worker_pool_completed_total', pool_stats['completed'], "Completed work items.",
+        )
+        writer.counter('worker_pool_failed_total', pool_stats['failed'], "Failed work items.")
+        writer.counter(
+            'worker_pool_rejected_total', pool_stats['rejected'], "Work items rejected.",
+        )
+
+    if scheduler.engine is not None:
+        writer.gauge('engine_tasks', scheduler.engine.task_count, "Unfinished engine tasks.")
+
+    writer.gauge(
+        'pending_receipts', scheduler.receipt_watcher.pending_count,
+        "Transactions waiting for a receipt.",
+    )
+    writer.gauge(
+        'planned_calls', scheduler.execution_planner.pending_count,
+        "Calls in their call loop waiting on the execution planner.",
+    )
+
+    node_block_number = scheduler.blockchain_client.get_block_number()
+    writer.gauge(
+        'block_number', block_sage.current_block_number, "Latest block seen by the client.",
+    )
+    writer.gauge('node_block_number', node_block_number, "Latest block of the node.")
+    writer.gauge(
+        'block_lag',
+        node_block_number - block_sage.current_block_number,
+        "Blocks the client is behind the node.",
+    )
+    writer.gauge('block_time_seconds', block_sage.block_time, "Average block time.")
+
+    node_stats = getattr(scheduler.blockchain_client, 'node_stats', None)
+    for node in node_stats or []:
+        labels = {'node': node['name']}
+        writer.gauge('node_healthy', int(node['healthy']), "Whether the node is healthy.", labels)
+        if node['head'] is not None:
+            writer.gauge('node_head', node['head'], "Latest block of the node.", labels)
+            writer.gauge(
+                'node_head_lag', node['head_lag'], "Blocks the node is behind the others.",
+                labels,
+            )
+        if node['latency'] is not None:
+            writer.gauge(
+                'node_latency_seconds', node['latency'], "Average request latency.", labels,
+            )
+
+    writer.histogram(
+        'tick_duration_seconds',
+        metrics.tick_durations.histogram,
+        metrics.tick_durations.total,
+        metrics.tick_durations.count,
+        "Duration of each pass of the scheduler's monitor loop.",
+    )
+    for result, count in (
+            ('won', metrics.claims_won),
+            ('lost', metrics.claims_lost),
+            ('failed', metrics.claims_failed)):
+        writer.counter('claims_total', count, "Claim attempts by result.", {'result': result})
+    writer.counter('executions_total', metrics.executions, "Calls executed.")
+    writer.histogram(
+        'execution_delay_blocks',
+        metrics.execution_delays.histogram,
+        metrics.execution_delays.total,
+        metrics.execution_delays.count,
+        "Blocks between a call's target block and the block it was executed in.",
+    )
+
+    if rpc_stats is not None:
+        round_trips = rpc_stats.get_round_trips()
+        for subsystem, count in sorted(round_trips.items()):
+            writer.counter(
+                'rpc_round_trips_total', count, "Round trips to the node.",
+                {'subsystem': subsystem},
+            )
+        for subsystem, methods in sorted(rpc_stats.get_stats().items()):
+            for method, method_stats in sorted(methods.items()):
+                labels = {'subsystem': subsystem, 'method': method}
+                writer.counter(
+                    'rpc_requests_total', method_stats['count'], "Requests to the node.",
+                    labels,
+                )
+                writer.counter(
+                    'rpc_errors_total', method_stats['errors'], "Failed requests to the node.",
+                    labels,
+                )
+                writer.histogram(
+                    'rpc_request_duration_seconds',
+                    method_stats['histogram'],
+                    method_stats['total_time'],
+                    method_stats['count'],
+                    "Latency of requests to the node.",
+                    labels,
+                )
+
+    return writer.render()
+
+
+class MetricsServer(object):
+    """
+    Serves the scheduler's metrics over HTTP at `/metrics` from a background
+    thread.
+    """
+    def __init__(self, scheduler, port, host='127.0.0.1', rpc_stats=None, logger=None):
+        if logger is None:
+            logger = get_logger('metrics')
+        self.logger = logger
+        self.scheduler = scheduler
+        self.rpc_stats = rpc_stats
+
+        metrics_server = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                try:
+                    body = render_metrics(
+                        metrics_server.scheduler,
+                        metrics_server.rpc_stats,
+                    ).encode('utf-8')
+                except Exception as e:
+                    metrics_server.logger.error("Unable to render metrics: %s", e)
+                    self.send_error(500)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                metrics_server.logger.debug(format, *args)
+
+        self._server = HTTPServer((host, port), MetricsHandler)
+        self.port = self._server.server_address[1]
+
+        self.logger.info("Serving metrics on %s:%s", host, self.port)
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
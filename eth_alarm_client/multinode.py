@@ -0,0 +1,334 @@
+import socket
+import threading
+import time
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+from eth_client_utils import JSONRPCBaseClient
+
+from .batch import make_batch_request
+from .nonces import NonceManager
+from .utils import get_logger
+
+
+# Requests which submit a transaction and are sent to every healthy node.
+BROADCAST_METHODS = (
+    'eth_sendTransaction',
+    'eth_sendRawTransaction',
+)
+
+# Requests which create a filter on the node they are sent to.
+FILTER_CREATE_METHODS = (
+    'eth_newFilter',
+    'eth_newBlockFilter',
+    'eth_newPendingTransactionFilter',
+)
+
+# Requests which refer to a filter and must go to the node that created it.
+FILTER_METHODS = (
+    'eth_getFilterChanges',
+    'eth_getFilterLogs',
+    'eth_uninstallFilter',
+)
+
+
+# The clients raise `ValueError` for error responses from the node as well as
+# for some failures to reach it, which are told apart by their message.
+TRANSPORT_ERROR_MESSAGES = (
+    'No JSON returned by socket',
+    'No JSON object could be decoded',
+    'Expecting value',
+    'Timeout waiting for',
+    'IPC connection lost',
+)
+
+
+def is_transport_error(error):
+    """
+    Return whether `error` means that the node could not be reached or gave
+    an unreadable response, as opposed to a JSON-RPC error response such as
+    a rejected transaction or a failed call.
+    """
+    if isinstance(error, (IOError, OSError, socket.error)):
+        return True
+    message = str(error.args[0]) if error.args else ''
+    return message.startswith(TRANSPORT_ERROR_MESSAGES)
+
+
+class Node(object):
+    """
+    A single node along with its observed latency, health and head block.
+    """
+    # Weight given to the latest sample in the latency moving average.
+    LATENCY_WEIGHT = 0.3
+
+    latency = None
+    head = None
+    failures = 0
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    @property
+    def is_healthy(self):
+        return self.failures == 0
+
+    def record_success(self, duration):
+        self.failures = 0
+        if self.latency is None:
+            self.latency = duration
+        else:
+            self.latency = (
+                self.LATENCY_WEIGHT * duration + (1 - self.LATENCY_WEIGHT) * self.latency
+            )
+
+    def record_failure(self):
+        self.failures += 1
+
+    def record_error(self, error, duration):
+        """
+        Record a request that raised `error`.  Only errors reaching the node
+        count against its health since it answered any other request.
+        """
+        if is_transport_error(error):
+            self.record_failure()
+        else:
+            self.record_success(duration)
+
+    def request(self, method, params):
+        start = time.time()
+        try:
+            response = self.client.make_request(method, params)
+        except Exception as e:
+            self.record_error(e, time.time() - start)
+            raise
+        self.record_success(time.time() - start)
+        return response
+
+
+class MultiNodeClient(JSONRPCBaseClient):
+    """
+    Spreads requests across several nodes.
+
+    Reads go to the healthy node with the lowest latency that is no more than
+    `max_lag` blocks behind the highest head seen across all of the nodes,
+    falling back to the other nodes if it fails.  Transactions are sent to
+    every healthy node so that a slow or stuck node does not delay them.
+    The head and latency of every node are checked every `check_interval`
+    seconds, which is also how failed nodes are brought back into rotation.
+    """
+    def __init__(self, clients, names=None, max_lag=2, check_interval=5, logger=None):
+        if not clients:
+            raise ValueError("At least one client is required")
+        if logger is None:
+            logger = get_logger('multinode')
+        self.logger = logger
+
+        if names is None:
+            names = ['node-{0}'.format(idx) for idx in range(len(clients))]
+        self.nodes = [Node(client, name) for client, name in zip(clients, names)]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+
+        self._filter_nodes = {}
+        self._nonce_managers = {}
+        self._nonce_managers_lock = threading.Lock()
+
+        # Requests are made on the calling thread.
+        super(MultiNodeClient, self).__init__(False)
+
+        self.check_nodes()
+
+        self._run = True
+        self._thread = threading.Thread(target=self.monitor_nodes)
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def stop(self):
+        self._run = False
+
+    @property
+    def highest_head(self):
+        heads = [node.head for node in self.nodes if node.head is not None]
+        return max(heads) if heads else None
+
+    def get_head_lag(self, node):
+        highest_head = self.highest_head
+        if node.head is None or highest_head is None:
+            return None
+        return highest_head - node.head
+
+    @property
+    def node_stats(self):
+        return [
+            {
+                'name': node.name,
+                'healthy': node.is_healthy,
+                'latency': node.latency,
+                'head': node.head,
+                'head_lag': self.get_head_lag(node),
+            }
+            for node in self.nodes
+        ]
+
+    def check_nodes(self):
+        for node in self.nodes:
+            try:
+                node.head = int(node.request('eth_blockNumber', [])['result'], 16)
+            except Exception as e:
+                self.logger.warning("Node %s failed its health check: %s", node.name, e)
+
+    def monitor_nodes(self):
+        while self._run:
+            time.sleep(self.check_interval)
+            self.check_nodes()
+            for node in self.nodes:
+                lag = self.get_head_lag(node)
+                if lag is not None and lag > self.max_lag:
+                    self.logger.warning("Node %s is %s blocks behind", node.name, lag)
+            self.sync_nonces()
+
+    def get_nonce_manager(self, address):
+        with self._nonce_managers_lock:
+            if address not in self._nonce_managers:
+                self._nonce_managers[address] = NonceManager(
+                    self, address, logger=self.logger,
+                )
+            return self._nonce_managers[address]
+
+    def sync_nonces(self):
+        """
+        Reconcile the nonce of every account that has sent a transaction with
+        the nodes so that the nonces of dropped transactions are reused.
+        """
+        with self._nonce_managers_lock:
+            managers = tuple(self._nonce_managers.values())
+        for manager in managers:
+            try:
+                manager.sync()
+            except Exception as e:
+                self.logger.warning("Unable to sync nonce for %s: %s", manager.address, e)
+
+    def get_nodes(self):
+        """
+        Return the nodes in the order that reads should be attempted.
+        Healthy, synced nodes come first, fastest first.
+        """
+        def sort_key(node):
+            lag = self.get_head_lag(node)
+            is_lagging = lag is not None and lag > self.max_lag
+            latency = node.latency if node.latency is not None else float('inf')
+            return (not node.is_healthy, is_lagging, latency)
+        return sorted(self.nodes, key=sort_key)
+
+    def route(self, fn):
+        """
+        Call `fn(node)` on each node in order until one succeeds.
+        """
+        error = None
+        for node in self.get_nodes():
+            try:
+                return fn(node)
+            except Exception as e:
+                self.logger.warning("Request to node %s failed: %s", node.name, e)
+                error = e
+        raise error
+
+    def make_request(self, method, params):
+        if method in BROADCAST_METHODS:
+            return self.broadcast(method, params)
+        elif method in FILTER_METHODS:
+            node = self._filter_nodes.get(params[0])
+            if node is None:
+                raise ValueError("Unknown filter: {0}".format(params[0]))
+            if method == 'eth_uninstallFilter':
+                self._filter_nodes.pop(params[0], None)
+            return node.request(method, params)
+        elif method in FILTER_CREATE_METHODS:
+            def create_filter(node):
+                response = node.request(method, params)
+                self._filter_nodes[response['result']] = node
+                return response
+            return self.route(create_filter)
+        return self.route(lambda node: node.request(method, params))
+
+    def make_batch_request(self, requests):
+        def batch_request(node):
+            start = time.time()
+            try:
+                responses = make_batch_request(node.client, requests)
+            except Exception as e:
+                node.record_error(e, time.time() - start)
+                raise
+            node.record_success(time.time() - start)
+            return responses
+        return self.route(batch_request)
+
+    def broadcast(self, method, params):
+        """
+        Send a transaction to every healthy node at once and return the first
+        successful response without waiting for the slower nodes.
+
+        Nodes that sign `eth_sendTransaction` themselves only produce the same
+        transaction if they agree on its nonce and gas price, so any that are
+        missing are filled in first.  Nonces come from a `NonceManager` for
+        the sender so that a node which has not yet seen our previous
+        transaction does not hand out its nonce again.
+        """
+        nonce_manager = None
+        if method == 'eth_sendTransaction':
+            transaction = dict(params[0])
+            if 'nonce' not in transaction:
+                nonce_manager = self.get_nonce_manager(transaction['from'])
+                nonce = nonce_manager.get_next_nonce()
+                transaction['nonce'] = hex(nonce).rstrip('L')
+            try:
+                params = [self.fill_transaction(transaction)]
+            except Exception:
+                if nonce_manager is not None:
+                    nonce_manager.release(nonce)
+                raise
+
+        nodes = [node for node in self.nodes if node.is_healthy] or self.nodes
+        results = Queue()
+
+        def send(node):
+            try:
+                results.put((node, node.request(method, params), None))
+            except Exception as e:
+                results.put((node, None, e))
+
+        for node in nodes:
+            thread = threading.Thread(target=send, args=(node,))
+            thread.daemon = True
+            thread.start()
+
+        error = None
+        for _ in nodes:
+            node, response, e = results.get()
+            if e is None:
+                if nonce_manager is not None:
+                    nonce_manager.confirm(nonce)
+                return response
+            self.logger.warning("Node %s rejected transaction: %s", node.name, e)
+            error = e
+
+        if nonce_manager is not None:
+            # No node accepted the nonce we assigned so it must be reused.
+            nonce_manager.release(nonce)
+        raise error
+
+    def fill_transaction(self, transaction):
+        if 'gasPrice' not in transaction:
+            transaction['gasPrice'] = self.route(
+                lambda node: node.request('eth_gasPrice', []),
+            )['result']
+        return transaction
@@ -0,0 +1,185 @@
+import heapq
+import threading
+
+from eth_client_utils import JSONRPCBaseClient
+
+from .batch import make_batch_request
+from .utils import get_logger
+
+
+class NonceManager(object):
+    """
+    Hands out the transaction nonces for a single account locally so that
+    any number of threads can submit transactions at once without asking the
+    node for a nonce each time or being handed the same one.
+
+    Nonces of transactions the node did not accept are reused before any new
+    ones so that no gaps are left which would hold up the transactions after
+    them.  `sync` reconciles with the node's pending transaction count,
+    which catches transactions sent from the account by anything else as
+    well as transactions the node has dropped.
+    """
+    def __init__(self, blockchain_client, address, logger=None):
+        if logger is None:
+            logger = get_logger('nonces')
+        self.logger = logger
+        self.blockchain_client = blockchain_client
+        self.address = address
+
+        self._lock = threading.Lock()
+        self._next_nonce = None
+        # Nonces which have been handed out but not yet accepted by the node.
+        self._in_flight = set()
+        # Nonces which were handed out but not accepted, smallest first.
+        self._gaps = []
+        self._needs_sync = True
+        # The number of nonces handed out so far.
+        self.issued = 0
+
+    def get_transaction_count(self):
+        response = self.blockchain_client.make_request(
+            'eth_getTransactionCount', [self.address, 'pending'],
+        )
+        return int(response['result'], 16)
+
+    def sync(self, transaction_count=None, issued=None):
+        """
+        Reconcile with the node's count of pending transactions for the
+        account.  `issued` is the value of `self.issued` from before the
+        count was requested.
+        """
+        if transaction_count is None:
+            issued = self.issued
+            transaction_count = self.get_transaction_count()
+        with self._lock:
+            # Transactions sent after the count was requested are not
+            # reflected in it.
+            self._sync(transaction_count, is_current=issued is None or issued == self.issued)
+
+    def _sync(self, transaction_count, is_current=True):
+        if self._next_nonce is not None and transaction_count != self._next_nonce:
+            self.logger.info(
+                "Resyncing nonce for %s from %s to %s",
+                self.address,
+                self._next_nonce,
+                transaction_count,
+            )
+
+        if self._in_flight or not is_current:
+            # Transactions may still be on their way to the node so only move
+            # forward.
+            self._next_nonce = max(self._next_nonce, transaction_count)
+            self._gaps = [nonce for nonce in self._gaps if nonce >= transaction_count]
+            heapq.heapify(self._gaps)
+        else:
+            # Everything below the count is known to the node and everything
+            # from it on will be handed out again.
+            self._next_nonce = transaction_count
+            self._gaps = []
+        self._needs_sync = False
+
+    def get_next_nonce(self):
+        """
+        Reserve and return the nonce for a new transaction.
+        """
+        with self._lock:
+            if self._needs_sync and not self._in_flight:
+                self._sync(self.get_transaction_count())
+
+            if self._gaps:
+                nonce = heapq.heappop(self._gaps)
+            else:
+                nonce = self._next_nonce
+                self._next_nonce += 1
+            self._in_flight.add(nonce)
+            self.issued += 1
+            return nonce
+
+    def confirm(self, nonce):
+        """
+        Record that the node accepted the transaction with `nonce`.
+        """
+        with self._lock:
+            self._in_flight.discard(nonce)
+
+    def release(self, nonce):
+        """
+        Record that the node did not accept the transaction with `nonce` so
+        that it is handed out again.  The node is consulted again before the
+        next nonce is handed out in case the nonce was rejected for being
+        stale.
+        """
+        with self._lock:
+            self._in_flight.discard(nonce)
+            heapq.heappush(self._gaps, nonce)
+            self._needs_sync = True
+
+
+class NonceManagedClient(JSONRPCBaseClient):
+    """
+    Wraps a blockchain client, filling in the nonce of every transaction it
+    sends from a `NonceManager` for the sending account.  Anything else is
+    delegated to the wrapped client.
+    """
+    def __init__(self, blockchain_client, logger=None):
+        if logger is None:
+            logger = get_logger('nonces')
+        self.logger = logger
+        self.blockchain_client = blockchain_client
+
+        self._managers = {}
+        self._managers_lock = threading.Lock()
+
+        # Requests are made on the calling thread.
+        super(NonceManagedClient, self).__init__(False)
+
+    def get_nonce_manager(self, address):
+        with self._managers_lock:
+            if address not in self._managers:
+                self._managers[address] = NonceManager(
+                    self.blockchain_client, address, logger=self.logger,
+                )
+            return self._managers[address]
+
+    def on_new_block(self, block_number, block):
+        """
+        `BlockSage` callback which resyncs every account with the node in a
+        single batched request.
+        """
+        with self._managers_lock:
+            managers = tuple(self._managers.values())
+        if not managers:
+            return
+        issued = [manager.issued for manager in managers]
+        responses = make_batch_request(self.blockchain_client, (
+            ('eth_getTransactionCount', [manager.address, 'pending'])
+            for manager in managers
+        ))
+        for manager, response, manager_issued in zip(managers, responses, issued):
+            manager.sync(int(response['result'], 16), manager_issued)
+
+    def make_request(self, method, params):
+        if method != 'eth_sendTransaction' or 'nonce' in params[0]:
+            return self.blockchain_client.make_request(method, params)
+
+        manager = self.get_nonce_manager(params[0]['from'])
+        nonce = manager.get_next_nonce()
+        transaction = dict(params[0], nonce=hex(nonce).rstrip('L'))
+        try:
+            response = self.blockchain_client.make_request(method, [transaction])
+        except Exception:
+            manager.release(nonce)
+            raise
+        if 'error' in response:
+            manager.release(nonce)
+        else:
+            manager.confirm(nonce)
+        return response
+
+    def make_batch_request(self, requests):
+        return make_batch_request(self.blockchain_client, requests)
+
+    def __getattr__(self, name):
+        if name == 'blockchain_client':
+            raise AttributeError(name)
+        return getattr(self.blockchain_client, name)
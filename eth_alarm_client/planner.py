@@ -0,0 +1,129 @@
+import threading
+
+from .call_contract import load_call_states
+from .utils import get_logger
+
+
+class ExecutionPlanner(object):
+    """
+    Sends the executions of all of the tracked calls that are due on the next
+    block from a single place rather than each call racing the others for
+    the node and the account's nonces.
+
+    On each new block the calls that can be executed on the next block are
+    ordered by deadline and then by reward, and as many as fit within the
+    block's gas limit are sent at once.  The rest are left for the following
+    block.  When a `blockchain_client` is provided the state of every due
+    call is refreshed in a single batched request first so that calls which
+    were executed or cancelled in the new block are not sent.
+    """
+    def __init__(self, blockchain_client=None, logger=None):
+        if logger is None:
+            logger = get_logger('planner')
+        self.logger = logger
+        self.blockchain_client = blockchain_client
+
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    @property
+    def pending_count(self):
+        return len(self._calls)
+
+    def add(self, call_contract):
+        with self._lock:
+            self._calls[call_contract.call_address] = call_contract
+
+    def remove(self, call_contract):
+        with self._lock:
+            self._calls.pop(call_contract.call_address, None)
+
+    def on_new_block(self, block_number, block):
+        """
+        `BlockSage` callback which sends the executions that are due on the
+        block after `block_number`.
+        """
+        plan = self.plan(block_number, int(block['gasLimit'], 16))
+        if plan:
+            self.dispatch(plan, block_number)
+
+    def plan(self, block_number, gas_limit):
+        """
+        Return the `(call_contract, execution_gas)` of each call to send an
+        execution for on `block_number`, in the order they should be sent.
+        """
+        with self._lock:
+            call_contracts = tuple(self._calls.values())
+
+        candidates = []
+        for call_contract in call_contracts:
+            if call_contract.has_sent_execution:
+                continue
+            try:
+                if call_contract.should_call_on_block(block_number + 1):
+                    candidates.append(call_contract)
+            except Exception as e:
+                self.logger.error(
+                    "Unable to plan execution of %s: %s", call_contract.call_address, e,
+                )
+
+        if candidates and self.blockchain_client is not None:
+            try:
+                load_call_states(self.blockchain_client, candidates)
+            except Exception as e:
+                self.logger.error("Unable to load the state of due calls: %s", e)
+                return []
+
+        due = []
+        for call_contract in candidates:
+            try:
+                if call_contract.was_called or call_contract.is_cancelled:
+                    continue
+                if not call_contract.scheduler_can_pay:
+                    self.logger.warning(
+                        "Scheduler cannot pay for %s", call_contract.call_address,
+                    )
+                    continue
+                execution_gas = call_contract.get_execution_gas()
+            except Exception as e:
+                self.logger.error(
+                    "Unable to plan execution of %s: %s", call_contract.call_address, e,
+                )
+                continue
+            due.append((call_contract, execution_gas))
+
+        due.sort(key=lambda item: (item[0].last_block, -item[0].base_payment))
+
+        plan = []
+        remaining_gas = gas_limit
+        for call_contract, execution_gas in due:
+            if execution_gas > remaining_gas:
+                self.logger.debug(
+                    "Deferring %s.  Needs %s gas with %s left in block",
+                    call_contract.call_address,
+                    execution_gas,
+                    remaining_gas,
+                )
+                continue
+            remaining_gas -= execution_gas
+            plan.append((call_contract, execution_gas))
+        return plan
+
+    def dispatch(self, plan, block_number):
+        """
+        Send the planned executions in parallel, returning once all of them
+        have been sent.
+        """
+        self.logger.info("Sending %s executions at block %s", len(plan), block_number)
+        threads = [
+            threading.Thread(
+                target=call_contract.submit_execution,
+                args=(block_number, execution_gas),
+            )
+            for call_contract, execution_gas in plan
+        ]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,319 @@
+import heapq
+import itertools
+import threading
+import time
+
+from .engine import WaitForBlock
+from .utils import get_logger
+
+
+class WorkItem(object):
+    """
+    A unit of work submitted to a `WorkerPool`.  Mirrors the parts of the
+    `threading.Thread` API that are used to track claims and executions.
+    """
+    result = None
+    exception = None
+
+    def __init__(self, fn, args, priority, name=None):
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.name = name
+        self._done = threading.Event()
+        self._cancelled = False
+
+    def is_alive(self):
+        return not self._done.is_set()
+
+    def join(self, timeout=None):
+        self._done.wait(timeout)
+
+    def cancel(self):
+        """
+        Prevent the work item from running if it has not yet started.
+        """
+        self._cancelled = True
+
+
+class StepTask(object):
+    """
+    A step generator run on a `WorkerPool`.  Mirrors the parts of the
+    `threading.Thread` API that are used to track call executions.
+    """
+    exception = None
+
+    # Incremented each time the task is parked so that whichever of its
+    # block and its timeout comes second is ignored.
+    _token = 0
+
+    def __init__(self, steps, priority, name=None):
+        self.steps = steps
+        self.priority = priority
+        self.name = name
+        self._done = threading.Event()
+        self._cancelled = False
+
+    def is_alive(self):
+        return not self._done.is_set()
+
+    def join(self, timeout=None):
+        self._done.wait(timeout)
+
+    def cancel(self):
+        self._cancelled = True
+
+
+class WorkerPool(object):
+    """
+    A fixed number of worker threads fed from a bounded priority queue.  Work
+    items with a lower priority value are run first.
+
+    Step generators can be run with `spawn`.  A worker runs a task's steps
+    until one yields a `WaitForBlock`, at which point the worker is freed
+    for other work and the task is queued again once the block arrives or
+    the wait times out, so that calls waiting for their window do not hold
+    on to a worker.
+    """
+    def __init__(self, size=8, max_queue=100, logger=None):
+        if logger is None:
+            logger = get_logger('pool')
+        self.logger = logger
+        self.size = size
+        self.max_queue = max_queue
+
+        self._queue = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._run = True
+
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.peak_queued = 0
+
+        self._block_waiters = {}
+        self._watched_block_sages = []
+        self._timers = []
+        self._timer_condition = threading.Condition()
+
+        self._threads = []
+        for i in range(size):
+            thread = threading.Thread(target=self.work)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+        self._timer_thread = threading.Thread(target=self.run_timers)
+        self._timer_thread.daemon = True
+        self._timer_thread.start()
+
+    @property
+    def queued(self):
+        return len(self._queue)
+
+    @property
+    def is_alive(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    @property
+    def stats(self):
+        with self._condition:
+            return {
+                'size': self.size,
+                'max_queue': self.max_queue,
+                'active': self.active,
+                'queued': len(self._queue),
+                'peak_queued': self.peak_queued,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+            }
+
+    def submit(self, fn, args=(), priority=0, name=None):
+        """
+        Queue `fn(*args)` to be run by a worker.  Returns the `WorkItem`, or
+        `None` if the queue is full.
+        """
+        with self._condition:
+            if len(self._queue) >= self.max_queue:
+                self.rejected += 1
+                self.logger.warning(
+                    "Worker pool queue full (%s items).  Rejecting %s",
+                    len(self._queue),
+                    name,
+                )
+                return None
+            work_item = WorkItem(fn, args, priority, name)
+            heapq.heappush(self._queue, (priority, next(self._counter), work_item))
+            self.peak_queued = max(self.peak_queued, len(self._queue))
+            self._condition.notify()
+            return work_item
+
+    def spawn(self, steps, priority=0, name=None):
+        """
+        Queue the step generator `steps` to be run by the workers.  Returns
+        the `StepTask`, or `None` if the queue is full.
+        """
+        task = StepTask(steps, priority, name)
+        if self.submit(self.run_task, args=(task,), priority=priority, name=name) is None:
+            return None
+        return task
+
+    def resume(self, task):
+        """
+        Queue a parked task again.  The task was already let in so it is
+        queued even if the queue is full.
+        """
+        with self._condition:
+            if not self._run:
+                task._done.set()
+                return
+            work_item = WorkItem(self.run_task, (task,), task.priority, task.name)
+            heapq.heappush(self._queue, (task.priority, next(self._counter), work_item))
+            self.peak_queued = max(self.peak_queued, len(self._queue))
+            self._condition.notify()
+
+    def run_task(self, task):
+        """
+        Run the steps of `task` on the current worker until it finishes or
+        waits for a block.  Any other delay is slept through.
+        """
+        if task._cancelled:
+            task.steps.close()
+            task._done.set()
+            return
+
+        try:
+            for step in task.steps:
+                if isinstance(step, WaitForBlock):
+                    self.park(task, step)
+                    return
+                elif step:
+                    time.sleep(step)
+        except Exception as e:
+            task.exception = e
+            task._done.set()
+            raise
+        task._done.set()
+
+    def park(self, task, wait):
+        """
+        Resume `task` once the `WaitForBlock` it yielded is satisfied.
+        """
+        block_sage = wait.block_sage
+        with self._condition:
+            task._token += 1
+            if block_sage.current_block_number >= wait.block_number:
+                self.resume(task)
+                return
+
+            if not any(watched is block_sage for watched in self._watched_block_sages):
+                self._watched_block_sages.append(block_sage)
+                block_sage.on_new_block(
+                    lambda block_number, block: self.wake_block_waiters(block_sage, block_number),
+                )
+            token = task._token
+            self._block_waiters.setdefault(id(block_sage), []).append(
+                (wait.block_number, token, task),
+            )
+
+        if wait.timeout is not None:
+            with self._timer_condition:
+                heapq.heappush(
+                    self._timers,
+                    (time.time() + wait.timeout, next(self._counter), token, task),
+                )
+                self._timer_condition.notify()
+
+        # The block may have arrived before the task was added as a waiter.
+        self.wake_block_waiters(block_sage, block_sage.current_block_number)
+
+    def wake_block_waiters(self, block_sage, block_number):
+        with self._condition:
+            waiters = self._block_waiters.get(id(block_sage), [])
+            remaining = []
+            for waiter in waiters:
+                wait_block_number, token, task = waiter
+                if token != task._token:
+                    # The task has already been resumed by its timeout.
+                    continue
+                elif wait_block_number <= block_number:
+                    task._token += 1
+                    self.resume(task)
+                else:
+                    remaining.append(waiter)
+            self._block_waiters[id(block_sage)] = remaining
+
+    def run_timers(self):
+        """
+        Resume the parked tasks whose wait for a block has timed out.
+        """
+        while self._run:
+            with self._timer_condition:
+                if not self._timers:
+                    self._timer_condition.wait()
+                    continue
+                wake_at, _, token, task = self._timers[0]
+                now = time.time()
+                if wake_at > now:
+                    self._timer_condition.wait(wake_at - now)
+                    continue
+                heapq.heappop(self._timers)
+
+            with self._condition:
+                if token != task._token:
+                    # The task has already been resumed by its block.
+                    continue
+                task._token += 1
+                self.resume(task)
+
+    def stop(self):
+        with self._condition:
+            self._run = False
+            for _, _, work_item in self._queue:
+                work_item._done.set()
+                if work_item.fn == self.run_task:
+                    work_item.args[0]._done.set()
+            del self._queue[:]
+            for waiters in self._block_waiters.values():
+                for _, _, task in waiters:
+                    task._done.set()
+            self._block_waiters.clear()
+            self._condition.notify_all()
+        with self._timer_condition:
+            self._timer_condition.notify()
+
+    def get_next_item(self):
+        with self._condition:
+            while self._run and not self._queue:
+                self._condition.wait()
+            if not self._run:
+                return None
+            _, _, work_item = heapq.heappop(self._queue)
+            self.active += 1
+            return work_item
+
+    def work(self):
+        while self._run:
+            work_item = self.get_next_item()
+            if work_item is None:
+                break
+
+            failed = False
+            try:
+                if not work_item._cancelled:
+                    work_item.result = work_item.fn(*work_item.args)
+            except Exception as e:
+                failed = True
+                work_item.exception = e
+                self.logger.error("Work item %s raised an error: %s", work_item.name, e)
+            finally:
+                with self._condition:
+                    self.active -= 1
+                    if failed:
+                        self.failed += 1
+                    else:
+                        self.completed += 1
+                work_item._done.set()
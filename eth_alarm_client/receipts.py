@@ -0,0 +1,105 @@
+import threading
+
+from .batch import make_batch_request
+from .utils import get_logger
+
+
+class PendingReceipt(object):
+    """
+    The receipt of a transaction which will be available once the
+    transaction has been mined.
+    """
+    receipt = None
+
+    def __init__(self, txn_hash):
+        self.txn_hash = txn_hash
+        self._ready = threading.Event()
+
+    @property
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def set_receipt(self, receipt):
+        self.receipt = receipt
+        self._ready.set()
+
+    def wait(self, timeout=None):
+        """
+        Block until the receipt is available or `timeout` seconds have passed
+        and return the receipt, or `None` if it is not available.
+        """
+        self._ready.wait(timeout)
+        return self.receipt
+
+
+class ReceiptWatcher(object):
+    """
+    Looks up the receipts of every transaction being waited on in a single
+    batched request each time a new block arrives, rather than each waiter
+    polling the node for its own receipt.
+    """
+    def __init__(self, blockchain_client, logger=None):
+        if logger is None:
+            logger = get_logger('receipts')
+        self.logger = logger
+        self.blockchain_client = blockchain_client
+
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    @property
+    def pending_count(self):
+        return len(self._pending)
+
+    def watch(self, txn_hash):
+        """
+        Return the `PendingReceipt` for `txn_hash`.
+        """
+        with self._lock:
+            if txn_hash not in self._pending:
+                self._pending[txn_hash] = PendingReceipt(txn_hash)
+            return self._pending[txn_hash]
+
+    def unwatch(self, txn_hash):
+        with self._lock:
+            self._pending.pop(txn_hash, None)
+
+    def on_new_block(self, block_number, block):
+        """
+        `BlockSage` callback which checks for the receipts of all of the
+        watched transactions.
+        """
+        self.check_receipts()
+
+    def check_receipts(self):
+        with self._lock:
+            pending = tuple(self._pending.values())
+        if not pending:
+            return
+
+        try:
+            responses = make_batch_request(self.blockchain_client, (
+                ("eth_getTransactionReceipt", [pending_receipt.txn_hash])
+                for pending_receipt in pending
+            ))
+        except ValueError as e:
+            self.logger.error("Unable to check transaction receipts: %s", e)
+            return
+
+        for pending_receipt, response in zip(pending, responses):
+            receipt = response.get('result')
+            if receipt is None:
+                continue
+            self.logger.debug("Got receipt for %s", pending_receipt.txn_hash)
+            self.unwatch(pending_receipt.txn_hash)
+            pending_receipt.set_receipt(receipt)
+
+    def wait_for_transaction(self, txn_hash, max_wait=60):
+        """
+        Drop in replacement for `blockchain_client.wait_for_transaction`.
+        """
+        receipt = self.watch(txn_hash).wait(max_wait)
+        if receipt is None:
+            self.unwatch(txn_hash)
+            raise ValueError("Could not get transaction receipt")
+        return receipt
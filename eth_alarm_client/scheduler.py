@@ -1,12 +1,29 @@
 import threading
 import time
 import random
+import itertools
 
 from ethereum.utils import denoms as denoms
 
+from .balances import BalanceTracker
+from .batch import batch_call
 from .block_sage import BlockSage
-from .call_contract import CallContract
+from .call_contract import (
+    CallContract,
+    load_call_states,
+)
+from .call_index import CallIndex
+from .claims import plan_claims
 from .contracts import FutureBlockCall
+from .discovery import LogCallDiscovery
+from .engine import (
+    run_steps,
+    wait_for_receipt_steps,
+)
+from .gas_price import GasPriceOracle
+from .metrics import SchedulerMetrics
+from .planner import ExecutionPlanner
+from .receipts import ReceiptWatcher
 from .utils import (
     get_logger,
     cached_property,
@@ -19,31 +36,92 @@ EMPTY_ADDRESS = '0x0000000000000000000000000000000000000000'
 class Scheduler(object):
     _block_sage = None
 
-    def __init__(self, scheduler, block_sage=None):
+    def __init__(self, scheduler, block_sage=None, batch_rpc=False, engine=None,
+                 worker_pool=None, call_store=None, call_client=None, gas_price_oracle=None,
+                 balance_tracker=None, receipt_watcher=None, transaction_preparer=None,
+                 execution_planner=None, wake_percentile=None):
         self.logger = get_logger('scheduler')
         self.scheduler = scheduler
+        self.batch_rpc = batch_rpc
+        self.engine = engine
+        self.worker_pool = worker_pool
+        self.call_store = call_store
+        self._call_client = call_client
+        self.transaction_preparer = transaction_preparer
+        self.wake_percentile = wake_percentile
 
         if block_sage is None:
             block_sage = BlockSage(self.blockchain_client)
-        self._block_sage = block_sage
+        if gas_price_oracle is None:
+            gas_price_oracle = GasPriceOracle(self.blockchain_client, block_sage)
+        self.gas_price_oracle = gas_price_oracle
+        if balance_tracker is None:
+            balance_tracker = BalanceTracker(self.blockchain_client, block_sage)
+        self.balance_tracker = balance_tracker
+        if receipt_watcher is None:
+            receipt_watcher = ReceiptWatcher(self.blockchain_client)
+        self.receipt_watcher = receipt_watcher
+        if execution_planner is None:
+            execution_planner = ExecutionPlanner(self.call_client)
+        self.execution_planner = execution_planner
+        self.block_listeners = []
+        self.set_block_sage(block_sage)
 
         self.active_calls = {}
         self.active_claims = {}
+        self.call_cache = {}
+        self.call_index = CallIndex()
+        self.metrics = SchedulerMetrics()
 
     @property
     def block_sage(self):
         if self._block_sage is None:
             self.logger.error("Blocksage unexpectedly `None`")
-            self._block_sage = BlockSage(self.blockchain_client)
+            self.set_block_sage(BlockSage(self.blockchain_client))
         if not self._block_sage.is_alive:
             self.logger.error("Blocksage died.  Respawning")
-            self._block_sage = BlockSage(self.blockchain_client)
+            self.set_block_sage(BlockSage(self.blockchain_client))
         return self._block_sage
 
+    def set_block_sage(self, block_sage):
+        """
+        Use `block_sage` for block information, refreshing the gas price
+        oracle and balances, checking for receipts, sending the executions
+        that are due and calling the registered listeners on its new blocks.
+        """
+        self._block_sage = block_sage
+        # Executions are sent before anything else is done for the block.
+        block_sage.on_new_block(self.execution_planner.on_new_block)
+        self.gas_price_oracle.block_sage = block_sage
+        block_sage.on_new_block(self.gas_price_oracle.on_new_block)
+        self.balance_tracker.block_sage = block_sage
+        block_sage.on_new_block(self.balance_tracker.on_new_block)
+        block_sage.on_new_block(self.receipt_watcher.on_new_block)
+        for callback in self.block_listeners:
+            block_sage.on_new_block(callback)
+
+    def on_new_block(self, callback):
+        """
+        Register `callback(block_number, block)` to be called for each new
+        block, including by any block sage that replaces the current one.
+        """
+        self.block_listeners.append(callback)
+        self._block_sage.on_new_block(callback)
+
     @property
     def blockchain_client(self):
         return self.scheduler._meta.blockchain_client
 
+    @property
+    def call_client(self):
+        """
+        The blockchain client used by the `CallContract` instances.  Defaults
+        to the scheduler contract's client.
+        """
+        if self._call_client is None:
+            return self.blockchain_client
+        return self._call_client
+
     @cached_property
     def coinbase(self):
         return self.blockchain_client.get_coinbase()
@@ -67,59 +145,238 @@ class Scheduler(object):
 
     def monitor(self):
         while getattr(self, '_run', True):
+            block_number = self.block_sage.current_block_number
+            tick_start = time.time()
             self.schedule_calls()
             self.claim_calls()
             self.cleanup_calls()
             self.cleanup_claim_threads()
-            time.sleep(self.block_sage.block_time)
+            self.cleanup_call_cache()
+            self.metrics.tick_durations.observe(time.time() - tick_start)
+            if self.worker_pool is not None:
+                self.logger.debug("Worker pool: %s", self.worker_pool.stats)
+            # Wake up as soon as the next block arrives.
+            self.block_sage.wait_for_block(
+                block_number + 1,
+                timeout=self.block_sage.block_time,
+            )
+
+    def get_call_contract(self, call_address):
+        """
+        Return the `CallContract` for the given address.  Instances are shared
+        between the scheduling and claiming passes and kept until the call's
+        window has passed so that immutable call data is only fetched once.
+        """
+        block_sage = self.block_sage
+
+        if call_address in self.call_cache:
+            call_contract = self.call_cache[call_address]
+            # The block sage may have been respawned since the call was cached.
+            call_contract._block_sage = block_sage
+            return call_contract
+
+        call_contract = CallContract(
+            call_address=call_address,
+            blockchain_client=self.call_client,
+            block_sage=block_sage,
+            batch_rpc=self.batch_rpc,
+            call_store=self.call_store,
+            gas_price_oracle=self.gas_price_oracle,
+            balance_tracker=self.balance_tracker,
+            receipt_watcher=self.receipt_watcher,
+            transaction_preparer=self.transaction_preparer,
+            execution_planner=self.execution_planner,
+            wake_percentile=self.wake_percentile,
+        )
+        self.call_cache[call_address] = call_contract
+        return call_contract
+
+    def cleanup_call_cache(self):
+        for call_address, call_contract in tuple(self.call_cache.items()):
+            if call_contract.last_block < self.block_sage.current_block_number:
+                self.logger.debug("Evicting cached call: %s", call_address)
+                self.call_cache.pop(call_address)
+                self.balance_tracker.untrack(call_address)
+
+    _indexed_at_block = None
+
+    # `LogCallDiscovery` for the calls registered since the call tree was
+    # last walked in full.
+    _registrations = None
+
+    def get_registration_discovery(self, from_block):
+        return LogCallDiscovery(
+            self.scheduler._meta.address,
+            self.blockchain_client,
+            from_block=from_block,
+            logger=self.logger,
+        )
+
+    def update_call_index(self):
+        """
+        Bring the call index up to date with the current block.
+
+        When walking the call tree only the blocks that entered the window
+        since the last update are walked.  Calls may still be scheduled for
+        most of the window, so those registered since the last update are
+        picked up from the scheduler's logs for the blocks mined in between.
+        """
+        current_block_number = self.block_sage.current_block_number
+        if current_block_number == self._indexed_at_block:
+            return
+
+        left_block = max(0, current_block_number - self.minimum_grace_period)
+        right_block = current_block_number + 255 + 10 - 1
+
+        pruned = self.call_index.prune(left_block)
+        if pruned and self.call_store is not None:
+            # Calls which have left the index are never read again.
+            self.call_store.delete_many_call_data(pruned)
+
+        self.index_call_tree(left_block, right_block, current_block_number)
+
+        self.call_index.scanned_through = right_block
+        self._indexed_at_block = current_block_number
+
+    def get_unscanned_block(self, left_block):
+        """
+        Return the first block from `left_block` that has not been walked.
+        """
+        scanned_through = self.call_index.scanned_through
+        if scanned_through is None or scanned_through < left_block:
+            return left_block
+        return scanned_through + 1
+
+    def index_call_tree(self, left_block, right_block, current_block_number):
+        scan_from = left_block
+
+        if self.get_unscanned_block(left_block) > left_block:
+            try:
+                self.index_discovered_calls(
+                    self._registrations, left_block, current_block_number,
+                )
+            except Exception as e:
+                self.logger.warning(
+                    "Unable to read call registrations, walking the whole window: %s", e,
+                )
+            else:
+                scan_from = self.get_unscanned_block(left_block)
+
+        if scan_from == left_block:
+            # The walk reflects every call registered up to the current block.
+            self._registrations = self.get_registration_discovery(current_block_number + 1)
+
+        self.index_calls_between(scan_from, right_block)
+
+    def index_calls_between(self, left_block, right_block):
+        """
+        Walk the call tree for the calls with a target block within the
+        inclusive range.
+        """
+        if left_block <= right_block:
+            self.logger.debug("Indexing calls between %s-%s", left_block, right_block)
+            for call_address, target_block in self.iter_calls(left_block, right_block):
+                if self.call_index.add(call_address, target_block):
+                    self.logger.debug("Indexed call %s for block %s", call_address, target_block)
+
+    def index_discovered_calls(self, discovery, left_block, current_block_number):
+        new_calls = discovery.get_new_calls(current_block_number)
+        if not new_calls:
+            return
+
+        target_blocks = self.get_target_blocks(new_calls)
+        for call_address, target_block in zip(new_calls, target_blocks):
+            if target_block < left_block:
+                continue
+            if self.call_index.add(call_address, target_block):
+                self.logger.debug("Indexed call %s for block %s", call_address, target_block)
+
+    def get_target_blocks(self, call_addresses):
+        return batch_call(self.blockchain_client, (
+            (FutureBlockCall(call_address, self.blockchain_client).targetBlock, ())
+            for call_address in call_addresses
+        ))
+
+    def load_call_states(self, call_addresses):
+        """
+        Load the state of all of the provided calls in a single batched
+        request ahead of them being evaluated.
+        """
+        if not self.batch_rpc or not call_addresses:
+            return
+        self.logger.debug("Loading state for %s calls", len(call_addresses))
+        load_call_states(self.call_client, (
+            self.get_call_contract(call_address) for call_address in call_addresses
+        ))
+
+    def get_upcoming_calls(self, left_block, right_block):
+        """
+        Return the addresses of the calls with a target block in the inclusive
+        range from the call index.
+        """
+        self.update_call_index()
+        return self.call_index.get_calls(left_block, right_block)
 
     def claim_calls(self):
         start_block = self.block_sage.current_block_number + 10 + 1
         end_block = self.block_sage.current_block_number + 255 + 10 - 1
         self.logger.debug("Looking for claimable calls between %s-%s", start_block, end_block)
-        upcoming_calls = self.enumerate_calls(start_block, end_block)
+        upcoming_calls = self.get_upcoming_calls(start_block, end_block)
+        self.load_call_states([
+            call_address for call_address in upcoming_calls
+            if call_address not in self.active_claims
+        ])
 
+        candidates = []
         for call_address in upcoming_calls:
             if call_address in self.active_claims:
                 self.logger.debug("Call %s already claimed", call_address)
                 continue
 
-            scheduled_call = CallContract(
-                call_address=call_address,
-                blockchain_client=self.blockchain_client,
-                block_sage=self.block_sage,
-            )
+            scheduled_call = self.get_call_contract(call_address)
 
             if not scheduled_call.is_claimable:
                 self.logger.debug("Call %s not claimable", call_address)
                 continue
 
-            current_balance = self.blockchain_client.get_balance(self.coinbase)
-            if current_balance - 2 * scheduled_call.base_payment < 2 * denoms.ether:
-                self.logger.error(
-                    "Insufficient funds to claim %s.  Base Payment is %s ether",
-                    scheduled_call.call_address,
-                    scheduled_call.base_payment * 1.0 / denoms.ether,
-                )
-                continue
+            candidates.append(scheduled_call)
+
+        if not candidates:
+            return
+
+        cbn = self.block_sage.current_block_number
+        gas_price = self.gas_price_oracle.gas_price
+        claim_plan = plan_claims(candidates, cbn, gas_price)
+
+        for claim_option in claim_plan:
+            scheduled_call = claim_option.call_contract
+            call_address = scheduled_call.call_address
 
-            fpcb = scheduled_call.first_profitable_claim_block
-            if self.block_sage.current_block_number < fpcb:
+            if not claim_option.is_profitable:
                 # claiming the call at this point would be committing to
                 # execute it at a loss, and thus we will wait till at least the
                 # maximum payment value for this call.
                 self.logger.debug(
                     "Waiting till block %s to claim %s.  To claim before this block would be operating at a loss.",
-                    fpcb,
+                    claim_option.first_profitable_block,
+                    call_address,
+                )
+                continue
+
+            # Funds already committed to claims and executions which have not
+            # been mined yet are not available.
+            current_balance = self.balance_tracker.get_available_balance(self.coinbase)
+            if current_balance - 2 * scheduled_call.base_payment < 2 * denoms.ether:
+                self.logger.error(
+                    "Insufficient funds to claim %s.  Base Payment is %s ether",
                     scheduled_call.call_address,
+                    scheduled_call.base_payment * 1.0 / denoms.ether,
                 )
                 continue
 
             # Random strategy.  Roll a number between 1-255.  If we are at
             # least this many blocks into the call window then claim the call.
-            cbn = self.block_sage.current_block_number
-            fcb = scheduled_call.first_claimable_block
-            claim_block = cbn - fcb
+            claim_block = claim_option.claim_offset
 
             claim_if_above = random.randint(0, 255)
 
@@ -131,18 +388,53 @@ class Scheduler(object):
             )
 
             if claim_block > claim_if_above:
+                # The deposit and gas are reserved until the claim is mined.
+                self.balance_tracker.reserve(
+                    ('claim', call_address),
+                    self.coinbase,
+                    2 * scheduled_call.base_payment + scheduled_call.CLAIM_GAS * gas_price,
+                )
+
                 # Asynchronously claim the call.  We don't want to wait for
                 # these transactions since they could take a while and there
                 # could be a lot of them.
-                claim_thread = threading.Thread(target=self.claim_call, args=(scheduled_call,))
-                claim_thread.daemon = True
-                claim_thread.start()
-                self.active_claims[call_address] = claim_thread
+                if self.engine is not None:
+                    claim_task = self.engine.spawn(
+                        self.claim_call_steps(scheduled_call),
+                        name='claim-{0}'.format(call_address),
+                    )
+                elif self.worker_pool is not None:
+                    # Claims with the earliest deadline are sent first.
+                    claim_task = self.worker_pool.submit(
+                        self.claim_call,
+                        args=(scheduled_call,),
+                        priority=scheduled_call.last_claimable_block,
+                        name='claim-{0}'.format(call_address),
+                    )
+                    if claim_task is None:
+                        self.logger.warning(
+                            "Worker pool full.  Deferring claim of %s",
+                            call_address,
+                        )
+                        self.balance_tracker.release(('claim', call_address))
+                        continue
+                else:
+                    claim_task = threading.Thread(target=self.claim_call, args=(scheduled_call,))
+                    claim_task.daemon = True
+                    claim_task.start()
+                self.active_claims[call_address] = claim_task
 
     def claim_call(self, scheduled_call):
         """
         Claim a call.
         """
+        run_steps(self.claim_call_steps(scheduled_call))
+        return scheduled_call.claim_txn_receipt
+
+    def claim_call_steps(self, scheduled_call):
+        """
+        Step generator form of `claim_call`.
+        """
         cbn = self.block_sage.current_block_number
         fcb = scheduled_call.first_claimable_block
         claim_block = cbn - fcb
@@ -152,20 +444,22 @@ class Scheduler(object):
             scheduled_call.call_address,
             claim_block,
         )
-        claim_txn = scheduled_call.claim()
+        claim_key = ('claim', scheduled_call.call_address)
         try:
-            claim_receipt = self.blockchain_client.wait_for_transaction(
-                claim_txn,
-                10 * self.block_sage.block_time,
-            )
-            self.logger.info(
-                "Call %s claimed with txn %s at claim block %s for %s ethers",
-                scheduled_call.call_address,
-                claim_txn,
-                claim_block,
-                scheduled_call.claim_amount * 1.0 / denoms.ether,
-            )
-            return claim_receipt
+            claim_txn = scheduled_call.claim()
+        except Exception:
+            self.balance_tracker.release(claim_key)
+            raise
+        scheduled_call.claim_txn_hash = claim_txn
+        receipts = {}
+        try:
+            for delay in wait_for_receipt_steps(
+                    self.blockchain_client,
+                    claim_txn,
+                    receipts,
+                    max_wait=10 * self.block_sage.block_time,
+                    receipt_watcher=self.receipt_watcher):
+                yield delay
         except ValueError:
             # Handle timeout waiting for transaction.
             self.logger.error(
@@ -173,13 +467,41 @@ class Scheduler(object):
                 claim_txn,
                 scheduled_call.call_address,
             )
+            self.metrics.claims_failed += 1
+            self.balance_tracker.release(claim_key)
             raise
+        scheduled_call.claim_txn_receipt = receipts[claim_txn]
+        self.balance_tracker.release(
+            claim_key,
+            int(scheduled_call.claim_txn_receipt['blockNumber'], 16),
+        )
+
+        if scheduled_call.call.claimer() != self.coinbase:
+            self.logger.info(
+                "Lost claim of call %s with txn %s",
+                scheduled_call.call_address,
+                claim_txn,
+            )
+            self.metrics.claims_lost += 1
+            return
+        self.metrics.claims_won += 1
+        self.logger.info(
+            "Call %s claimed with txn %s at claim block %s for %s ethers",
+            scheduled_call.call_address,
+            claim_txn,
+            claim_block,
+            scheduled_call.claim_amount * 1.0 / denoms.ether,
+        )
 
     def schedule_calls(self):
         start_block = max(0, self.block_sage.current_block_number - self.minimum_grace_period)
         end_block = self.block_sage.current_block_number + 40
         self.logger.debug("Looking for calls between %s-%s", start_block, end_block)
-        upcoming_calls = self.enumerate_calls(start_block, end_block)
+        upcoming_calls = self.get_upcoming_calls(start_block, end_block)
+        self.load_call_states([
+            call_address for call_address in upcoming_calls
+            if call_address not in self.active_calls
+        ])
 
         for call_address in upcoming_calls:
             self.logger.debug("Evaluating %s for scheduling", call_address)
@@ -187,18 +509,21 @@ class Scheduler(object):
                 self.logger.debug("Call %s already scheduled", call_address)
                 continue
 
-            scheduled_call = CallContract(
-                call_address=call_address,
-                blockchain_client=self.blockchain_client,
-                block_sage=self.block_sage,
-            )
+            scheduled_call = self.get_call_contract(call_address)
 
             if not scheduled_call.is_callable:
                 self.logger.debug("Call %s not callable", call_address)
                 continue
 
+            execution = scheduled_call.execute_async(
+                engine=self.engine,
+                worker_pool=self.worker_pool,
+            )
+            if execution is None:
+                self.logger.warning("Worker pool full.  Deferring call: %s", call_address)
+                continue
+
             self.logger.info("Tracking call: %s", scheduled_call.call_address)
-            scheduled_call.execute_async()
             self.active_calls[call_address] = scheduled_call
 
     def cleanup_calls(self):
@@ -207,14 +532,23 @@ class Scheduler(object):
             if scheduled_call.txn_hash:
                 self.logger.info("Removing finished call: %s", call_address)
                 self.active_calls.pop(call_address)
+                self.record_execution(scheduled_call)
             elif scheduled_call.last_block < self.block_sage.current_block_number:
                 scheduled_call.stop()
                 self.logger.info("Removing expired call: %s", call_address)
                 self.active_calls.pop(call_address)
-            elif not scheduled_call._thread.is_alive():
+            elif not scheduled_call.is_alive:
                 self.logger.info("Removing dead call: %s", call_address)
                 self.active_calls.pop(call_address)
 
+    def record_execution(self, scheduled_call):
+        self.metrics.executions += 1
+        if scheduled_call.txn_receipt:
+            execution_block = int(scheduled_call.txn_receipt['blockNumber'], 16)
+            self.metrics.execution_delays.observe(
+                execution_block - scheduled_call.target_block,
+            )
+
     def cleanup_claim_threads(self):
         keys = tuple(self.active_claims.keys())
         for key in keys:
@@ -238,14 +572,88 @@ class Scheduler(object):
         Query the scheduler contract for any calls that should be executed during
         the next 40 block window.
         """
+        return (
+            call_address for call_address, _ in self.iter_calls(left_block, right_block)
+        )
+
+    # Windows wider than this are walked rather than batched since batching
+    # issues a `getNextCall` request for every block in the window.
+    MAX_BATCH_WINDOW = 1024
+
+    def iter_calls(self, left_block, right_block):
+        """
+        Return an iterable of `(call_address, target_block)` for the calls with
+        a target block within the inclusive range.
+        """
+        if self.batch_rpc and right_block - left_block < self.MAX_BATCH_WINDOW:
+            return iter(self.enumerate_calls_batched(left_block, right_block))
+        return self.walk_calls(left_block, right_block)
+
+    def walk_calls(self, left_block, right_block):
+        """
+        Walk the scheduler's call tree one call at a time.
+        """
         call_address = self.get_next_call(left_block)
 
         while call_address is not None:
             call = FutureBlockCall(call_address, self.blockchain_client)
+            target_block = call.targetBlock()
 
-            if left_block <= call.targetBlock() <= right_block:
-                yield call_address
+            if left_block <= target_block <= right_block:
+                yield call_address, target_block
             else:
                 break
 
             call_address = self.get_next_call_sibling(call_address)
+
+    def enumerate_calls_batched(self, left_block, right_block):
+        """
+        Batched equivalent of `walk_calls`.
+
+        The first call at or after every block in the window is fetched in a
+        single batch, followed by the target block and sibling pointer of
+        every discovered call.  Only calls sharing a target block require an
+        additional round trip, after which the tree is walked locally.
+        """
+        heads = batch_call(self.blockchain_client, (
+            (self.scheduler.getNextCall, (block_number,))
+            for block_number in range(left_block, right_block + 1)
+        ))
+        if not heads or heads[0] == EMPTY_ADDRESS:
+            return []
+
+        call_info = {}
+        to_fetch = set(heads) - {EMPTY_ADDRESS}
+
+        while to_fetch:
+            addresses = tuple(to_fetch)
+            results = batch_call(self.blockchain_client, itertools.chain.from_iterable(
+                (
+                    (FutureBlockCall(call_address, self.blockchain_client).targetBlock, ()),
+                    (self.scheduler.getNextCallSibling, (call_address,)),
+                )
+                for call_address in addresses
+            ))
+            for call_address, target_block, sibling in zip(addresses, results[::2], results[1::2]):
+                call_info[call_address] = (target_block, sibling)
+
+            to_fetch = set(
+                sibling for target_block, sibling in call_info.values()
+                if target_block <= right_block and
+                sibling != EMPTY_ADDRESS and
+                sibling not in call_info
+            )
+
+        upcoming_calls = []
+        call_address = heads[0]
+
+        while call_address != EMPTY_ADDRESS:
+            target_block, sibling = call_info[call_address]
+
+            if left_block <= target_block <= right_block:
+                upcoming_calls.append((call_address, target_block))
+            else:
+                break
+
+            call_address = sibling
+        return upcoming_calls
@@ -0,0 +1,230 @@
+import codecs
+import json
+import socket
+import threading
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from eth_client_utils import JSONRPCBaseClient
+
+from .batch import (
+    construct_batch_request,
+    order_responses,
+)
+from .utils import get_logger
+
+
+def _check_response(response):
+    if 'error' in response:
+        raise ValueError(response)
+    return response
+
+
+class PooledRPCClient(JSONRPCBaseClient):
+    """
+    Thread safe HTTP JSON-RPC client backed by a pool of keep-alive sessions.
+    Up to `pool_size` requests are in flight at once, each on a persistent
+    connection to the node.
+    """
+    def __init__(self, host="127.0.0.1", port="8545", pool_size=4, timeout=30):
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.url = "http://{host}:{port}/".format(host=host, port=port)
+
+        self._sessions = Queue()
+        for _ in range(pool_size):
+            session = requests.Session()
+            session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            self._sessions.put(session)
+
+        # Requests are made on the calling thread.
+        super(PooledRPCClient, self).__init__(False)
+
+    def post(self, payload):
+        session = self._sessions.get()
+        try:
+            response = session.post(
+                self.url,
+                data=json.dumps(payload),
+                headers={'Content-Type': 'application/json'},
+                timeout=self.timeout,
+            )
+            return response.json()
+        finally:
+            self._sessions.put(session)
+
+    def make_request(self, method, params):
+        payload, _ = construct_batch_request([(method, params)])
+        return _check_response(self.post(payload[0]))
+
+    def make_batch_request(self, requests):
+        payload, request_ids = construct_batch_request(requests)
+        data = self.post(payload)
+        if isinstance(data, dict):
+            # The node rejected the batch as a whole.
+            raise ValueError(data)
+        return order_responses(request_ids, data)
+
+
+class IPCConnection(object):
+    """
+    A single IPC socket which any number of threads can have requests in
+    flight on at once.  Responses are read by a background thread which
+    incrementally parses the stream and hands each response to the request
+    waiting on its id.
+    """
+    def __init__(self, ipc_path, logger=None):
+        if logger is None:
+            logger = get_logger('ipc')
+        self.logger = logger
+        self.ipc_path = ipc_path
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._socket = None
+
+    def connect(self):
+        _socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        _socket.connect(self.ipc_path)
+        self._socket = _socket
+
+        thread = threading.Thread(target=self.read_responses, args=(_socket,))
+        thread.daemon = True
+        thread.start()
+
+    def request(self, payload, request_ids, timeout):
+        """
+        Send the payload and return the responses for `request_ids` in the
+        same order.
+        """
+        waiters = [(request_id, threading.Event()) for request_id in request_ids]
+
+        with self._lock:
+            if self._socket is None:
+                self.connect()
+            for request_id, event in waiters:
+                self._pending[request_id] = [event, None]
+            try:
+                self._socket.sendall(json.dumps(payload).encode('utf-8'))
+            except socket.error as e:
+                self.close_socket(e)
+
+        responses = []
+        for request_id, event in waiters:
+            if not event.wait(timeout):
+                with self._lock:
+                    for waiting_id, _ in waiters:
+                        self._pending.pop(waiting_id, None)
+                raise ValueError("Timeout waiting for response to {0}".format(request_id))
+            with self._lock:
+                _, response = self._pending.pop(request_id)
+            if isinstance(response, Exception):
+                raise response
+            responses.append(response)
+        return responses
+
+    def dispatch(self, response):
+        if isinstance(response, list):
+            for item in response:
+                self.dispatch(item)
+            return
+
+        with self._lock:
+            waiter = self._pending.get(response.get('id'))
+            if waiter is None:
+                self.logger.warning("Dropping response for unknown request: %s", response)
+                return
+            waiter[1] = response
+            waiter[0].set()
+
+    def close_socket(self, error):
+        """
+        Fail every pending request and drop the socket so that the next
+        request reconnects.  Must be called while holding the lock.
+        """
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except socket.error:
+                pass
+        self._socket = None
+        for request_id, waiter in tuple(self._pending.items()):
+            if waiter[1] is None:
+                waiter[1] = ValueError("IPC connection lost: {0}".format(error))
+                waiter[0].set()
+
+    def read_responses(self, _socket):
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder('utf-8')()
+        data = ''
+
+        while True:
+            try:
+                chunk = _socket.recv(4096)
+            except socket.error as e:
+                error = e
+                break
+            if not chunk:
+                error = "connection closed"
+                break
+
+            data += text_decoder.decode(chunk)
+            while True:
+                data = data.lstrip()
+                if not data:
+                    break
+                try:
+                    response, end = decoder.raw_decode(data)
+                except ValueError:
+                    # Incomplete response.  Wait for more data.
+                    break
+                data = data[end:]
+                self.dispatch(response)
+
+        with self._lock:
+            if self._socket is _socket:
+                self.close_socket(error)
+
+
+class PooledIPCClient(JSONRPCBaseClient):
+    """
+    Thread safe IPC JSON-RPC client.  Requests are spread across
+    `pool_size` connections, each of which can have any number of requests
+    in flight.  Responses are parsed as soon as they are complete rather
+    than waiting for the socket to go quiet.
+    """
+    def __init__(self, ipc_path, pool_size=2, timeout=30):
+        self.ipc_path = ipc_path
+        self.pool_size = pool_size
+        self.timeout = timeout
+
+        self._connections = [IPCConnection(ipc_path) for _ in range(pool_size)]
+        self._next_connection = 0
+        self._lock = threading.Lock()
+
+        # Requests are made on the calling thread.
+        super(PooledIPCClient, self).__init__(False)
+
+    def get_connection(self):
+        with self._lock:
+            connection = self._connections[self._next_connection]
+            self._next_connection = (self._next_connection + 1) % self.pool_size
+            return connection
+
+    def make_request(self, method, params):
+        payload, request_ids = construct_batch_request([(method, params)])
+        response, = self.get_connection().request(payload[0], request_ids, self.timeout)
+        return _check_response(response)
+
+    def make_batch_request(self, requests):
+        payload, request_ids = construct_batch_request(requests)
+        responses = self.get_connection().request(payload, request_ids, self.timeout)
+        return order_responses(request_ids, responses)
@@ -91,3 +91,14 @@ def get_logger(name, level=None):
         logger.addHandler(file_handler)
 
     return logger
+
+
+def get_percentile(values, percentile):
+    """
+    Return the `percentile` (0-100) of the values using the nearest rank.
+    """
+    values = sorted(values)
+    if not values:
+        raise ValueError("Cannot compute the percentile of no values")
+    rank = int(round(percentile / 100.0 * (len(values) - 1)))
+    return values[min(len(values) - 1, max(0, rank))]
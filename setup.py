@@ -24,6 +24,8 @@ setup(
         "populus>=0.7.2",
         "ethereum-rpc-client>=0.4.4",
         "ethereum-ipc-client>=0.1.9",
+        "ethereum-client-utils>=0.3.2",
+        "rlp>=0.4.4",
     ],
     license="MIT",
     zip_safe=False,
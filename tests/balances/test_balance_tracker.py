@@ -0,0 +1,94 @@
+from eth_alarm_client.balances import BalanceTracker
+
+
+COINBASE = '0xd3cda913deb6f67967b99d67acdfa1712c293601'
+CALL_ADDRESS = '0x0000000000000000000000000000000000000001'
+
+
+class BalanceClient(object):
+    def __init__(self, balances):
+        self.balances = balances
+        self.batches = []
+        self.requests = []
+
+    def respond(self, method, params):
+        assert method == 'eth_getBalance'
+        return {'result': hex(self.balances[params[0]])}
+
+    def make_batch_request(self, requests):
+        self.batches.append(requests)
+        return [self.respond(method, params) for method, params in requests]
+
+    def get_balance(self, address, block="latest"):
+        self.requests.append(address)
+        return self.balances[address]
+
+
+def test_balances_are_fetched_together_once_per_block(mock_block_sage):
+    client = BalanceClient({COINBASE: 1000, CALL_ADDRESS: 50})
+    tracker = BalanceTracker(client, mock_block_sage)
+    tracker.track(COINBASE)
+    tracker.track(CALL_ADDRESS)
+
+    assert tracker.get_balance(COINBASE) == 1000
+    assert tracker.get_balance(CALL_ADDRESS) == 50
+    assert tracker.get_balance(COINBASE) == 1000
+    assert len(client.batches) == 1
+    assert len(client.batches[0]) == 2
+
+    client.balances[COINBASE] = 900
+    mock_block_sage.current_block_number += 1
+    tracker.on_new_block(mock_block_sage.current_block_number, {})
+    assert tracker.get_balance(COINBASE) == 900
+    assert tracker.get_balance(CALL_ADDRESS) == 50
+    assert len(client.batches) == 2
+
+
+def test_untracked_address_is_fetched_on_first_use(mock_block_sage):
+    client = BalanceClient({COINBASE: 1000, CALL_ADDRESS: 50})
+    tracker = BalanceTracker(client, mock_block_sage)
+    tracker.track(COINBASE)
+    tracker.get_balance(COINBASE)
+
+    assert tracker.get_balance(CALL_ADDRESS) == 50
+    assert client.requests == [CALL_ADDRESS]
+
+    # Included in the batch from the next block on.
+    mock_block_sage.current_block_number += 1
+    tracker.get_balance(CALL_ADDRESS)
+    assert len(client.batches[-1]) == 2
+    assert client.requests == [CALL_ADDRESS]
+
+    tracker.untrack(CALL_ADDRESS)
+    mock_block_sage.current_block_number += 1
+    tracker.get_balance(COINBASE)
+    assert len(client.batches[-1]) == 1
+
+
+def test_reserved_funds_are_not_available(mock_block_sage):
+    client = BalanceClient({COINBASE: 1000})
+    tracker = BalanceTracker(client, mock_block_sage)
+
+    tracker.reserve(('claim', '0x1'), COINBASE, 300)
+    tracker.reserve(('claim', '0x2'), COINBASE, 200)
+    assert tracker.get_available_balance(COINBASE) == 500
+
+    tracker.release(('claim', '0x1'))
+    assert tracker.get_available_balance(COINBASE) == 800
+
+
+def test_release_waits_for_the_mined_block(mock_block_sage):
+    client = BalanceClient({COINBASE: 1000})
+    tracker = BalanceTracker(client, mock_block_sage)
+
+    tracker.reserve(('claim', '0x1'), COINBASE, 300)
+    assert tracker.get_available_balance(COINBASE) == 700
+
+    # Mined in a block that the balances have not been loaded for.
+    tracker.release(('claim', '0x1'), mock_block_sage.current_block_number + 1)
+    assert tracker.get_available_balance(COINBASE) == 700
+
+    client.balances[COINBASE] = 700
+    mock_block_sage.current_block_number += 1
+    assert tracker.get_available_balance(COINBASE) == 700
+    assert tracker.get_reserved(COINBASE) == 0
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from eth_alarm_client import batch
+from eth_alarm_client.batch import make_batch_request
+
+
+class SequentialClient(object):
+    def __init__(self):
+        self.requests = []
+
+    def make_request(self, method, params):
+        self.requests.append((method, params))
+        return {'result': method}
+
+
+class BatchingClient(object):
+    def __init__(self):
+        self.batches = []
+
+    def make_batch_request(self, requests):
+        self.batches.append(requests)
+        return [{'result': method} for method, params in requests]
+
+
+class MockResponse(object):
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class MockSession(object):
+    def __init__(self, responder):
+        self.responder = responder
+        self.posts = []
+
+    def post(self, url, data):
+        payload = json.loads(data)
+        self.posts.append(payload)
+        return MockResponse(self.responder(payload))
+
+
+class HTTPClient(object):
+    host = '127.0.0.1'
+    port = '8545'
+
+    def __init__(self, responder):
+        self.session = MockSession(responder)
+
+
+def test_falls_back_to_sequential_requests():
+    client = SequentialClient()
+    responses = make_batch_request(client, [('eth_a', []), ('eth_b', [1])])
+
+    assert [r['result'] for r in responses] == ['eth_a', 'eth_b']
+    assert client.requests == [('eth_a', []), ('eth_b', [1])]
+
+
+def test_uses_client_batching_in_chunks(monkeypatch):
+    monkeypatch.setattr(batch, 'MAX_BATCH_SIZE', 3)
+    client = BatchingClient()
+    requests = [('eth_{0}'.format(i), []) for i in range(7)]
+
+    responses = make_batch_request(client, requests)
+
+    assert [r['result'] for r in responses] == [m for m, _ in requests]
+    assert [len(b) for b in client.batches] == [3, 3, 1]
+
+
+def test_http_batch_responses_are_matched_by_id():
+    def responder(payload):
+        return [
+            {'id': request['id'], 'result': request['method']}
+            for request in reversed(payload)
+        ]
+    client = HTTPClient(responder)
+
+    responses = make_batch_request(client, [('eth_a', []), ('eth_b', [])])
+
+    assert [r['result'] for r in responses] == ['eth_a', 'eth_b']
+    assert len(client.session.posts) == 1
+
+
+def test_http_batch_error_raises():
+    def responder(payload):
+        return [
+            {'id': request['id'], 'error': {'message': 'boom'}}
+            for request in payload
+        ]
+    client = HTTPClient(responder)
+
+    with pytest.raises(ValueError):
+        make_batch_request(client, [('eth_a', [])])
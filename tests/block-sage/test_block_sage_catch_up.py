@@ -0,0 +1,163 @@
+from eth_alarm_client.block_sage import BlockSage
+from eth_alarm_client.block_time import WindowEstimator
+from eth_alarm_client.planner import ExecutionPlanner
+
+
+def make_batching_client(mock_blockchain_client_class):
+    class BatchingBlockchainClient(mock_blockchain_client_class):
+        def __init__(self, *args, **kwargs):
+            super(BatchingBlockchainClient, self).__init__(*args, **kwargs)
+            self.batches = []
+            self.missing = set()
+
+        def make_batch_request(self, requests):
+            self.batches.append(requests)
+            responses = []
+            for method, params in requests:
+                assert method == 'eth_getBlockByNumber'
+                block_number = int(params[0], 16)
+                if block_number > len(self.blocks) or block_number in self.missing:
+                    responses.append({'result': None})
+                else:
+                    responses.append({'result': self._get_block(block_number)})
+            return responses
+
+    return BatchingBlockchainClient()
+
+
+def make_block_sage(client, mock_logger, base_block_time=10, **kwargs):
+    block_sage = BlockSage(
+        client,
+        logger=mock_logger,
+        block_time_estimator=WindowEstimator(base_block_time),
+        **kwargs
+    )
+    seen = []
+    block_sage.on_new_block(lambda block_number, block: seen.append(block_number))
+    return block_sage, seen
+
+
+def stopped_block_sage(client, mock_logger):
+    block_sage, seen = make_block_sage(
+        client, mock_logger, base_block_time=1, poll_interval=0.01,
+    )
+    block_sage.stop()
+    block_sage._thread.join(5)
+    return block_sage, seen
+
+
+def test_skipped_blocks_are_fetched_in_one_batch(mock_blockchain_client_class, mock_logger):
+    client = make_batching_client(mock_blockchain_client_class)
+    block_sage, seen = stopped_block_sage(client, mock_logger)
+    start_block = block_sage.current_block_number
+    start_timestamp = client.blocks[-1]
+
+    for i in range(1, 6):
+        client.mine(start_timestamp + i * 3)
+
+    assert block_sage.catch_up(start_block + 5)
+
+    # Every block is announced in order and sampled.
+    assert seen == list(range(start_block + 1, start_block + 6))
+    assert len(client.batches) == 1
+    assert len(client.batches[0]) == 5
+    assert block_sage.current_block_number == start_block + 5
+    assert block_sage.block_time_estimator.sample_count == 5
+    assert block_sage.block_time == 3
+
+
+def test_catch_up_stops_at_missing_block(mock_blockchain_client_class, mock_logger):
+    client = make_batching_client(mock_blockchain_client_class)
+    block_sage, seen = stopped_block_sage(client, mock_logger)
+    start_block = block_sage.current_block_number
+
+    for _ in range(4):
+        client.mine()
+    client.missing.add(start_block + 3)
+
+    assert not block_sage.catch_up(start_block + 4)
+    assert seen == [start_block + 1, start_block + 2]
+    assert block_sage.current_block_number == start_block + 2
+
+    client.missing.clear()
+    assert block_sage.catch_up(start_block + 4)
+    assert seen == list(range(start_block + 1, start_block + 5))
+
+
+def test_poll_mode_catches_up_to_head(mock_blockchain_client_class, mock_logger, wait_till):
+    client = make_batching_client(mock_blockchain_client_class)
+    block_sage, seen = make_block_sage(
+        client, mock_logger, base_block_time=1, poll_interval=0.01,
+    )
+    start_block = block_sage.current_block_number
+
+    for _ in range(5):
+        client.mine()
+    wait_till(lambda: block_sage.current_block_number == start_block + 5, max_wait=5)
+    block_sage.stop()
+
+    assert seen == list(range(start_block + 1, start_block + 6))
+    assert block_sage.block_time_estimator.sample_count == 5
+
+
+def test_filter_mode_fills_in_missed_blocks(mock_blockchain_client, mock_logger, wait_till):
+    block_sage, seen = make_block_sage(
+        mock_blockchain_client, mock_logger, mode='filter', poll_interval=0.01,
+    )
+    start_block = block_sage.current_block_number
+    wait_till(lambda: mock_blockchain_client.filters, max_wait=2)
+
+    # The node drops the filter and the blocks mined before it is
+    # reinstalled are never reported by it.
+    mock_blockchain_client.filters.clear()
+    for _ in range(3):
+        mock_blockchain_client.mine()
+    wait_till(lambda: mock_blockchain_client.filters, max_wait=2)
+
+    mock_blockchain_client.mine()
+    wait_till(lambda: block_sage.current_block_number == start_block + 4, max_wait=2)
+    block_sage.stop()
+
+    assert seen == list(range(start_block + 1, start_block + 5))
+    assert block_sage.block_time_estimator.sample_count == 4
+
+
+class DueCall(object):
+    call_address = '0xd3cda913deb6f67967b99d67acdfa1712c293601'
+    last_block = 10 ** 6
+    base_payment = 10 ** 18
+    has_sent_execution = False
+    was_called = False
+    is_cancelled = False
+    scheduler_can_pay = True
+
+    def __init__(self):
+        self.sent = []
+
+    def should_call_on_block(self, block_number):
+        return True
+
+    def get_execution_gas(self):
+        return 300000
+
+    def submit_execution(self, block_number, execution_gas=None):
+        self.has_sent_execution = True
+        self.sent.append(block_number)
+
+
+def test_catching_up_dispatches_on_the_first_skipped_block(mock_blockchain_client_class, mock_logger):
+    client = make_batching_client(mock_blockchain_client_class)
+    block_sage, _ = stopped_block_sage(client, mock_logger)
+    planner = ExecutionPlanner(logger=mock_logger)
+    block_sage.on_new_block(planner.on_new_block)
+    call = DueCall()
+    planner.add(call)
+    start_block = block_sage.current_block_number
+
+    for _ in range(50):
+        client.mine()
+    assert block_sage.catch_up(start_block + 50)
+
+    # The call was due on every skipped block but is only sent once.
+    assert call.sent == [start_block + 1]
+    assert block_sage.block_time_estimator.sample_count == 50
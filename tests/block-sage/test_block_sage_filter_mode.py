@@ -0,0 +1,62 @@
+import time
+
+from eth_alarm_client.block_sage import BlockSage
+
+
+def test_block_sage_follows_block_filter(mock_blockchain_client, mock_logger, wait_till):
+    block_sage = BlockSage(
+        blockchain_client=mock_blockchain_client,
+        logger=mock_logger,
+        mode='filter',
+        poll_interval=0.01,
+    )
+
+    start = time.time()
+    for i in range(1, 10):
+        wait_till(lambda: block_sage.current_block_number == i, max_wait=2)
+        mock_blockchain_client.mine()
+
+    # Each block is picked up within a few poll intervals rather than
+    # after a full polling sleep.
+    assert time.time() - start < 5
+    assert len(mock_blockchain_client.filters) == 1
+    block_sage.stop()
+
+
+def test_block_sage_filter_mode_updates_block_time(mock_blockchain_client, mock_logger,
+                                                   wait_till):
+    block_sage = BlockSage(
+        blockchain_client=mock_blockchain_client,
+        logger=mock_logger,
+        base_block_time=4,
+        block_sample_window=10,
+        mode='filter',
+        poll_interval=0.01,
+    )
+    start_timestamp = mock_blockchain_client.blocks[0]
+
+    for i in range(1, 100):
+        wait_till(lambda: block_sage.current_block_number == i, max_wait=2)
+        mock_blockchain_client.mine(start_timestamp + i * 3)
+    wait_till(lambda: block_sage.current_block_number == 100, max_wait=2)
+
+    assert abs(block_sage.block_time - 3) < 0.1
+    block_sage.stop()
+
+
+def test_block_sage_reinstalls_lost_filter(mock_blockchain_client, mock_logger, wait_till):
+    block_sage = BlockSage(
+        blockchain_client=mock_blockchain_client,
+        logger=mock_logger,
+        mode='filter',
+        poll_interval=0.01,
+    )
+    wait_till(lambda: mock_blockchain_client.filters)
+    mock_blockchain_client.filters.clear()
+
+    wait_till(lambda: mock_blockchain_client.filters, max_wait=2)
+    mock_blockchain_client.mine()
+    wait_till(lambda: block_sage.current_block_number == 2, max_wait=2)
+
+    assert mock_logger.logs['warning']
+    block_sage.stop()
@@ -0,0 +1,61 @@
+import threading
+import time
+
+from eth_alarm_client.block_sage import BlockSage
+
+
+def test_wait_for_block_wakes_on_arrival(mock_blockchain_client, mock_logger):
+    block_sage = BlockSage(
+        blockchain_client=mock_blockchain_client,
+        logger=mock_logger,
+        mode='filter',
+        poll_interval=0.01,
+    )
+
+    timer = threading.Timer(0.2, mock_blockchain_client.mine)
+    timer.start()
+
+    start = time.time()
+    assert block_sage.wait_for_block(2, timeout=5) is True
+    assert time.time() - start < 2
+    block_sage.stop()
+
+
+def test_wait_for_block_timeout(mock_blockchain_client, mock_logger):
+    block_sage = BlockSage(
+        blockchain_client=mock_blockchain_client,
+        logger=mock_logger,
+        mode='filter',
+        poll_interval=0.01,
+    )
+
+    assert block_sage.wait_for_block(1, timeout=0.1) is True
+    assert block_sage.wait_for_block(2, timeout=0.1) is False
+    block_sage.stop()
+
+
+def test_new_block_callbacks(mock_blockchain_client, mock_logger, wait_till):
+    block_sage = BlockSage(
+        blockchain_client=mock_blockchain_client,
+        logger=mock_logger,
+        mode='filter',
+        poll_interval=0.01,
+    )
+    seen = []
+
+    def broken_callback(block_number, block):
+        raise ValueError("boom")
+
+    block_sage.on_new_block(broken_callback)
+    block_sage.on_new_block(lambda block_number, block: seen.append(block_number))
+
+    # Blocks mined before the filter is installed would not be reported.
+    wait_till(lambda: mock_blockchain_client.filters, max_wait=2)
+    mock_blockchain_client.mine()
+    wait_till(lambda: seen == [2], max_wait=2)
+    assert mock_logger.logs['error']
+
+    block_sage.remove_callback(broken_callback)
+    mock_blockchain_client.mine()
+    wait_till(lambda: seen == [2, 3], max_wait=2)
+    block_sage.stop()
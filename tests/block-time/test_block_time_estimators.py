@@ -0,0 +1,186 @@
+import time
+
+import pytest
+
+from eth_alarm_client import CallContract
+from eth_alarm_client.block_sage import BlockSage
+from eth_alarm_client.block_time import (
+    BlockTimeDistribution,
+    EWMAEstimator,
+    SeasonalEstimator,
+    WindowEstimator,
+    get_normal_quantile,
+)
+
+
+# 2016-01-01 at 03:00 and 15:00 UTC.
+NIGHT = 1451617200
+DAY = 1451660400
+
+
+def test_normal_quantile():
+    assert abs(get_normal_quantile(0.5)) < 0.001
+    assert abs(get_normal_quantile(0.975) - 1.96) < 0.001
+    assert abs(get_normal_quantile(0.1) + 1.2816) < 0.001
+
+    with pytest.raises(ValueError):
+        get_normal_quantile(1)
+
+
+def test_distribution_over_many_blocks():
+    distribution = BlockTimeDistribution(4, block_time=15, stddev=5)
+
+    assert distribution.mean == 60
+    assert distribution.stddev == 10
+    assert abs(distribution.percentile(50) - 60) < 0.01
+
+    low, high = distribution.interval(95)
+    assert abs(low - 40.4) < 0.1
+    assert abs(high - 79.6) < 0.1
+
+
+def test_distribution_is_never_negative():
+    assert BlockTimeDistribution(1, block_time=1, stddev=10).percentile(1) == 0
+
+
+def test_ewma_matches_running_average():
+    estimator = EWMAEstimator(base_block_time=4, alpha=1.0 / 10)
+
+    average = 4.0
+    for _ in range(50):
+        estimator.add_sample(3)
+        average = (9 * average + 3) / 10
+
+    assert abs(estimator.block_time - average) < 1e-9
+    # Identical block times leave little spread.
+    assert estimator.stddev < 0.5
+
+
+def test_ewma_does_not_go_below_minimum():
+    estimator = EWMAEstimator(base_block_time=2, alpha=0.5)
+    for _ in range(10):
+        estimator.add_sample(0)
+    assert estimator.block_time == 1
+
+
+def test_window_median_ignores_outliers():
+    estimator = WindowEstimator(base_block_time=10, sample_window=20)
+    assert estimator.block_time == 10
+
+    for block_time in [14, 15, 16] * 6 + [300, 300]:
+        estimator.add_sample(block_time)
+
+    assert estimator.block_time == 15
+    assert estimator.stddev == 1
+
+
+def test_window_only_keeps_recent_samples():
+    estimator = WindowEstimator(base_block_time=10, sample_window=5)
+    for _ in range(10):
+        estimator.add_sample(30)
+    for _ in range(5):
+        estimator.add_sample(12)
+
+    assert estimator.block_time == 12
+
+
+def test_seasonal_uses_hour_once_it_has_samples():
+    estimator = SeasonalEstimator(base_block_time=15, alpha=0.5, min_samples=3)
+
+    for _ in range(10):
+        estimator.add_sample(10, NIGHT)
+    estimator.add_sample(20, DAY)
+
+    # Too few samples for the day so the estimate for all hours is used.
+    assert estimator.get_estimator(DAY) is estimator.overall
+
+    for _ in range(10):
+        estimator.add_sample(20, DAY)
+
+    night = estimator.get_distribution(1, NIGHT)
+    day = estimator.get_distribution(1, DAY)
+    assert abs(night.mean - 10) < 0.1
+    assert abs(day.mean - 20) < 0.1
+
+
+def test_block_sage_percentiles(mock_blockchain_client, mock_logger):
+    block_sage = BlockSage(
+        mock_blockchain_client,
+        logger=mock_logger,
+        block_time_estimator=WindowEstimator(sample_window=10),
+    )
+    block_sage.stop()
+    for block_time in range(10, 20):
+        block_sage.add_block_time_sample(block_time, None)
+
+    target = block_sage.current_block_number + 4
+    assert block_sage.estimated_time_to_block(target) == 60
+    assert block_sage.estimated_time_to_block(target, percentile=10) < 60
+    assert block_sage.estimated_time_to_block(target, percentile=90) > 60
+
+    distribution = block_sage.get_time_to_block_distribution(target)
+    assert distribution.blocks == 4
+
+
+def test_call_window_wait_uses_percentile(mock_blockchain_client, mock_logger):
+    block_sage = BlockSage(mock_blockchain_client, logger=mock_logger, base_block_time=15)
+
+    call_contract = CallContract(
+        '0xd3cda913deb6f67967b99d67acdfa1712c293601',
+        mock_blockchain_client,
+        block_sage=block_sage,
+    )
+    call_contract._call_data.update({'targetBlock': 12, 'gracePeriod': 255})
+
+    average_wait = next(call_contract.wait_for_call_window_steps())
+    late_wait = next(call_contract.wait_for_call_window_steps(percentile=90))
+
+    assert average_wait.block_number == late_wait.block_number == 10
+    assert late_wait.timeout > average_wait.timeout
+    block_sage.stop()
+
+
+def test_low_percentiles_never_give_a_zero_wait(mock_blockchain_client, mock_logger):
+    block_sage = BlockSage(
+        mock_blockchain_client,
+        logger=mock_logger,
+        block_time_estimator=EWMAEstimator(15),
+    )
+
+    call_contract = CallContract(
+        '0xd3cda913deb6f67967b99d67acdfa1712c293601',
+        mock_blockchain_client,
+        block_sage=block_sage,
+    )
+    current_block_number = block_sage.current_block_number
+    for blocks in (1, 2, 3):
+        call_contract.__dict__.pop('target_block', None)
+        call_contract._call_data.update({
+            'targetBlock': current_block_number + blocks + 2,
+            'gracePeriod': 255,
+        })
+        for percentile in (1, 5, 10, 15):
+            # Most of these percentiles of the distribution itself are 0.
+            wait = next(call_contract.wait_for_call_window_steps(percentile=percentile))
+            assert wait.timeout >= 15 / 4.0
+    block_sage.stop()
+
+
+def test_polling_backs_off_once_the_block_is_overdue(mock_blockchain_client, mock_logger):
+    block_sage = BlockSage(
+        mock_blockchain_client,
+        logger=mock_logger,
+        block_time_estimator=EWMAEstimator(10),
+        poll_interval=0.5,
+    )
+    block_sage.stop()
+
+    # The next block is expected after the average block time by default.
+    block_sage.current_block_seen_at = time.time()
+    assert 9 < block_sage.sleep_time <= 10
+
+    block_sage.current_block_seen_at = time.time() - 100
+    assert block_sage.get_sleep_time(0) == 0.5
+    assert block_sage.get_sleep_time(1) == 1
+    assert block_sage.get_sleep_time(3) == 4
+    assert block_sage.get_sleep_time(10) == 10
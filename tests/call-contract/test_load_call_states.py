@@ -0,0 +1,203 @@
+from ethereum import abi
+from ethereum import utils as ethereum_utils
+
+from eth_alarm_client.call_store import CallStore
+from eth_alarm_client.call_contract import (
+    CallContract,
+    load_call_states,
+)
+from eth_alarm_client.gas_price import GasPriceOracle
+
+
+CALL_VALUES = {
+    'targetBlock': 150,
+    'gracePeriod': 255,
+    'callValue': 0,
+    'anchorGasPrice': 50000000000,
+    'requiredGas': 200000,
+    'requiredStackDepth': 10,
+    'basePayment': 1000000000000000000,
+    'baseDonation': 10000000000000000,
+    'abiSignature': '\x00\x00\x00\x01',
+    'contractAddress': '0xd3cda913deb6f67967b99d67acdfa1712c293601',
+    'schedulerAddress': '0xd3cda913deb6f67967b99d67acdfa1712c293601',
+    'claimer': '0x0000000000000000000000000000000000000000',
+    'claimerDeposit': 0,
+    'claimAmount': 0,
+    'wasSuccessful': False,
+    'wasCalled': False,
+    'isCancelled': False,
+}
+
+
+class BatchingContractClient(object):
+    """
+    Answers `eth_call` requests for the `FutureBlockCall` getters from
+    `CALL_VALUES` and counts each round trip.
+    """
+    def __init__(self):
+        self.batches = []
+        self.requests = []
+        self.return_data = {}
+
+    def register_call(self, call_contract):
+        for getter, value in CALL_VALUES.items():
+            function = getattr(call_contract.call, getter)
+            if function.output_types == ['address']:
+                value = value[2:]
+            call_data = function.get_call_data(())
+            self.return_data[call_data] = ethereum_utils.encode_hex(
+                abi.encode_abi(function.output_types, [value]),
+            )
+
+    def respond(self, method, params):
+        if method == 'eth_call':
+            return {'result': self.return_data[params[0]['data']]}
+        elif method == 'eth_getBalance':
+            return {'result': '0x{0:x}'.format(10 ** 21)}
+        elif method == 'eth_gasPrice':
+            return {'result': hex(20000000000)}
+        raise ValueError("Unexpected method {0}".format(method))
+
+    def make_batch_request(self, requests):
+        self.batches.append(requests)
+        return [self.respond(method, params) for method, params in requests]
+
+    def make_request(self, method, params):
+        self.requests.append((method, params))
+        return self.respond(method, params)
+
+    def get_balance(self, address, block="latest"):
+        return int(self.make_request('eth_getBalance', [address, block])['result'], 16)
+
+    def get_gas_price(self):
+        return int(self.make_request('eth_gasPrice', [])['result'], 16)
+
+
+def make_call_contract(client, block_sage, index, call_store=None):
+    call_contract = CallContract(
+        '0x{0:040x}'.format(index + 1),
+        client,
+        block_sage=block_sage,
+        call_store=call_store,
+    )
+    client.register_call(call_contract)
+    return call_contract
+
+
+def test_loads_many_calls_in_one_batch(mock_block_sage):
+    client = BatchingContractClient()
+    calls = [make_call_contract(client, mock_block_sage, i) for i in range(10)]
+
+    load_call_states(client, calls)
+
+    assert len(client.batches) == 1
+    # All getters and the balance for each call plus a single gas price.
+    assert len(client.batches[0]) == 10 * (len(CALL_VALUES) + 1) + 1
+
+    for call_contract in calls:
+        assert call_contract.target_block == 150
+        assert call_contract.base_payment == 1000000000000000000
+        assert call_contract.claimer is None
+        assert call_contract.was_called is False
+        assert call_contract.balance == 10 ** 21
+        assert call_contract.gas_price == 20000000000
+    assert client.requests == []
+
+
+def test_loaded_state_expires_with_the_block(mock_block_sage):
+    client = BatchingContractClient()
+    call_contract = make_call_contract(client, mock_block_sage, 0)
+
+    call_contract.load_state()
+    assert call_contract.balance == 10 ** 21
+    assert client.requests == []
+
+    mock_block_sage.current_block_number += 1
+
+    # Call data is kept while the state is fetched again.
+    assert call_contract.grace_period == 255
+    assert call_contract.balance == 10 ** 21
+    assert client.requests == [('eth_getBalance', [call_contract.call_address, 'latest'])]
+
+
+def test_call_data_is_only_loaded_once(mock_block_sage):
+    client = BatchingContractClient()
+    call_contract = make_call_contract(client, mock_block_sage, 0)
+
+    call_contract.load_state()
+    call_contract.load_state()
+
+    assert len(client.batches[0]) == len(CALL_VALUES) + 2
+    assert len(client.batches[1]) == len(CALL_VALUES) + 2 - len(call_contract._call_data)
+
+
+def get_call_store(path):
+    return CallStore(
+        path,
+        genesis_hash='0x' + '1' * 64,
+        scheduler_address=CALL_VALUES['schedulerAddress'],
+    )
+
+
+def test_call_data_is_read_from_call_store_after_restart(tmpdir, mock_block_sage):
+    path = str(tmpdir.join('calls.db'))
+
+    client = BatchingContractClient()
+    call_contract = make_call_contract(client, mock_block_sage, 0, get_call_store(path))
+    call_contract.load_state()
+    assert call_contract.abi_signature == CALL_VALUES['abiSignature']
+
+    restarted_client = BatchingContractClient()
+    restarted_call = make_call_contract(
+        restarted_client, mock_block_sage, 0, get_call_store(path),
+    )
+
+    assert restarted_call.target_block == 150
+    assert restarted_call.abi_signature == CALL_VALUES['abiSignature']
+    assert restarted_call.base_payment == 1000000000000000000
+    # Nothing is fetched for the stored data.
+    assert restarted_client.requests == []
+
+    restarted_call.load_state()
+    getters = [params[0]['data'] for method, params in restarted_client.batches[0]
+               if method == 'eth_call']
+    assert len(getters) == len(CALL_VALUES) - len(restarted_call._call_data)
+
+
+def test_call_data_of_many_calls_is_stored_at_once(tmpdir, mock_block_sage):
+    call_store = get_call_store(str(tmpdir.join('calls.db')))
+    writes = []
+    set_many_call_data = call_store.set_many_call_data
+
+    def record_write(call_data_by_address):
+        writes.append(sorted(call_data_by_address))
+        set_many_call_data(call_data_by_address)
+
+    call_store.set_many_call_data = record_write
+
+    client = BatchingContractClient()
+    call_contracts = [
+        make_call_contract(client, mock_block_sage, index, call_store)
+        for index in range(3)
+    ]
+    load_call_states(client, call_contracts)
+
+    assert writes == [sorted(call_contract.call_address for call_contract in call_contracts)]
+    for call_contract in call_contracts:
+        assert call_store.get_call_data(call_contract.call_address)['targetBlock'] == 150
+
+
+def test_gas_price_oracle_replaces_gas_price_request(mock_block_sage):
+    client = BatchingContractClient()
+    oracle = GasPriceOracle(client, mock_block_sage)
+    calls = [make_call_contract(client, mock_block_sage, i) for i in range(3)]
+    for call_contract in calls:
+        call_contract.gas_price_oracle = oracle
+
+    load_call_states(client, calls)
+
+    assert len(client.batches[0]) == 3 * (len(CALL_VALUES) + 1)
+    for call_contract in calls:
+        assert call_contract.gas_price == 20000000000
+    assert client.requests == [('eth_gasPrice', [])]
@@ -0,0 +1,59 @@
+from eth_alarm_client.call_store import CallStore
+
+
+CALL_ADDRESS = '0xd3cda913deb6f67967b99d67acdfa1712c293601'
+SCHEDULER_ADDRESS = '0x6c8f2a135f6ed072de4503bd7c4999a1a17f824b'
+GENESIS_HASH = '0x' + '1' * 64
+
+
+def get_store(path, genesis_hash=GENESIS_HASH, scheduler_address=SCHEDULER_ADDRESS):
+    return CallStore(path, genesis_hash=genesis_hash, scheduler_address=scheduler_address)
+
+
+def test_call_data_round_trip(tmpdir):
+    store = get_store(str(tmpdir.join('calls.db')))
+
+    store.set_call_data(CALL_ADDRESS, {
+        'targetBlock': 1500,
+        'basePayment': 10 ** 30,
+        'abiSignature': b'\x00\xff\x10\x01',
+        'contractAddress': CALL_ADDRESS,
+    })
+
+    assert store.get_call_data(CALL_ADDRESS) == {
+        'targetBlock': 1500,
+        'basePayment': 10 ** 30,
+        'abiSignature': b'\x00\xff\x10\x01',
+        'contractAddress': CALL_ADDRESS,
+    }
+
+
+def test_call_data_survives_reopening(tmpdir):
+    path = str(tmpdir.join('calls.db'))
+
+    store = get_store(path)
+    store.set_call_data(CALL_ADDRESS, {'targetBlock': 1500})
+    store.close()
+
+    assert get_store(path).get_call_data(CALL_ADDRESS) == {'targetBlock': 1500}
+
+
+def test_call_data_is_keyed_by_chain_and_scheduler(tmpdir):
+    path = str(tmpdir.join('calls.db'))
+    get_store(path).set_call_data(CALL_ADDRESS, {'targetBlock': 1500})
+
+    assert get_store(path, genesis_hash='0x' + '2' * 64).get_call_data(CALL_ADDRESS) == {}
+    assert get_store(path, scheduler_address=CALL_ADDRESS).get_call_data(CALL_ADDRESS) == {}
+    assert get_store(path).get_call_data(CALL_ADDRESS) == {'targetBlock': 1500}
+
+
+def test_delete_call_data(tmpdir):
+    path = str(tmpdir.join('calls.db'))
+    store = get_store(path)
+    other_chain = get_store(path, genesis_hash='0x' + '2' * 64)
+    store.set_call_data(CALL_ADDRESS, {'targetBlock': 1500})
+    other_chain.set_call_data(CALL_ADDRESS, {'targetBlock': 1600})
+
+    store.delete_call_data(CALL_ADDRESS)
+    assert store.get_call_data(CALL_ADDRESS) == {}
+    assert other_chain.get_call_data(CALL_ADDRESS) == {'targetBlock': 1600}
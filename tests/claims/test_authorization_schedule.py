@@ -0,0 +1,114 @@
+from eth_alarm_client import CallContract
+from eth_alarm_client.claims import (
+    CLAIMER_EXCLUSIVE_BLOCKS,
+    AuthorizationSchedule,
+)
+
+
+COINBASE = '0xd3cda913deb6f67967b99d67acdfa1712c293601'
+OTHER = '0x6c8f2a135f6ed072de4503bd7c4999a1a17f824b'
+EMPTY_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+
+def test_undesignated_call_is_open_for_the_whole_window():
+    schedule = AuthorizationSchedule(100, 355, None, COINBASE)
+
+    assert not schedule.is_authorized(99)
+    assert all(schedule.is_authorized(block_number) for block_number in range(100, 356))
+    assert not schedule.is_authorized(356)
+
+
+def test_claimer_is_authorized_for_the_whole_window():
+    schedule = AuthorizationSchedule(100, 355, COINBASE.upper().replace('0X', '0x'), COINBASE)
+
+    assert schedule.first_authorized_block == 100
+    assert schedule.is_authorized(100)
+
+
+def test_others_wait_for_the_claimer():
+    schedule = AuthorizationSchedule(100, 355, OTHER, COINBASE)
+
+    assert schedule.first_authorized_block == 100 + CLAIMER_EXCLUSIVE_BLOCKS
+    assert not schedule.is_authorized(100 + CLAIMER_EXCLUSIVE_BLOCKS - 1)
+    assert schedule.is_authorized(100 + CLAIMER_EXCLUSIVE_BLOCKS)
+    assert schedule.is_authorized(355)
+
+
+def make_call_contract(block_sage, claimer, contract_authorizations=None):
+    call_contract = CallContract(COINBASE, None, block_sage=block_sage)
+    call_contract._call_data.update({
+        'targetBlock': 100,
+        'gracePeriod': 255,
+        'claimer': claimer,
+    })
+    call_contract.__dict__['coinbase'] = COINBASE
+
+    checks = []
+
+    def can_call_at_block(block_number):
+        checks.append(block_number)
+        if contract_authorizations is None:
+            return True
+        return block_number in contract_authorizations
+    call_contract.can_call_at_block = can_call_at_block
+    return call_contract, checks
+
+
+def test_designated_call_is_checked_with_the_contract_at_the_boundary(mock_block_sage):
+    mock_block_sage.current_block_number = 100
+    call_contract, checks = make_call_contract(
+        mock_block_sage, OTHER, contract_authorizations=range(116, 356),
+    )
+
+    decisions = [
+        call_contract.should_call_on_block(block_number)
+        for block_number in range(100, 356)
+    ]
+
+    assert decisions == [False] * CLAIMER_EXCLUSIVE_BLOCKS + [True] * 240
+    assert checks == [115, 116]
+
+
+def test_undesignated_call_is_not_checked_with_the_contract(mock_block_sage):
+    mock_block_sage.current_block_number = 100
+    call_contract, checks = make_call_contract(mock_block_sage, EMPTY_ADDRESS)
+
+    assert call_contract.should_call_on_block(100)
+    assert call_contract.should_call_on_block(355)
+    assert not call_contract.should_call_on_block(356)
+    assert checks == []
+
+
+def test_mismatched_schedule_falls_back_to_the_contract(mock_block_sage):
+    mock_block_sage.current_block_number = 100
+    call_contract, checks = make_call_contract(
+        mock_block_sage, OTHER, contract_authorizations=range(100, 356),
+    )
+
+    assert call_contract.should_call_on_block(100)
+    assert call_contract.should_call_on_block(101)
+    assert checks == [115, 100, 101]
+
+
+def test_schedule_mismatch_at_first_open_block_falls_back(mock_block_sage):
+    mock_block_sage.current_block_number = 100
+    # The contract keeps the call to the claimer for longer than expected.
+    call_contract, checks = make_call_contract(
+        mock_block_sage, OTHER, contract_authorizations=range(120, 356),
+    )
+
+    assert not call_contract.should_call_on_block(116)
+    assert call_contract.should_call_on_block(120)
+    assert checks == [115, 116, 116, 120]
+
+
+def test_schedule_is_not_built_while_the_call_can_be_claimed(mock_block_sage):
+    mock_block_sage.current_block_number = 90
+    call_contract, checks = make_call_contract(
+        mock_block_sage, OTHER, contract_authorizations=range(116, 356),
+    )
+
+    assert call_contract.get_authorization_schedule() is None
+
+    mock_block_sage.current_block_number = 91
+    assert call_contract.get_authorization_schedule().first_authorized_block == 116
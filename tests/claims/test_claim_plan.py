@@ -0,0 +1,83 @@
+import pytest
+
+from eth_alarm_client import CallContract
+from eth_alarm_client.claims import (
+    get_claim_value,
+    get_first_profitable_claim_offset,
+    plan_claims,
+)
+
+
+BASE_PAYMENT = 24 * 10 ** 16
+
+
+class FakeCallContract(object):
+    def __init__(self, call_address, target_block, base_payment=BASE_PAYMENT):
+        self.call_address = call_address
+        self.base_payment = base_payment
+        self.first_claimable_block = target_block - 265
+        self.last_claimable_block = target_block - 10
+
+
+@pytest.mark.parametrize(
+    'claim_offset,expected',
+    (
+        (-1, 0),
+        (0, 0),
+        (1, BASE_PAYMENT // 240),
+        (120, BASE_PAYMENT // 2),
+        (240, BASE_PAYMENT),
+        (254, BASE_PAYMENT),
+        (300, BASE_PAYMENT),
+    ),
+)
+def test_claim_value_curve(claim_offset, expected):
+    assert get_claim_value(BASE_PAYMENT, claim_offset) == expected
+
+
+def test_first_profitable_claim_offset():
+    # Exactly covered by the payment 10 blocks in.
+    assert get_first_profitable_claim_offset(BASE_PAYMENT, BASE_PAYMENT // 24) == 10
+    assert get_first_profitable_claim_offset(BASE_PAYMENT, BASE_PAYMENT // 24 + 1) == 11
+    # Never profitable, so wait for the full payment.
+    assert get_first_profitable_claim_offset(BASE_PAYMENT, 2 * BASE_PAYMENT) == 240
+
+
+def test_call_contract_claim_value(mock_blockchain_client, mock_block_sage):
+    call_contract = CallContract(
+        '0xd3cda913deb6f67967b99d67acdfa1712c293601',
+        mock_blockchain_client,
+        block_sage=mock_block_sage,
+    )
+    call_contract._call_data.update({'targetBlock': 1000, 'basePayment': BASE_PAYMENT})
+
+    assert call_contract.first_claimable_block == 735
+    assert call_contract.get_claim_value(735) == 0
+    assert call_contract.get_claim_value(855) == BASE_PAYMENT // 2
+    assert call_contract.get_claim_value(990) == BASE_PAYMENT
+
+
+def test_claim_plan_ranking():
+    gas_price = 10 ** 11
+    # Claiming at this gas price costs 10/240ths of the base payment.
+    assert 100000 * gas_price == BASE_PAYMENT * 10 // 240
+
+    unprofitable = FakeCallContract('0xunprofitable', target_block=1000 + 265 - 5)
+    small = FakeCallContract('0xsmall', target_block=1000 + 265 - 50)
+    large = FakeCallContract('0xlarge', target_block=1000 + 265 - 240)
+    # The same payment as `large` but its claim window closes sooner.
+    urgent = FakeCallContract('0xurgent', target_block=1000 + 265 - 250)
+
+    claim_plan = plan_claims([unprofitable, small, large, urgent], 1000, gas_price)
+
+    assert [option.call_contract for option in claim_plan] == [
+        urgent, large, small, unprofitable,
+    ]
+    assert [option.is_profitable for option in claim_plan] == [True, True, True, False]
+
+    urgent_option, large_option, small_option, unprofitable_option = claim_plan
+    assert urgent_option.claim_offset == 250
+    assert urgent_option.claim_value == BASE_PAYMENT
+    assert large_option.claim_value == BASE_PAYMENT
+    assert small_option.profit == BASE_PAYMENT * 50 // 240 - BASE_PAYMENT * 10 // 240
+    assert unprofitable_option.first_profitable_block == 1000 - 5 + 10
@@ -12,25 +12,51 @@ def alarm_client_logging_config(monkeypatch):
 class MockBlockchainClient(object):
     def __init__(self, *blocks):
         self.blocks = list(blocks)
+        self.filters = {}
         if not self.blocks:
             self.mine()
 
+    def _get_block(self, block_number):
+        return {
+            'number': hex(block_number),
+            'blockNumber': hex(block_number),
+            'hash': '0x{0:064x}'.format(block_number),
+            'timestamp': hex(self.blocks[block_number - 1]),
+            'gasLimit': hex(3141592),
+        }
+
     def get_block_by_number(self, block_number, full_transactions=False):
         try:
             int_block_number = int(block_number, 16)
-            hex_block_number = block_number
         except (ValueError, TypeError):
             int_block_number = block_number
-            hex_block_number = hex(block_number)
 
-        return {
-            'blockNumber': hex_block_number,
-            'timestamp': hex(self.blocks[int_block_number - 1]),
-        }
+        return self._get_block(int_block_number)
+
+    def get_block_by_hash(self, block_hash, full_transactions=False):
+        return self._get_block(int(block_hash, 16))
 
     def get_block_number(self):
         return len(self.blocks)
 
+    def new_block_filter(self):
+        filter_id = hex(len(self.filters) + 1)
+        self.filters[filter_id] = len(self.blocks)
+        return filter_id
+
+    def get_filter_changes(self, filter_id):
+        if filter_id not in self.filters:
+            raise ValueError("filter not found")
+        last_seen = self.filters[filter_id]
+        self.filters[filter_id] = len(self.blocks)
+        return [
+            self._get_block(block_number)['hash']
+            for block_number in range(last_seen + 1, len(self.blocks) + 1)
+        ]
+
+    def uninstall_filter(self, filter_id):
+        return self.filters.pop(filter_id, None) is not None
+
     def mine(self, timestamp=None):
         if timestamp is None:
             timestamp = time.time()
@@ -64,6 +90,44 @@ class MockLogger(object):
         self.logs['error'].append((args, kwargs))
 
 
+class MockMeta(object):
+    def __init__(self, blockchain_client):
+        self.blockchain_client = blockchain_client
+
+
+class MockSchedulerContract(object):
+    minimum_grace_period = 16
+
+    def __init__(self, blockchain_client, block_sage):
+        self._meta = MockMeta(blockchain_client)
+        self.block_sage = block_sage
+
+    def getMinimumGracePeriod(self):
+        return self.minimum_grace_period
+
+
+class MockBlockSage(object):
+    is_alive = True
+    current_block_number = 100
+    block_time = 0.01
+
+    def on_new_block(self, callback):
+        pass
+
+    def remove_callback(self, callback):
+        pass
+
+
+@pytest.fixture()
+def mock_block_sage():
+    return MockBlockSage()
+
+
+@pytest.fixture()
+def mock_scheduler_contract(mock_blockchain_client, mock_block_sage):
+    return MockSchedulerContract(mock_blockchain_client, mock_block_sage)
+
+
 @pytest.fixture()
 def mock_logger():
     return MockLogger()
@@ -0,0 +1,57 @@
+from eth_alarm_client.discovery import LogCallDiscovery
+
+
+SCHEDULER_ADDRESS = '0x6c8f2a135f6ed072de4503bd7c4999a1a17f824b'
+
+
+def make_log(call_address, removed=False):
+    return {
+        'address': SCHEDULER_ADDRESS,
+        'data': '0x' + call_address[2:].zfill(64),
+        'removed': removed,
+    }
+
+
+class MockLogClient(object):
+    def __init__(self, logs_by_block):
+        self.logs_by_block = logs_by_block
+        self.requests = []
+
+    def get_logs(self, from_block=None, to_block=None, address=None, topics=None):
+        self.requests.append((int(from_block, 16), int(to_block, 16), address, topics))
+        return [
+            log_entry
+            for block_number in range(int(from_block, 16), int(to_block, 16) + 1)
+            for log_entry in self.logs_by_block.get(block_number, [])
+        ]
+
+
+def test_topic_is_zero_padded():
+    discovery = LogCallDiscovery(SCHEDULER_ADDRESS, MockLogClient({}))
+
+    assert len(discovery.topic) == 66
+    assert discovery.topic.startswith('0x')
+
+
+def test_new_calls_are_read_in_chunks(mock_logger):
+    client = MockLogClient({
+        3: [make_log('0xaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa')],
+        7: [
+            make_log('0xbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb'),
+            make_log('0xcccccccccccccccccccccccccccccccccccccccc', removed=True),
+        ],
+        12: [make_log('0xdddddddddddddddddddddddddddddddddddddddd')],
+    })
+    discovery = LogCallDiscovery(SCHEDULER_ADDRESS, client, from_block=1, logger=mock_logger)
+    discovery.LOG_CHUNK_SIZE = 5
+
+    assert discovery.get_new_calls(10) == [
+        '0xaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa',
+        '0xbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb',
+    ]
+    assert [(r[0], r[1]) for r in client.requests] == [(1, 5), (6, 10)]
+    assert all(r[2] == SCHEDULER_ADDRESS for r in client.requests)
+
+    assert discovery.get_new_calls(10) == []
+    assert discovery.get_new_calls(12) == ['0xdddddddddddddddddddddddddddddddddddddddd']
+    assert client.requests[-1][:2] == (11, 12)
@@ -0,0 +1,91 @@
+from eth_alarm_client.engine import (
+    ExecutionEngine,
+    WaitForBlock,
+)
+
+
+class FakeBlockSage(object):
+    def __init__(self):
+        self.current_block_number = 1
+        self.callbacks = []
+
+    def on_new_block(self, callback):
+        self.callbacks.append(callback)
+
+    def advance(self):
+        self.current_block_number += 1
+        for callback in self.callbacks:
+            callback(self.current_block_number, {})
+
+
+def block_waiting_steps(block_sage, block_number, results, timeout=60):
+    yield WaitForBlock(block_sage, block_number, timeout)
+    results.append(block_sage.current_block_number)
+
+
+def test_tasks_resume_on_block_arrival(mock_logger, wait_till):
+    engine = ExecutionEngine(logger=mock_logger)
+    block_sage = FakeBlockSage()
+    results = []
+
+    tasks = [
+        engine.spawn(block_waiting_steps(block_sage, block_number, results))
+        for block_number in (2, 3, 3)
+    ]
+    wait_till(lambda: block_sage.callbacks)
+    assert len(block_sage.callbacks) == 1
+
+    block_sage.advance()
+    wait_till(lambda: results == [2])
+    assert tasks[1].is_alive() and tasks[2].is_alive()
+
+    block_sage.advance()
+    wait_till(lambda: not any(task.is_alive() for task in tasks))
+    assert results == [2, 3, 3]
+    engine.stop()
+
+
+def test_tasks_resume_on_timeout(mock_logger, wait_till):
+    engine = ExecutionEngine(logger=mock_logger)
+    block_sage = FakeBlockSage()
+    results = []
+
+    task = engine.spawn(block_waiting_steps(block_sage, 10, results, timeout=0.05))
+    wait_till(lambda: not task.is_alive())
+    assert results == [1]
+
+    # The stale block wait does not resume the finished task again.
+    for _ in range(10):
+        block_sage.advance()
+    assert results == [1]
+    engine.stop()
+
+
+def test_already_reached_blocks_do_not_wait(mock_logger, wait_till):
+    engine = ExecutionEngine(logger=mock_logger)
+    block_sage = FakeBlockSage()
+    results = []
+
+    task = engine.spawn(block_waiting_steps(block_sage, 1, results))
+    wait_till(lambda: not task.is_alive())
+    assert results == [1]
+    assert not block_sage.callbacks
+    engine.stop()
+
+
+def test_task_count_only_counts_unfinished_tasks(mock_logger, wait_till):
+    engine = ExecutionEngine(logger=mock_logger)
+    block_sage = FakeBlockSage()
+    results = []
+
+    waiting = engine.spawn(block_waiting_steps(block_sage, 2, results, timeout=None))
+    finished = engine.spawn(block_waiting_steps(block_sage, 1, results))
+    wait_till(lambda: not finished.is_alive())
+
+    # The waiting task is only tracked by its block wait.
+    assert engine.task_count == 1
+
+    block_sage.advance()
+    wait_till(lambda: not waiting.is_alive())
+    assert engine.task_count == 0
+    engine.stop()
@@ -0,0 +1,119 @@
+import pytest
+
+from eth_alarm_client.engine import (
+    ExecutionEngine,
+    run_steps,
+    wait_for_receipt_steps,
+)
+
+
+def counting_steps(results, key, count, delay=0.01):
+    for i in range(count):
+        results.append((key, i))
+        yield delay
+
+
+def test_engine_runs_tasks_to_completion(mock_logger, wait_till):
+    engine = ExecutionEngine(logger=mock_logger)
+    results = []
+
+    tasks = [
+        engine.spawn(counting_steps(results, key, 3), name=str(key))
+        for key in range(5)
+    ]
+
+    wait_till(lambda: not any(task.is_alive() for task in tasks))
+    assert sorted(results) == sorted((key, i) for key in range(5) for i in range(3))
+    engine.stop()
+
+
+def test_engine_runs_many_tasks_on_one_thread(mock_logger, wait_till):
+    import threading
+
+    engine = ExecutionEngine(logger=mock_logger)
+    thread_count = threading.active_count()
+    results = []
+
+    tasks = [
+        engine.spawn(counting_steps(results, key, 2, delay=0.1))
+        for key in range(1000)
+    ]
+    assert threading.active_count() == thread_count
+
+    wait_till(lambda: not any(task.is_alive() for task in tasks))
+    assert len(results) == 2000
+    engine.stop()
+
+
+def test_engine_resumes_tasks_by_wake_time(mock_logger, wait_till):
+    engine = ExecutionEngine(logger=mock_logger)
+    results = []
+
+    slow = engine.spawn(counting_steps(results, 'slow', 2, delay=0.5))
+    fast = engine.spawn(counting_steps(results, 'fast', 2, delay=0.01))
+
+    wait_till(lambda: not slow.is_alive() and not fast.is_alive())
+    assert results.index(('fast', 1)) < results.index(('slow', 1))
+    engine.stop()
+
+
+def test_engine_survives_task_errors(mock_logger, wait_till):
+    engine = ExecutionEngine(logger=mock_logger)
+
+    def failing_steps():
+        yield 0
+        raise ValueError("boom")
+
+    task = engine.spawn(failing_steps(), name='failing')
+    wait_till(lambda: not task.is_alive())
+
+    assert isinstance(task.exception, ValueError)
+    assert mock_logger.logs['error']
+
+    results = []
+    other = engine.spawn(counting_steps(results, 'other', 1))
+    wait_till(lambda: not other.is_alive())
+    assert results == [('other', 0)]
+    engine.stop()
+
+
+def test_cancelled_tasks_stop(mock_logger, wait_till):
+    engine = ExecutionEngine(logger=mock_logger)
+    results = []
+
+    task = engine.spawn(counting_steps(results, 'cancelled', 1000, delay=0.05))
+    wait_till(lambda: results)
+    task.cancel()
+
+    wait_till(lambda: not task.is_alive())
+    assert len(results) < 1000
+    engine.stop()
+
+
+class ReceiptClient(object):
+    def __init__(self, available_after):
+        self.available_after = available_after
+        self.polls = 0
+
+    def get_transaction_receipt(self, txn_hash):
+        self.polls += 1
+        if self.polls > self.available_after:
+            return {'transactionHash': txn_hash}
+        return None
+
+
+def test_wait_for_receipt_steps():
+    client = ReceiptClient(available_after=2)
+    receipts = {}
+
+    steps = list(wait_for_receipt_steps(client, '0xabc', receipts, poll_interval=1))
+
+    assert steps == [1, 1]
+    assert receipts == {'0xabc': {'transactionHash': '0xabc'}}
+
+
+def test_wait_for_receipt_steps_timeout():
+    client = ReceiptClient(available_after=1000)
+
+    with pytest.raises(ValueError):
+        run_steps(wait_for_receipt_steps(client, '0xabc', {}, max_wait=0.05, poll_interval=0.01))
@@ -0,0 +1,245 @@
+import rlp
+
+from ethereum import utils as ethereum_utils
+from ethereum.transactions import Transaction
+
+from eth_alarm_client import CallContract
+from eth_alarm_client.call_contract import EMPTY_ADDRESS
+from eth_alarm_client.engine import WaitForBlock
+from eth_alarm_client.execution import (
+    LocalSigner,
+    TransactionPreparer,
+)
+from eth_alarm_client.nonces import NonceManager
+from eth_alarm_client.receipts import ReceiptWatcher
+
+
+PRIVATE_KEY = ethereum_utils.sha3('eth-alarm-client')
+COINBASE = '0x' + ethereum_utils.encode_hex(ethereum_utils.privtoaddr(PRIVATE_KEY))
+CALL_ADDRESS = '0xd3cda913deb6f67967b99d67acdfa1712c293601'
+
+
+class TransactionClient(object):
+    def __init__(self, transaction_count=0):
+        self.transaction_count = transaction_count
+        self.sent = []
+
+    def make_request(self, method, params):
+        if method == 'eth_getTransactionCount':
+            return {'result': hex(self.transaction_count)}
+        elif method == 'eth_sendRawTransaction':
+            transaction = rlp.decode(
+                ethereum_utils.decode_hex(params[0][2:]), Transaction,
+            )
+            self.sent.append((method, transaction))
+            return {'result': '0x' + ethereum_utils.encode_hex(transaction.hash)}
+        elif method == 'eth_sendTransaction':
+            self.sent.append((method, params[0]))
+            return {'result': '0x' + '1' * 64}
+        elif method == 'eth_coinbase':
+            return {'result': COINBASE}
+        raise ValueError("Unexpected method {0}".format(method))
+
+    def get_coinbase(self):
+        return self.make_request('eth_coinbase', [])['result']
+
+
+class FakeBlockSage(object):
+    is_alive = True
+    block_time = 0.01
+
+    def __init__(self, current_block_number):
+        self.current_block_number = current_block_number
+        self.current_block = {'gasLimit': hex(3141592)}
+        self.callbacks = []
+
+    def on_new_block(self, callback):
+        self.callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        self.callbacks.remove(callback)
+
+    def estimated_time_to_block(self, block_number, percentile=None):
+        return self.block_time * max(1, block_number - self.current_block_number)
+
+    def advance(self):
+        self.current_block_number += 1
+        for callback in tuple(self.callbacks):
+            callback(self.current_block_number, self.current_block)
+
+
+class FakeGasPriceOracle(object):
+    gas_price = 20000000000
+
+
+class FakeBalanceTracker(object):
+    def get_balance(self, address):
+        return 10 ** 21
+
+    def reserve(self, key, address, amount):
+        pass
+
+    def release(self, key, block_number=None):
+        pass
+
+
+def make_call_contract(client, block_sage, transaction_preparer):
+    call_contract = CallContract(
+        CALL_ADDRESS,
+        client,
+        block_sage=block_sage,
+        gas_price_oracle=FakeGasPriceOracle(),
+        balance_tracker=FakeBalanceTracker(),
+        receipt_watcher=ReceiptWatcher(client),
+        transaction_preparer=transaction_preparer,
+    )
+    call_contract._call_data.update({
+        'targetBlock': 110,
+        'gracePeriod': 255,
+        'callValue': 0,
+        'requiredGas': 200000,
+        'basePayment': 10 ** 18,
+        'baseDonation': 10 ** 16,
+        'wasCalled': False,
+        'isCancelled': False,
+        'claimer': EMPTY_ADDRESS,
+    })
+    call_contract.__dict__['coinbase'] = COINBASE
+    return call_contract
+
+
+def test_local_signer():
+    signer = LocalSigner(ethereum_utils.encode_hex(PRIVATE_KEY))
+    assert signer.address == COINBASE
+
+    raw_transaction, txn_hash = signer.sign_transaction(
+        3, 20000000000, 100000, CALL_ADDRESS, 0, '61461954',
+    )
+    transaction = rlp.decode(ethereum_utils.decode_hex(raw_transaction[2:]), Transaction)
+    assert transaction.nonce == 3
+    assert transaction.startgas == 100000
+    assert '0x' + ethereum_utils.encode_hex(transaction.sender) == COINBASE
+    assert '0x' + ethereum_utils.encode_hex(transaction.hash) == txn_hash
+
+
+def test_prepared_transactions_use_local_nonces():
+    client = TransactionClient(transaction_count=7)
+    preparer = TransactionPreparer(client, signer=LocalSigner(PRIVATE_KEY))
+
+    first = preparer.prepare(CALL_ADDRESS, '61461954', 100000, 20000000000)
+    second = preparer.prepare(CALL_ADDRESS, '61461954', 100000, 20000000000)
+    assert (first.nonce, second.nonce) == (7, 8)
+
+    # The nonce of a discarded transaction is used again.
+    first.discard()
+    third = preparer.prepare(CALL_ADDRESS, '61461954', 100000, 20000000000)
+    assert third.nonce == 7
+
+    txn_hash = second.send()
+    method, transaction = client.sent[0]
+    assert method == 'eth_sendRawTransaction'
+    assert transaction.nonce == 8
+    assert txn_hash == '0x' + ethereum_utils.encode_hex(transaction.hash)
+
+
+def test_unsigned_transactions_are_sent_by_the_node():
+    client = TransactionClient()
+    preparer = TransactionPreparer(client)
+
+    prepared = preparer.prepare(CALL_ADDRESS, '61461954', 100000, 20000000000)
+    prepared.send()
+
+    method, transaction = client.sent[0]
+    assert method == 'eth_sendTransaction'
+    assert transaction['from'] == COINBASE
+    assert transaction['gas'] == hex(100000)
+    assert 'nonce' not in transaction
+
+
+def test_execution_is_sent_on_block_before_target():
+    client = TransactionClient()
+    block_sage = FakeBlockSage(107)
+    nonce_manager = NonceManager(client, COINBASE)
+    preparer = TransactionPreparer(
+        client, signer=LocalSigner(PRIVATE_KEY), nonce_manager=nonce_manager,
+    )
+    call_contract = make_call_contract(client, block_sage, preparer)
+
+    steps = call_contract.execute_steps()
+    step = next(steps)
+    assert isinstance(step, WaitForBlock) and step.block_number == 108
+
+    block_sage.advance()
+    step = next(steps)
+    # Armed and waiting for the block before the target block.
+    assert call_contract.is_armed
+    assert isinstance(step, WaitForBlock) and step.block_number == 109
+    assert client.sent == []
+
+    # Sent from the block sage's callback as soon as the block arrives.
+    block_sage.advance()
+    assert len(client.sent) == 1
+    method, transaction = client.sent[0]
+    assert method == 'eth_sendRawTransaction'
+    assert transaction.startgas == 300000
+
+    # The call loop then waits for the receipt of the prepared transaction.
+    step = next(steps)
+    assert not isinstance(step, WaitForBlock)
+    assert len(client.sent) == 1
+
+    steps.close()
+    assert block_sage.callbacks == []
+
+
+def test_unsent_execution_releases_its_nonce():
+    client = TransactionClient()
+    block_sage = FakeBlockSage(108)
+    nonce_manager = NonceManager(client, COINBASE)
+    preparer = TransactionPreparer(
+        client, signer=LocalSigner(PRIVATE_KEY), nonce_manager=nonce_manager,
+    )
+    call_contract = make_call_contract(client, block_sage, preparer)
+
+    steps = call_contract.execute_steps()
+    next(steps)
+    assert call_contract.is_armed
+
+    call_contract._call_data['wasCalled'] = True
+    block_sage.current_block_number = 109
+    for _ in steps:
+        pass
+
+    assert client.sent == []
+    assert block_sage.callbacks == []
+    assert nonce_manager.get_next_nonce() == 0
+
+
+def test_cached_call_sends_a_new_execution_when_run_again():
+    client = TransactionClient()
+    block_sage = FakeBlockSage(108)
+    nonce_manager = NonceManager(client, COINBASE)
+    preparer = TransactionPreparer(
+        client, signer=LocalSigner(PRIVATE_KEY), nonce_manager=nonce_manager,
+    )
+    call_contract = make_call_contract(client, block_sage, preparer)
+
+    steps = call_contract.execute_steps()
+    next(steps)
+    block_sage.advance()
+    assert call_contract.has_sent_execution
+    # The attempt dies before the execution is mined.
+    steps.close()
+    assert call_contract._prepared_execution is None
+
+    # The call is scheduled again from the scheduler's cache.
+    block_sage.current_block_number = 108
+    steps = call_contract.execute_steps()
+    step = next(steps)
+    assert isinstance(step, WaitForBlock) and step.block_number == 109
+    assert call_contract.is_armed
+    assert not call_contract.has_sent_execution
+
+    block_sage.advance()
+    assert [transaction.nonce for _, transaction in client.sent] == [0, 1]
+    steps.close()
@@ -0,0 +1,87 @@
+from eth_alarm_client.gas_price import GasPriceOracle
+from eth_alarm_client.utils import get_percentile
+
+
+class GasPriceClient(object):
+    def __init__(self, gas_price=20000000000):
+        self.gas_price = gas_price
+        self.gas_price_requests = 0
+        self.batches = []
+        self.blocks = {}
+
+    def get_gas_price(self):
+        self.gas_price_requests += 1
+        return self.gas_price
+
+    def make_batch_request(self, requests):
+        self.batches.append(requests)
+        responses = []
+        for method, params in requests:
+            assert method == 'eth_getBlockByNumber'
+            gas_prices = self.blocks.get(int(params[0], 16), [])
+            responses.append({'result': {
+                'transactions': [{'gasPrice': hex(gas_price)} for gas_price in gas_prices],
+            }})
+        return responses
+
+
+def test_percentile():
+    values = [5, 1, 4, 2, 3]
+    assert get_percentile(values, 0) == 1
+    assert get_percentile(values, 50) == 3
+    assert get_percentile(values, 100) == 5
+
+
+def test_gas_price_is_fetched_once_per_block(mock_block_sage):
+    client = GasPriceClient()
+    oracle = GasPriceOracle(client, mock_block_sage)
+
+    assert oracle.gas_price == 20000000000
+    assert oracle.gas_price == 20000000000
+    assert client.gas_price_requests == 1
+
+    client.gas_price = 30000000000
+    mock_block_sage.current_block_number += 1
+    assert oracle.gas_price == 30000000000
+    assert client.gas_price_requests == 2
+
+
+def test_new_block_callback_refreshes_price(mock_block_sage):
+    client = GasPriceClient()
+    oracle = GasPriceOracle(client, mock_block_sage)
+
+    mock_block_sage.current_block_number = 101
+    oracle.on_new_block(101, {})
+    assert client.gas_price_requests == 1
+
+    assert oracle.gas_price == 20000000000
+    assert client.gas_price_requests == 1
+
+
+def test_percentile_of_recent_blocks(mock_block_sage):
+    client = GasPriceClient()
+    client.blocks = {
+        98: [10, 20],
+        99: [30],
+        100: [40, 50],
+    }
+    oracle = GasPriceOracle(client, mock_block_sage, percentile=50, sample_size=3)
+
+    assert oracle.gas_price == 30
+    assert len(client.batches) == 1
+    assert len(client.batches[0]) == 3
+
+    # Only the new block is fetched and the oldest one leaves the window.
+    client.blocks[101] = [60, 70]
+    mock_block_sage.current_block_number = 101
+    assert oracle.gas_price == 50
+    assert len(client.batches[1]) == 1
+    assert client.gas_price_requests == 0
+
+
+def test_percentile_falls_back_to_node_price(mock_block_sage):
+    client = GasPriceClient()
+    oracle = GasPriceOracle(client, mock_block_sage, percentile=50, sample_size=3)
+
+    assert oracle.gas_price == 20000000000
+    assert client.gas_price_requests == 1
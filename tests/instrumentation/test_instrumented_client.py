@@ -0,0 +1,99 @@
+import pytest
+
+from eth_alarm_client.batch import make_batch_request
+from eth_alarm_client.instrumentation import InstrumentedClient
+
+
+class Client(object):
+    host = '127.0.0.1'
+
+    def make_request(self, method, params):
+        if method == 'eth_fail':
+            raise ValueError("request failed")
+        return {'result': '0x10'}
+
+    def get_balance(self, address):
+        return int(self.make_request('eth_getBalance', [address])['result'], 16)
+
+
+class BatchingClient(Client):
+    def __init__(self):
+        self.batches = []
+
+    def make_batch_request(self, requests):
+        self.batches.append(requests)
+        return [{'result': '0x10'} for _ in requests]
+
+
+def test_helper_methods_are_recorded():
+    client = InstrumentedClient(Client())
+
+    assert client.get_balance('0xabc') == 16
+    assert client.host == '127.0.0.1'
+
+    stats = client.stats.get_stats()
+    assert stats['default']['eth_getBalance']['count'] == 1
+    assert stats['default']['eth_getBalance']['errors'] == 0
+
+
+def test_errors_are_recorded():
+    client = InstrumentedClient(Client())
+
+    with pytest.raises(ValueError):
+        client.make_request('eth_fail', [])
+
+    stats = client.stats.get_stats()
+    assert stats['default']['eth_fail']['count'] == 1
+    assert stats['default']['eth_fail']['errors'] == 1
+
+
+def test_subsystems_share_stats():
+    client = InstrumentedClient(Client())
+    scheduler_client = client.subsystem('scheduler')
+    block_sage_client = client.subsystem('blocksage')
+
+    scheduler_client.get_balance('0xabc')
+    scheduler_client.get_balance('0xabc')
+    block_sage_client.make_request('eth_blockNumber', [])
+
+    stats = client.stats.get_stats()
+    assert stats['scheduler']['eth_getBalance']['count'] == 2
+    assert stats['blocksage']['eth_blockNumber']['count'] == 1
+    assert 'default' not in stats
+
+    summary = client.stats.summary()
+    assert summary[0].startswith('scheduler: 2 requests in 2 round trips')
+
+
+def test_batches_are_recorded_as_one_round_trip():
+    inner_client = BatchingClient()
+    client = InstrumentedClient(inner_client)
+
+    make_batch_request(client, [('eth_call', []), ('eth_call', []), ('eth_gasPrice', [])])
+
+    assert len(inner_client.batches) == 1
+    assert client.stats.get_round_trips() == {'default': 1}
+    stats = client.stats.get_stats()
+    assert stats['default']['eth_call']['count'] == 2
+    assert stats['default']['eth_gasPrice']['count'] == 1
+
+
+def test_unbatched_clients_record_each_request():
+    client = InstrumentedClient(Client())
+
+    make_batch_request(client, [('eth_call', []), ('eth_call', [])])
+
+    assert client.stats.get_round_trips() == {'default': 2}
+
+
+def test_latency_histogram_is_cumulative():
+    client = InstrumentedClient(Client())
+    client.stats.record('default', ('eth_call',), 0.02)
+    client.stats.record('default', ('eth_call',), 3)
+
+    histogram = dict(client.stats.get_stats()['default']['eth_call']['histogram'])
+    assert histogram[0.01] == 0
+    assert histogram[0.025] == 1
+    assert histogram[2.5] == 1
+    assert histogram[5] == 2
+    assert histogram[float('inf')] == 2
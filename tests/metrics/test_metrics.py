@@ -0,0 +1,104 @@
+try:
+    from urllib.request import urlopen
+except ImportError:
+    from urllib2 import urlopen
+
+from eth_alarm_client import Scheduler
+from eth_alarm_client.instrumentation import RPCStats
+from eth_alarm_client.metrics import (
+    MetricsServer,
+    render_metrics,
+)
+
+
+class FinishedCall(object):
+    target_block = 100
+    last_block = 355
+    txn_hash = '0xabc'
+    txn_receipt = {'blockNumber': hex(103)}
+
+
+def test_render_scheduler_metrics(mock_scheduler_contract, mock_block_sage,
+                                  mock_blockchain_client):
+    for _ in range(4):
+        mock_blockchain_client.mine()
+    mock_block_sage.current_block_number = 2
+
+    scheduler = Scheduler(mock_scheduler_contract, block_sage=mock_block_sage)
+    scheduler.metrics.tick_durations.observe(0.3)
+    scheduler.metrics.claims_won += 2
+    scheduler.metrics.claims_lost += 1
+    scheduler.active_calls['0xabc'] = FinishedCall()
+    scheduler.cleanup_calls()
+
+    page = render_metrics(scheduler)
+
+    assert 'eth_alarm_node_block_number 5\n' in page
+    assert 'eth_alarm_block_lag 3\n' in page
+    assert 'eth_alarm_active_calls 0\n' in page
+    assert 'eth_alarm_claims_total{result="won"} 2\n' in page
+    assert 'eth_alarm_claims_total{result="lost"} 1\n' in page
+    assert 'eth_alarm_tick_duration_seconds_bucket{le="0.25"} 0\n' in page
+    assert 'eth_alarm_tick_duration_seconds_bucket{le="0.5"} 1\n' in page
+    assert 'eth_alarm_tick_duration_seconds_count 1\n' in page
+    assert 'eth_alarm_executions_total 1\n' in page
+    assert 'eth_alarm_execution_delay_blocks_bucket{le="3"} 1\n' in page
+    assert page.count('# TYPE eth_alarm_claims_total counter') == 1
+
+
+def test_render_rpc_metrics(mock_scheduler_contract, mock_block_sage):
+    rpc_stats = RPCStats()
+    rpc_stats.record('calls', ('eth_call', 'eth_call'), 0.02)
+    rpc_stats.record('blocksage', ('eth_blockNumber',), 0.001, error=True)
+
+    scheduler = Scheduler(mock_scheduler_contract, block_sage=mock_block_sage)
+    page = render_metrics(scheduler, rpc_stats)
+
+    assert 'eth_alarm_rpc_round_trips_total{subsystem="calls"} 1\n' in page
+    assert 'eth_alarm_rpc_requests_total{method="eth_call",subsystem="calls"} 2\n' in page
+    assert (
+        'eth_alarm_rpc_errors_total{method="eth_blockNumber",subsystem="blocksage"} 1\n'
+    ) in page
+    assert (
+        'eth_alarm_rpc_request_duration_seconds_bucket'
+        '{le="0.025",method="eth_call",subsystem="calls"} 2\n'
+    ) in page
+
+
+def test_metrics_server(mock_scheduler_contract, mock_block_sage):
+    scheduler = Scheduler(mock_scheduler_contract, block_sage=mock_block_sage)
+    server = MetricsServer(scheduler, port=0)
+    try:
+        response = urlopen('http://127.0.0.1:{0}/metrics'.format(server.port))
+        page = response.read().decode('utf-8')
+    finally:
+        server.stop()
+
+    assert 'eth_alarm_active_claims 0\n' in page
+
+
+def test_samples_are_grouped_by_family(mock_scheduler_contract, mock_block_sage,
+                                       mock_blockchain_client):
+    mock_blockchain_client.node_stats = [
+        {'name': name, 'healthy': True, 'latency': 0.01, 'head': 5, 'head_lag': 0}
+        for name in ('a', 'b')
+    ]
+    rpc_stats = RPCStats()
+    rpc_stats.record('calls', ('eth_call',), 0.02)
+    rpc_stats.record('calls', ('eth_getBalance',), 0.02)
+
+    scheduler = Scheduler(mock_scheduler_contract, block_sage=mock_block_sage)
+    page = render_metrics(scheduler, rpc_stats)
+
+    family = None
+    seen = set()
+    for line in page.splitlines():
+        if line.startswith('# TYPE '):
+            family = line.split()[2]
+            assert family not in seen
+            seen.add(family)
+        elif not line.startswith('#'):
+            # Every sample follows the header of its own family.
+            assert line.startswith(family)
+
+    assert 'eth_alarm_node_healthy{node="a"} 1\neth_alarm_node_healthy{node="b"} 1\n' in page
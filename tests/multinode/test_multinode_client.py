@@ -0,0 +1,263 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from eth_alarm_client.multinode import (
+    MultiNodeClient,
+    is_transport_error,
+)
+
+
+class FakeNodeClient(object):
+    def __init__(self, head=100, latency=0.0, nonce=0):
+        self.head = head
+        self.latency = latency
+        self.nonce = nonce
+        self.fail = False
+        self.reject = False
+        self.error = None
+        self.requests = []
+        self.filter_count = 0
+        self._lock = threading.Lock()
+
+    def make_request(self, method, params):
+        with self._lock:
+            self.requests.append((method, params))
+        time.sleep(self.latency)
+        if self.fail:
+            raise socket.error("node is down")
+        if self.error is not None and method == 'eth_call':
+            raise self.error
+        if method == 'eth_blockNumber':
+            result = hex(self.head)
+        elif method == 'eth_gasPrice':
+            result = hex(20000000000).rstrip('L')
+        elif method == 'eth_getTransactionCount':
+            result = hex(self.nonce)
+        elif method == 'eth_newBlockFilter':
+            self.filter_count += 1
+            result = hex(self.filter_count)
+        elif method == 'eth_sendTransaction':
+            if self.reject:
+                raise ValueError("transaction rejected")
+            result = '0xtxn-' + params[0]['nonce']
+        else:
+            result = method
+        return {'jsonrpc': '2.0', 'id': 1, 'result': result}
+
+    def methods(self, method):
+        return [params for _method, params in self.requests if _method == method]
+
+
+SENDER = '0xd3cda913deb6f67967b99d67acdfa1712c293601'
+
+
+def get_client(*nodes, **kwargs):
+    kwargs.setdefault('check_interval', 60)
+    return MultiNodeClient(nodes, **kwargs)
+
+
+def send(client):
+    return client.send_transaction(_from=SENDER, to='0xabc')
+
+
+def test_reads_go_to_fastest_node():
+    slow = FakeNodeClient(latency=0.05)
+    fast = FakeNodeClient(latency=0.0)
+    client = get_client(slow, fast)
+
+    assert client.get_block_number() == 100
+    assert client.make_request('eth_getCode', ['0xabc'])['result'] == 'eth_getCode'
+
+    assert fast.methods('eth_getCode') == [['0xabc']]
+    assert slow.methods('eth_getCode') == []
+
+
+def test_failed_node_falls_back_to_next():
+    fast = FakeNodeClient(latency=0.0)
+    slow = FakeNodeClient(latency=0.02)
+    client = get_client(fast, slow)
+
+    fast.fail = True
+    assert client.make_request('eth_getCode', ['0xabc'])['result'] == 'eth_getCode'
+    assert slow.methods('eth_getCode') == [['0xabc']]
+
+    # The failed node is skipped until it passes a health check.
+    client.make_request('eth_getCode', ['0xdef'])
+    assert fast.methods('eth_getCode') == [['0xabc']]
+
+    fast.fail = False
+    client.check_nodes()
+    client.make_request('eth_getCode', ['0x123'])
+    assert fast.methods('eth_getCode')[-1] == ['0x123']
+
+
+def test_all_nodes_failing_raises():
+    first = FakeNodeClient()
+    second = FakeNodeClient()
+    client = get_client(first, second)
+
+    first.fail = second.fail = True
+    with pytest.raises(socket.error):
+        client.make_request('eth_getCode', ['0xabc'])
+
+
+def test_error_responses_do_not_mark_node_unhealthy():
+    first = FakeNodeClient()
+    second = FakeNodeClient()
+    client = get_client(first, second, names=['a', 'b'])
+
+    second.reject = True
+    send(client)
+    # A JSON-RPC error from the node as raised by the RPC and IPC clients.
+    first.error = second.error = ValueError({'error': {'code': -32000, 'message': 'execution reverted'}})
+    with pytest.raises(ValueError):
+        client.make_request('eth_call', [{'to': '0xabc'}, 'latest'])
+
+    stats = {node['name']: node for node in client.node_stats}
+    assert stats['a']['healthy'] and stats['b']['healthy']
+
+
+def test_transport_errors():
+    assert is_transport_error(socket.timeout())
+    assert is_transport_error(ValueError("No JSON returned by socket"))
+    assert is_transport_error(ValueError("Timeout waiting for response to 3"))
+    assert not is_transport_error(ValueError("known transaction: 0xabc"))
+    assert not is_transport_error(ValueError({'error': {'message': 'invalid opcode'}}))
+
+
+def test_lagging_node_is_deprioritized():
+    lagging = FakeNodeClient(head=90, latency=0.0)
+    synced = FakeNodeClient(head=100, latency=0.02)
+    client = get_client(lagging, synced, names=['lagging', 'synced'], max_lag=2)
+
+    assert client.get_nodes()[0].client is synced
+
+    stats = {node['name']: node for node in client.node_stats}
+    assert stats['lagging']['head_lag'] == 10
+    assert stats['synced']['head_lag'] == 0
+
+    lagging.head = 99
+    client.check_nodes()
+    assert client.get_nodes()[0].client is lagging
+
+
+def test_filter_requests_go_to_creating_node():
+    first = FakeNodeClient(latency=0.0)
+    second = FakeNodeClient(latency=0.02)
+    client = get_client(first, second)
+
+    filter_id = client.make_request('eth_newBlockFilter', [])['result']
+
+    # Make the node which did not create the filter the preferred one.
+    first.latency = 0.05
+    client.check_nodes()
+    client.check_nodes()
+    assert client.get_nodes()[0].client is second
+
+    client.make_request('eth_getFilterChanges', [filter_id])
+    assert first.methods('eth_getFilterChanges') == [[filter_id]]
+    assert second.methods('eth_getFilterChanges') == []
+
+    client.make_request('eth_uninstallFilter', [filter_id])
+    with pytest.raises(ValueError):
+        client.make_request('eth_getFilterChanges', [filter_id])
+
+
+def test_transactions_are_broadcast_to_every_node(wait_till):
+    first = FakeNodeClient()
+    second = FakeNodeClient()
+    client = get_client(first, second)
+
+    txn_hash = send(client)
+
+    assert txn_hash == '0xtxn-0x0'
+    wait_till(lambda: first.methods('eth_sendTransaction') and second.methods('eth_sendTransaction'))
+    assert len(first.methods('eth_sendTransaction')) == 1
+    assert first.methods('eth_sendTransaction') == second.methods('eth_sendTransaction')
+
+    transaction = first.methods('eth_sendTransaction')[0][0]
+    assert transaction['nonce'] == '0x0'
+    assert transaction['gasPrice'] == hex(20000000000).rstrip('L')
+
+
+def test_broadcast_does_not_wait_for_slow_node():
+    fast = FakeNodeClient()
+    slow = FakeNodeClient()
+    client = get_client(fast, slow)
+
+    slow.latency = 1
+    start = time.time()
+    client.make_request('eth_sendTransaction', [{
+        'from': SENDER,
+        'nonce': '0x5',
+        'gasPrice': '0x4a817c800',
+    }])
+    assert time.time() - start < 0.5
+
+
+def test_broadcast_succeeds_if_any_node_accepts():
+    first = FakeNodeClient()
+    second = FakeNodeClient()
+    client = get_client(first, second)
+
+    second.reject = True
+    txn_hash = send(client)
+    assert txn_hash == '0xtxn-0x0'
+
+
+def test_nonces_are_tracked_across_transactions():
+    first = FakeNodeClient(nonce=3)
+    second = FakeNodeClient(nonce=3)
+    client = get_client(first, second)
+
+    # The nodes have not seen the first transaction by the time of the second.
+    assert send(client) == '0xtxn-0x3'
+    assert send(client) == '0xtxn-0x4'
+
+    # A nonce that no node accepted is handed out again.
+    first.reject = second.reject = True
+    with pytest.raises(ValueError):
+        send(client)
+    first.reject = second.reject = False
+    first.nonce = second.nonce = 5
+    assert send(client) == '0xtxn-0x5'
+
+
+def test_nonces_of_dropped_transactions_are_reused():
+    first = FakeNodeClient(nonce=3)
+    second = FakeNodeClient(nonce=3)
+    client = get_client(first, second)
+
+    assert send(client) == '0xtxn-0x3'
+    assert send(client) == '0xtxn-0x4'
+
+    # Both transactions were dropped by the nodes.
+    client.sync_nonces()
+    assert send(client) == '0xtxn-0x3'
+
+
+def test_concurrent_transactions_are_sent_in_parallel():
+    first = FakeNodeClient()
+    second = FakeNodeClient()
+    client = get_client(first, second)
+    send(client)
+
+    first.latency = second.latency = 0.3
+    threads = [
+        threading.Thread(target=client.send_transaction, kwargs={
+            '_from': SENDER, 'to': '0xabc', 'gas_price': 20000000000,
+        })
+        for _ in range(2)
+    ]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert time.time() - start < 0.5
+    nonces = sorted(params[0]['nonce'] for params in first.methods('eth_sendTransaction'))
+    assert nonces == ['0x0', '0x1', '0x2']
@@ -0,0 +1,158 @@
+import threading
+
+from eth_alarm_client.nonces import (
+    NonceManagedClient,
+    NonceManager,
+)
+
+
+SENDER = '0xd3cda913deb6f67967b99d67acdfa1712c293601'
+
+
+class NonceClient(object):
+    """
+    Accepts transactions, tracking the pending transaction count of each
+    account like a node would.
+    """
+    def __init__(self, transaction_count=0):
+        self.transaction_count = transaction_count
+        self.nonces = []
+        self.reject_nonces = set()
+        self.count_requests = 0
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def make_request(self, method, params):
+        if method == 'eth_getTransactionCount':
+            self.count_requests += 1
+            return {'result': hex(self.transaction_count)}
+        elif method == 'eth_sendTransaction':
+            nonce = int(params[0]['nonce'], 16)
+            if nonce in self.reject_nonces:
+                self.reject_nonces.discard(nonce)
+                raise ValueError("transaction rejected")
+            with self._lock:
+                self.nonces.append(nonce)
+                self.transaction_count = max(self.transaction_count, nonce + 1)
+            return {'result': '0x{0:064x}'.format(nonce)}
+        elif method == 'eth_coinbase':
+            return {'result': SENDER}
+        raise ValueError("Unexpected method {0}".format(method))
+
+    def make_batch_request(self, requests):
+        self.batches.append(requests)
+        return [self.make_request(method, params) for method, params in requests]
+
+
+def test_nonces_are_assigned_locally():
+    node = NonceClient(transaction_count=5)
+    manager = NonceManager(node, SENDER)
+
+    assert [manager.get_next_nonce() for _ in range(3)] == [5, 6, 7]
+    assert node.count_requests == 1
+
+
+def test_rejected_nonce_is_reused():
+    node = NonceClient(transaction_count=5)
+    manager = NonceManager(node, SENDER)
+
+    first, second, third = [manager.get_next_nonce() for _ in range(3)]
+    manager.confirm(first)
+    manager.release(second)
+
+    # The gap is filled before any new nonce is used.
+    assert manager.get_next_nonce() == 6
+    assert manager.get_next_nonce() == 8
+
+
+def test_sync_with_node():
+    node = NonceClient(transaction_count=5)
+    manager = NonceManager(node, SENDER)
+    nonce = manager.get_next_nonce()
+    manager.confirm(nonce)
+
+    # Transactions sent from the account by something else.
+    manager.sync(10)
+    assert manager.get_next_nonce() == 10
+
+    # The node dropped our transaction.
+    manager.confirm(10)
+    manager.sync(10)
+    assert manager.get_next_nonce() == 10
+
+
+def test_sync_does_not_go_back_while_transactions_are_in_flight():
+    node = NonceClient(transaction_count=5)
+    manager = NonceManager(node, SENDER)
+
+    manager.get_next_nonce()
+    manager.sync(5)
+    assert manager.get_next_nonce() == 6
+
+
+def test_stale_sync_does_not_go_back():
+    node = NonceClient(transaction_count=5)
+    manager = NonceManager(node, SENDER)
+    manager.confirm(manager.get_next_nonce())
+
+    issued = manager.issued
+    # Sent and accepted while the count was being fetched.
+    manager.confirm(manager.get_next_nonce())
+    manager.sync(5, issued)
+
+    assert manager.get_next_nonce() == 7
+
+
+def test_client_fills_in_nonces():
+    node = NonceClient(transaction_count=3)
+    client = NonceManagedClient(node)
+
+    txn_hashes = [client.send_transaction(_from=SENDER, to='0xabc') for _ in range(3)]
+
+    assert node.nonces == [3, 4, 5]
+    assert txn_hashes[0] == '0x{0:064x}'.format(3)
+    assert node.count_requests == 1
+
+
+def test_client_concurrent_submissions_do_not_collide():
+    node = NonceClient()
+    client = NonceManagedClient(node)
+
+    threads = [
+        threading.Thread(target=client.send_transaction, kwargs={'_from': SENDER, 'to': '0xabc'})
+        for _ in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(node.nonces) == list(range(20))
+
+
+def test_client_reuses_rejected_nonce():
+    node = NonceClient()
+    client = NonceManagedClient(node)
+
+    client.send_transaction(_from=SENDER, to='0xabc')
+    node.reject_nonces.add(1)
+    try:
+        client.send_transaction(_from=SENDER, to='0xabc')
+    except ValueError:
+        pass
+    client.send_transaction(_from=SENDER, to='0xabc')
+
+    assert node.nonces == [0, 1]
+
+
+def test_client_resyncs_on_new_block():
+    node = NonceClient()
+    client = NonceManagedClient(node)
+    client.send_transaction(_from=SENDER, to='0xabc')
+
+    node.transaction_count = 4
+    client.on_new_block(1, {})
+    assert len(node.batches) == 1
+
+    client.send_transaction(_from=SENDER, to='0xabc')
+    assert node.nonces == [0, 4]
@@ -0,0 +1,192 @@
+import threading
+import time
+
+from eth_alarm_client import CallContract
+from eth_alarm_client import planner as planner_module
+from eth_alarm_client.engine import WaitForBlock
+from eth_alarm_client.planner import ExecutionPlanner
+
+
+class FakeCall(object):
+    was_called = False
+    is_cancelled = False
+    scheduler_can_pay = True
+
+    def __init__(self, call_address, last_block, base_payment=10 ** 18,
+                 execution_gas=300000, first_block=100, sent=None):
+        self.call_address = call_address
+        self.last_block = last_block
+        self.base_payment = base_payment
+        self.execution_gas = execution_gas
+        self.first_block = first_block
+        self.sent = sent if sent is not None else []
+        self.has_sent_execution = False
+
+    def should_call_on_block(self, block_number):
+        return self.first_block <= block_number <= self.last_block
+
+    def get_execution_gas(self):
+        return self.execution_gas
+
+    def submit_execution(self, block_number, execution_gas=None):
+        self.sent.append((self.call_address, block_number, execution_gas))
+        self.has_sent_execution = True
+        return '0x' + self.call_address
+
+
+def make_planner(mock_logger, *calls):
+    planner = ExecutionPlanner(logger=mock_logger)
+    for call in calls:
+        planner.add(call)
+    return planner
+
+
+def test_due_calls_are_ordered_by_deadline_then_reward(mock_logger):
+    sent = []
+    planner = make_planner(
+        mock_logger,
+        FakeCall('a', last_block=300, sent=sent),
+        FakeCall('b', last_block=200, base_payment=10 ** 17, sent=sent),
+        FakeCall('c', last_block=200, base_payment=10 ** 18, sent=sent),
+        FakeCall('d', last_block=300, first_block=120, sent=sent),
+    )
+
+    planner.on_new_block(99, {'gasLimit': hex(3141592)})
+
+    assert [call_address for call_address, _, _ in sent] == ['c', 'b', 'a']
+    assert all(block_number == 99 for _, block_number, _ in sent)
+
+
+def test_plan_respects_the_block_gas_limit(mock_logger):
+    planner = make_planner(
+        mock_logger,
+        FakeCall('a', last_block=200, execution_gas=2000000),
+        FakeCall('b', last_block=210, execution_gas=2000000),
+        FakeCall('c', last_block=220, execution_gas=1000000),
+    )
+
+    plan = planner.plan(99, 3141592)
+
+    assert [(call.call_address, gas) for call, gas in plan] == [
+        ('a', 2000000),
+        ('c', 1000000),
+    ]
+
+
+def test_sent_calls_are_not_sent_again(mock_logger):
+    sent = []
+    call = FakeCall('a', last_block=200, sent=sent)
+    planner = make_planner(mock_logger, call)
+
+    planner.on_new_block(99, {'gasLimit': hex(3141592)})
+    planner.on_new_block(100, {'gasLimit': hex(3141592)})
+    assert len(sent) == 1
+
+    planner.remove(call)
+    assert planner.pending_count == 0
+
+
+def test_failing_call_does_not_block_the_others(mock_logger):
+    sent = []
+
+    class BrokenCall(FakeCall):
+        def should_call_on_block(self, block_number):
+            raise ValueError("node unavailable")
+
+    planner = make_planner(
+        mock_logger,
+        BrokenCall('a', last_block=150, sent=sent),
+        FakeCall('b', last_block=200, sent=sent),
+    )
+    planner.on_new_block(99, {'gasLimit': hex(3141592)})
+
+    assert [call_address for call_address, _, _ in sent] == ['b']
+
+
+def test_due_calls_are_refreshed_in_one_batch(mock_logger, monkeypatch):
+    sent = []
+    executed = FakeCall('a', last_block=200, sent=sent)
+    cancelled = FakeCall('b', last_block=200, sent=sent)
+    unfunded = FakeCall('c', last_block=200, sent=sent)
+    due = FakeCall('d', last_block=200, sent=sent)
+    not_yet_due = FakeCall('e', last_block=200, first_block=120, sent=sent)
+
+    loads = []
+
+    def load_call_states(blockchain_client, call_contracts):
+        loads.append(call_contracts)
+        # Another executor ran the call in the new block.
+        executed.was_called = True
+        cancelled.is_cancelled = True
+        unfunded.scheduler_can_pay = False
+    monkeypatch.setattr(planner_module, 'load_call_states', load_call_states)
+
+    planner = ExecutionPlanner(blockchain_client=object(), logger=mock_logger)
+    for call in (executed, cancelled, unfunded, due, not_yet_due):
+        planner.add(call)
+    planner.on_new_block(99, {'gasLimit': hex(3141592)})
+
+    assert len(loads) == 1
+    assert sorted(call.call_address for call in loads[0]) == ['a', 'b', 'c', 'd']
+    assert [call_address for call_address, _, _ in sent] == ['d']
+
+
+def test_executions_are_sent_in_parallel(mock_logger):
+    class SlowCall(FakeCall):
+        def submit_execution(self, block_number, execution_gas=None):
+            time.sleep(0.2)
+            self.sent.append(threading.current_thread().name)
+
+    sent = []
+    planner = make_planner(
+        mock_logger,
+        *[SlowCall(str(idx), last_block=200, sent=sent) for idx in range(5)]
+    )
+
+    start = time.time()
+    planner.on_new_block(99, {'gasLimit': hex(3141592)})
+    assert time.time() - start < 0.5
+    assert len(set(sent)) == 5
+
+
+def test_call_loop_waits_for_the_planner(mock_logger, mock_block_sage):
+    planner = ExecutionPlanner(logger=mock_logger)
+    mock_block_sage.current_block = {'gasLimit': hex(3141592)}
+    mock_block_sage.estimated_time_to_block = lambda block_number, percentile=None: 0.01
+
+    call_contract = CallContract(
+        '0xd3cda913deb6f67967b99d67acdfa1712c293601',
+        None,
+        block_sage=mock_block_sage,
+        execution_planner=planner,
+    )
+    call_contract._call_data.update({
+        'targetBlock': 101,
+        'gracePeriod': 255,
+        'callValue': 0,
+        'requiredGas': 200000,
+        'basePayment': 10 ** 18,
+        'baseDonation': 10 ** 16,
+        'wasCalled': False,
+        'isCancelled': False,
+        'claimer': '0x0000000000000000000000000000000000000000',
+        'balance': 10 ** 21,
+        'gas_price': 20000000000,
+    })
+    call_contract.__dict__['coinbase'] = '0x6c8f2a135f6ed072de4503bd7c4999a1a17f824b'
+    executions = []
+    call_contract.call.execute = lambda **kwargs: executions.append(kwargs) or '0x1'
+
+    steps = call_contract.execute_steps()
+    step = next(steps)
+    # The call loop leaves sending the execution to the planner.
+    assert isinstance(step, WaitForBlock) and step.block_number == 101
+    assert planner.pending_count == 1
+    assert executions == []
+
+    planner.on_new_block(100, mock_block_sage.current_block)
+    assert executions == [{'gas': 300000}]
+    assert call_contract.has_sent_execution
+
+    steps.close()
+    assert planner.pending_count == 0
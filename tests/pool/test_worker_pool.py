@@ -0,0 +1,144 @@
+import threading
+
+from eth_alarm_client.engine import WaitForBlock
+from eth_alarm_client.pool import WorkerPool
+
+
+def test_pool_runs_submitted_work(mock_logger, wait_till):
+    pool = WorkerPool(size=2, max_queue=10, logger=mock_logger)
+
+    work_item = pool.submit(lambda a, b: a + b, args=(1, 2))
+    wait_till(lambda: not work_item.is_alive())
+
+    assert work_item.result == 3
+    assert pool.stats['completed'] == 1
+    pool.stop()
+
+
+def test_pool_bounds_concurrency(mock_logger, wait_till):
+    pool = WorkerPool(size=2, max_queue=10, logger=mock_logger)
+    release = threading.Event()
+    running = []
+    peak = []
+
+    def work():
+        running.append(1)
+        peak.append(len(running))
+        release.wait(5)
+        running.pop()
+
+    work_items = [pool.submit(work) for _ in range(6)]
+    wait_till(lambda: pool.stats['active'] == 2)
+
+    assert pool.stats['queued'] == 4
+    release.set()
+    wait_till(lambda: not any(item.is_alive() for item in work_items))
+    assert max(peak) == 2
+    pool.stop()
+
+
+def test_pool_rejects_when_queue_full(mock_logger, wait_till):
+    pool = WorkerPool(size=1, max_queue=2, logger=mock_logger)
+    release = threading.Event()
+
+    blocker = pool.submit(release.wait, args=(5,))
+    wait_till(lambda: pool.stats['active'] == 1)
+
+    assert pool.submit(lambda: None) is not None
+    assert pool.submit(lambda: None) is not None
+    assert pool.submit(lambda: None) is None
+    assert pool.stats['rejected'] == 1
+    assert pool.stats['peak_queued'] == 2
+
+    release.set()
+    wait_till(lambda: not blocker.is_alive())
+    pool.stop()
+
+
+def test_pool_runs_lowest_priority_value_first(mock_logger, wait_till):
+    pool = WorkerPool(size=1, max_queue=10, logger=mock_logger)
+    release = threading.Event()
+    order = []
+
+    pool.submit(release.wait, args=(5,))
+    wait_till(lambda: pool.stats['active'] == 1)
+
+    work_items = [
+        pool.submit(order.append, args=(priority,), priority=priority)
+        for priority in (30, 10, 20)
+    ]
+    release.set()
+    wait_till(lambda: not any(item.is_alive() for item in work_items))
+
+    assert order == [10, 20, 30]
+    pool.stop()
+
+
+def test_pool_records_failures(mock_logger, wait_till):
+    pool = WorkerPool(size=1, max_queue=10, logger=mock_logger)
+
+    def fail():
+        raise ValueError("boom")
+
+    work_item = pool.submit(fail, name='failing')
+    wait_till(lambda: not work_item.is_alive())
+
+    assert isinstance(work_item.exception, ValueError)
+    assert pool.stats['failed'] == 1
+    pool.stop()
+
+
+class FakeBlockSage(object):
+    def __init__(self):
+        self.current_block_number = 1
+        self.callbacks = []
+
+    def on_new_block(self, callback):
+        self.callbacks.append(callback)
+
+    def advance(self):
+        self.current_block_number += 1
+        for callback in self.callbacks:
+            callback(self.current_block_number, {})
+
+
+def block_waiting_steps(block_sage, block_number, results, timeout=60):
+    yield WaitForBlock(block_sage, block_number, timeout)
+    results.append(block_sage.current_block_number)
+
+
+def test_tasks_waiting_for_a_block_do_not_hold_a_worker(mock_logger, wait_till):
+    pool = WorkerPool(size=1, max_queue=10, logger=mock_logger)
+    block_sage = FakeBlockSage()
+    results = []
+
+    task = pool.spawn(block_waiting_steps(block_sage, 3, results))
+    wait_till(lambda: block_sage.callbacks)
+
+    work_item = pool.submit(lambda: 'done')
+    wait_till(lambda: not work_item.is_alive())
+    assert work_item.result == 'done'
+    assert task.is_alive()
+    assert pool.stats['active'] == 0
+
+    block_sage.advance()
+    block_sage.advance()
+    wait_till(lambda: not task.is_alive())
+    assert results == [3]
+    pool.stop()
+
+
+def test_tasks_waiting_for_a_block_resume_on_timeout(mock_logger, wait_till):
+    pool = WorkerPool(size=1, max_queue=10, logger=mock_logger)
+    block_sage = FakeBlockSage()
+    results = []
+
+    task = pool.spawn(block_waiting_steps(block_sage, 10, results, timeout=0.05))
+    wait_till(lambda: not task.is_alive())
+    assert results == [1]
+
+    # The stale block wait does not resume the finished task again.
+    for _ in range(10):
+        block_sage.advance()
+    assert results == [1]
+    pool.stop()
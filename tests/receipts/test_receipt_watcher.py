@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+
+from eth_alarm_client.engine import (
+    ExecutionEngine,
+    run_steps,
+    wait_for_receipt_steps,
+)
+from eth_alarm_client.receipts import ReceiptWatcher
+
+
+class ReceiptClient(object):
+    def __init__(self):
+        self.receipts = {}
+        self.batches = []
+
+    def make_batch_request(self, requests):
+        self.batches.append(requests)
+        responses = []
+        for method, params in requests:
+            assert method == 'eth_getTransactionReceipt'
+            responses.append({'result': self.receipts.get(params[0])})
+        return responses
+
+    def get_transaction_receipt(self, txn_hash):
+        raise AssertionError("Receipts should only be fetched by the watcher")
+
+
+def test_receipts_are_checked_in_one_batch(mock_logger):
+    client = ReceiptClient()
+    watcher = ReceiptWatcher(client, logger=mock_logger)
+
+    pending = [watcher.watch('0x{0}'.format(i)) for i in range(5)]
+    watcher.on_new_block(1, {})
+    assert len(client.batches) == 1
+    assert len(client.batches[0]) == 5
+    assert not any(pending_receipt.is_ready for pending_receipt in pending)
+
+    client.receipts['0x1'] = {'blockNumber': '0x2'}
+    watcher.on_new_block(2, {})
+    assert pending[1].is_ready
+    assert pending[1].receipt == {'blockNumber': '0x2'}
+    assert watcher.pending_count == 4
+
+
+def test_no_requests_without_pending_receipts(mock_logger):
+    client = ReceiptClient()
+    watcher = ReceiptWatcher(client, logger=mock_logger)
+
+    watcher.on_new_block(1, {})
+    assert client.batches == []
+
+
+def test_waiters_for_the_same_transaction_share_a_lookup(mock_logger):
+    client = ReceiptClient()
+    watcher = ReceiptWatcher(client, logger=mock_logger)
+
+    assert watcher.watch('0x1') is watcher.watch('0x1')
+    watcher.on_new_block(1, {})
+    assert len(client.batches[0]) == 1
+
+
+def test_wait_for_transaction(mock_logger, wait_till):
+    client = ReceiptClient()
+    watcher = ReceiptWatcher(client, logger=mock_logger)
+    results = []
+
+    thread = threading.Thread(target=lambda: results.append(
+        watcher.wait_for_transaction('0x1', max_wait=5),
+    ))
+    thread.start()
+
+    client.receipts['0x1'] = {'blockNumber': '0x2'}
+    wait_till(lambda: watcher.pending_count)
+    watcher.on_new_block(2, {})
+    thread.join(5)
+
+    assert results == [{'blockNumber': '0x2'}]
+
+
+def test_wait_for_transaction_timeout(mock_logger):
+    client = ReceiptClient()
+    watcher = ReceiptWatcher(client, logger=mock_logger)
+
+    with pytest.raises(ValueError):
+        watcher.wait_for_transaction('0x1', max_wait=0.1)
+    assert watcher.pending_count == 0
+
+
+def test_receipt_steps_on_engine(mock_logger, wait_till):
+    client = ReceiptClient()
+    watcher = ReceiptWatcher(client, logger=mock_logger)
+    engine = ExecutionEngine(logger=mock_logger)
+    receipts = {}
+
+    task = engine.spawn(wait_for_receipt_steps(
+        client, '0x1', receipts, max_wait=5, receipt_watcher=watcher,
+    ))
+    wait_till(lambda: watcher.pending_count)
+
+    client.receipts['0x1'] = {'blockNumber': '0x2'}
+    watcher.on_new_block(2, {})
+    task.join(5)
+
+    assert receipts == {'0x1': {'blockNumber': '0x2'}}
+    engine.stop()
+
+
+def test_receipt_steps_timeout(mock_logger):
+    client = ReceiptClient()
+    watcher = ReceiptWatcher(client, logger=mock_logger)
+
+    with pytest.raises(ValueError):
+        run_steps(wait_for_receipt_steps(
+            client, '0x1', {}, max_wait=0.1, receipt_watcher=watcher,
+        ))
+    assert watcher.pending_count == 0
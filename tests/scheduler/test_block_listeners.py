@@ -0,0 +1,36 @@
+from eth_alarm_client.scheduler import Scheduler
+
+
+class RecordingBlockSage(object):
+    is_alive = True
+    current_block_number = 100
+
+    def __init__(self):
+        self.callbacks = []
+
+    def on_new_block(self, callback):
+        self.callbacks.append(callback)
+
+
+def test_listeners_are_registered_with_replacement_block_sages(mock_scheduler_contract):
+    first = RecordingBlockSage()
+    scheduler = Scheduler(mock_scheduler_contract, block_sage=first)
+
+    def listener(block_number, block):
+        pass
+
+    scheduler.on_new_block(listener)
+    assert listener in first.callbacks
+
+    # A block sage that replaces a dead one gets the same listeners.
+    second = RecordingBlockSage()
+    scheduler.set_block_sage(second)
+    assert listener in second.callbacks
+    assert scheduler.execution_planner.on_new_block in second.callbacks
+
+
+def test_planner_runs_before_other_block_callbacks(mock_scheduler_contract):
+    block_sage = RecordingBlockSage()
+    scheduler = Scheduler(mock_scheduler_contract, block_sage=block_sage)
+
+    assert block_sage.callbacks[0] == scheduler.execution_planner.on_new_block
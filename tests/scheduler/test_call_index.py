@@ -0,0 +1,164 @@
+from eth_alarm_client.call_index import CallIndex
+from eth_alarm_client.scheduler import Scheduler
+
+
+def test_call_index_is_sorted_by_target_block():
+    call_index = CallIndex()
+    call_index.add('0xc', 30)
+    call_index.add('0xa', 10)
+    call_index.add('0xb1', 20)
+    call_index.add('0xb2', 20)
+
+    assert not call_index.add('0xa', 10)
+    assert len(call_index) == 4
+    assert call_index.get_calls(0, 100) == ['0xa', '0xb1', '0xb2', '0xc']
+    assert call_index.get_calls(20, 20) == ['0xb1', '0xb2']
+    assert call_index.get_calls(21, 29) == []
+
+
+def test_call_index_prune_and_discard():
+    call_index = CallIndex()
+    for i in range(10):
+        call_index.add('0x{0}'.format(i), i)
+
+    assert call_index.prune(5) == ['0x0', '0x1', '0x2', '0x3', '0x4']
+    assert call_index.get_calls(0, 100) == ['0x5', '0x6', '0x7', '0x8', '0x9']
+    assert '0x4' not in call_index
+
+    call_index.discard('0x7')
+    assert call_index.get_calls(0, 100) == ['0x5', '0x6', '0x8', '0x9']
+
+
+class FakeRegistrations(object):
+    def __init__(self, from_block, registered):
+        self.next_block = from_block
+        self.registered = registered
+        self.fail = False
+
+    def get_new_calls(self, to_block):
+        if self.fail:
+            raise ValueError("logs unavailable")
+        call_addresses = [
+            call_address
+            for block_number, call_address in self.registered
+            if self.next_block <= block_number <= to_block
+        ]
+        self.next_block = to_block + 1
+        return call_addresses
+
+
+def make_scheduler(mock_scheduler_contract, mock_block_sage, calls, registered):
+    scheduler = Scheduler(mock_scheduler_contract, block_sage=mock_block_sage)
+    scanned_ranges = []
+    registrations = []
+
+    def iter_calls(left_block, right_block):
+        scanned_ranges.append((left_block, right_block))
+        return [
+            (call_address, target_block)
+            for target_block, call_address in sorted(calls.items())
+            if left_block <= target_block <= right_block
+        ]
+
+    def get_registration_discovery(from_block):
+        registrations.append(FakeRegistrations(from_block, registered))
+        return registrations[-1]
+
+    scheduler.iter_calls = iter_calls
+    scheduler.get_registration_discovery = get_registration_discovery
+    scheduler.get_target_blocks = lambda call_addresses: [
+        target_block
+        for call_address in call_addresses
+        for target_block, address in calls.items()
+        if address == call_address
+    ]
+    return scheduler, scanned_ranges, registrations
+
+
+def test_scheduler_only_scans_new_blocks(mock_scheduler_contract, mock_block_sage):
+    calls = {
+        90: '0xa',
+        120: '0xb',
+        364: '0xc',
+        365: '0xd',
+    }
+    scheduler, scanned_ranges, registrations = make_scheduler(
+        mock_scheduler_contract, mock_block_sage, calls, [],
+    )
+
+    assert scheduler.get_upcoming_calls(84, 364) == ['0xa', '0xb', '0xc']
+    assert scanned_ranges == [(84, 364)]
+    assert registrations[0].next_block == 101
+
+    # Calling again within the same block does not scan.
+    scheduler.get_upcoming_calls(84, 364)
+    assert len(scanned_ranges) == 1
+
+    mock_block_sage.current_block_number = 101
+    assert scheduler.get_upcoming_calls(85, 365) == ['0xa', '0xb', '0xc', '0xd']
+    assert scanned_ranges[-1] == (365, 365)
+
+    mock_block_sage.current_block_number = 107
+    assert scheduler.get_upcoming_calls(91, 371) == ['0xb', '0xc', '0xd']
+    assert scanned_ranges[-1] == (366, 371)
+    assert len(registrations) == 1
+    assert registrations[0].next_block == 108
+
+
+class RecordingCallStore(object):
+    def __init__(self):
+        self.deleted = []
+
+    def delete_many_call_data(self, call_addresses):
+        self.deleted.append(call_addresses)
+
+
+def test_scheduler_prunes_the_call_store(mock_scheduler_contract, mock_block_sage):
+    calls = {
+        90: '0xa',
+        120: '0xb',
+    }
+    scheduler, _, _ = make_scheduler(mock_scheduler_contract, mock_block_sage, calls, [])
+    scheduler.call_store = RecordingCallStore()
+
+    assert scheduler.get_upcoming_calls(84, 364) == ['0xa', '0xb']
+    assert scheduler.call_store.deleted == []
+
+    mock_block_sage.current_block_number = 107
+    assert scheduler.get_upcoming_calls(91, 371) == ['0xb']
+    assert scheduler.call_store.deleted == [['0xa']]
+
+
+def test_scheduler_picks_up_newly_registered_calls(mock_scheduler_contract, mock_block_sage):
+    calls = {120: '0xa'}
+    registered = []
+    scheduler, scanned_ranges, _ = make_scheduler(
+        mock_scheduler_contract, mock_block_sage, calls, registered,
+    )
+    assert scheduler.get_upcoming_calls(84, 364) == ['0xa']
+
+    # A call is scheduled in block 101 for a block that was already walked.
+    calls[200] = '0xb'
+    registered.append((101, '0xb'))
+    mock_block_sage.current_block_number = 101
+    assert scheduler.get_upcoming_calls(85, 365) == ['0xa', '0xb']
+    assert scanned_ranges == [(84, 364), (365, 365)]
+
+
+def test_scheduler_walks_window_without_registration_logs(mock_scheduler_contract,
+                                                          mock_block_sage):
+    scheduler, scanned_ranges, registrations = make_scheduler(
+        mock_scheduler_contract, mock_block_sage, {}, [],
+    )
+    scheduler.update_call_index()
+    registrations[0].fail = True
+
+    mock_block_sage.current_block_number = 101
+    scheduler.update_call_index()
+    assert scanned_ranges == [(84, 364), (85, 365)]
+
+    # Logs are read again from the block after the walk.
+    assert registrations[-1].next_block == 102
+    mock_block_sage.current_block_number = 102
+    scheduler.update_call_index()
+    assert scanned_ranges[-1] == (366, 366)
@@ -0,0 +1,28 @@
+from eth_alarm_client.scheduler import Scheduler
+
+
+CALL_ADDRESS = '0xd3cda913deb6f67967b99d67acdfa1712c293601'
+
+
+def test_call_contracts_are_reused(mock_scheduler_contract, mock_block_sage):
+    scheduler = Scheduler(mock_scheduler_contract, block_sage=mock_block_sage)
+
+    call_contract = scheduler.get_call_contract(CALL_ADDRESS)
+
+    assert scheduler.get_call_contract(CALL_ADDRESS) is call_contract
+
+
+def test_expired_call_contracts_are_evicted(mock_scheduler_contract, mock_block_sage):
+    scheduler = Scheduler(mock_scheduler_contract, block_sage=mock_block_sage)
+
+    call_contract = scheduler.get_call_contract(CALL_ADDRESS)
+    # Avoid the RPC round trip by priming the cached property.
+    call_contract.__dict__['last_block'] = 100
+
+    scheduler.cleanup_call_cache()
+    assert CALL_ADDRESS in scheduler.call_cache
+
+    mock_block_sage.current_block_number = 101
+    scheduler.cleanup_call_cache()
+    assert CALL_ADDRESS not in scheduler.call_cache
+    assert scheduler.get_call_contract(CALL_ADDRESS) is not call_contract
@@ -0,0 +1,203 @@
+import json
+import os
+import socket
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+import pytest
+
+from eth_alarm_client.batch import make_batch_request
+from eth_alarm_client.transport import (
+    PooledIPCClient,
+    PooledRPCClient,
+)
+
+
+def respond(request):
+    if request['method'] == 'eth_fail':
+        return {'jsonrpc': '2.0', 'id': request['id'], 'error': {'message': 'failed'}}
+    return {'jsonrpc': '2.0', 'id': request['id'], 'result': request['params']}
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture()
+def rpc_server():
+    connections = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            connections.add(self.client_address)
+            payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            if isinstance(payload, list):
+                data = [respond(request) for request in reversed(payload)]
+            else:
+                data = respond(payload)
+            body = json.dumps(data).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.connections = connections
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_rpc_connections_are_reused(rpc_server):
+    client = PooledRPCClient(port=rpc_server.server_address[1], pool_size=2)
+
+    def make_requests():
+        for i in range(10):
+            assert client.make_request('eth_test', [i])['result'] == [i]
+
+    threads = [threading.Thread(target=make_requests) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert len(rpc_server.connections) <= 2
+
+
+def test_rpc_batch_and_errors(rpc_server):
+    client = PooledRPCClient(port=rpc_server.server_address[1], pool_size=1)
+
+    responses = make_batch_request(client, [('eth_a', [1]), ('eth_b', [2])])
+    assert [r['result'] for r in responses] == [[1], [2]]
+
+    with pytest.raises(ValueError):
+        client.make_request('eth_fail', [])
+
+
+class IPCServer(object):
+    """
+    Answers requests out of order and splits each response across several
+    writes.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(path)
+        self._socket.listen(5)
+        self.connections = []
+        thread = threading.Thread(target=self.accept)
+        thread.daemon = True
+        thread.start()
+
+    def accept(self):
+        while True:
+            try:
+                connection, _ = self._socket.accept()
+            except socket.error:
+                break
+            self.connections.append(connection)
+            thread = threading.Thread(target=self.serve, args=(connection,))
+            thread.daemon = True
+            thread.start()
+
+    def serve(self, connection):
+        decoder = json.JSONDecoder()
+        data = ''
+        while True:
+            try:
+                chunk = connection.recv(4096)
+            except socket.error:
+                break
+            if not chunk:
+                break
+            data += chunk.decode('utf-8')
+            while data.strip():
+                data = data.lstrip()
+                try:
+                    payload, end = decoder.raw_decode(data)
+                except ValueError:
+                    break
+                data = data[end:]
+                if isinstance(payload, dict) and payload['method'] == 'eth_slow':
+                    threading.Timer(0.2, self.send, args=(connection, respond(payload))).start()
+                elif isinstance(payload, list):
+                    self.send(connection, [respond(request) for request in payload])
+                else:
+                    self.send(connection, respond(payload))
+
+    def send(self, connection, response):
+        body = json.dumps(response).encode('utf-8')
+        midpoint = len(body) // 2
+        connection.sendall(body[:midpoint])
+        time.sleep(0.01)
+        connection.sendall(body[midpoint:])
+
+    def close(self):
+        self._socket.close()
+        for connection in self.connections:
+            connection.close()
+
+
+@pytest.fixture()
+def ipc_server(tmpdir):
+    server = IPCServer(os.path.join(str(tmpdir), 'geth.ipc'))
+    yield server
+    server.close()
+
+
+def test_ipc_requests_are_multiplexed(ipc_server):
+    client = PooledIPCClient(ipc_server.path, pool_size=1)
+    results = {}
+
+    def slow_request():
+        results['slow'] = client.make_request('eth_slow', ['slow'])['result']
+
+    slow_thread = threading.Thread(target=slow_request)
+    slow_thread.start()
+    time.sleep(0.05)
+
+    # Served while the slow request is still in flight on the same socket.
+    start = time.time()
+    assert client.make_request('eth_fast', ['fast'])['result'] == ['fast']
+    assert time.time() - start < 0.2
+
+    slow_thread.join(5)
+    assert results['slow'] == ['slow']
+    assert len(ipc_server.connections) == 1
+
+
+def test_ipc_batch_and_errors(ipc_server):
+    client = PooledIPCClient(ipc_server.path, pool_size=2)
+
+    responses = make_batch_request(client, [('eth_a', [1]), ('eth_b', [2])])
+    assert [r['result'] for r in responses] == [[1], [2]]
+
+    with pytest.raises(ValueError):
+        client.make_request('eth_fail', [])
+
+
+def test_ipc_reconnects_after_connection_loss(ipc_server):
+    client = PooledIPCClient(ipc_server.path, pool_size=1)
+    assert client.make_request('eth_a', [1])['result'] == [1]
+
+    ipc_server.connections[0].shutdown(socket.SHUT_RDWR)
+    time.sleep(0.1)
+
+    assert client.make_request('eth_a', [2])['result'] == [2]
+    assert len(ipc_server.connections) == 2
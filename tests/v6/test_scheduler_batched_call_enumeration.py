@@ -0,0 +1,40 @@
+import os
+
+from eth_alarm_client import (
+    Scheduler,
+)
+
+
+V6_DIR = os.path.dirname(__file__)
+
+project_dir = V6_DIR
+deploy_contracts = [
+    "Scheduler",
+    "TestCallExecution",
+]
+
+
+def test_batched_enumeration_matches_tree_walk(deployed_contracts, scheduled_calls):
+    scheduler = Scheduler(deployed_contracts.Scheduler, batch_rpc=True)
+
+    expected_calls = tuple(call._meta.address for call in scheduled_calls)
+    actual_calls = tuple(scheduler.enumerate_calls(
+        scheduled_calls[0].targetBlock(),
+        scheduled_calls[-1].targetBlock(),
+    ))
+    assert actual_calls == expected_calls
+    assert actual_calls == tuple(call_address for call_address, _ in scheduler.walk_calls(
+        scheduled_calls[0].targetBlock(),
+        scheduled_calls[-1].targetBlock(),
+    ))
+
+
+def test_batched_enumeration_of_partial_window(deployed_contracts, scheduled_calls):
+    scheduler = Scheduler(deployed_contracts.Scheduler, batch_rpc=True)
+
+    expected_calls = tuple(call._meta.address for call in scheduled_calls[1:4])
+    actual_calls = tuple(scheduler.enumerate_calls(
+        scheduled_calls[1].targetBlock(),
+        scheduled_calls[3].targetBlock(),
+    ))
+    assert actual_calls == expected_calls